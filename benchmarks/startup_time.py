@@ -0,0 +1,80 @@
+"""
+Startzeit-Benchmark: Zeit vom Prozessstart bis zum sichtbaren Fenster
+(time-to-window) und bis der erste Tab fertig aufgebaut ist.
+
+Jeder Lauf startet einen frischen Python-Prozess (kalte Imports).
+
+    python benchmarks/startup_time.py            # 5 Läufe
+    python benchmarks/startup_time.py -n 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child():
+    """Läuft im Kindprozess: App bauen, Zeiten messen, als JSON ausgeben."""
+    t0 = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from main import build_app
+    t_import = time.perf_counter() - t0
+
+    root, app = build_app()
+    times = {"import": t_import}
+
+    def poll():
+        if "window" not in times and root.winfo_ismapped():
+            times["window"] = time.perf_counter() - t0
+        if "first_tab" not in times and app.tabs:
+            times["first_tab"] = time.perf_counter() - t0
+        if len(times) == 3:
+            root.destroy()
+            return
+        root.after(1, poll)
+
+    root.after(0, poll)
+    root.after(30_000, root.destroy)   # Sicherheitsnetz
+    root.mainloop()
+    print(json.dumps(times))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", "--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    results = []
+    for i in range(args.runs):
+        out = subprocess.run([sys.executable, __file__, "--child"], cwd=ROOT,
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stderr.strip())
+            sys.exit(out.returncode)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        r = results[-1]
+        # Phasen fehlen, wenn das Sicherheitsnetz das Fenster geschlossen hat
+        missing = float("nan")
+        print(f"run {i+1}: import {r.get('import', missing):.3f} s, "
+              f"window {r.get('window', missing):.3f} s, "
+              f"first tab {r.get('first_tab', missing):.3f} s")
+
+    for key in ("import", "window", "first_tab"):
+        vals = [r[key] for r in results if key in r]
+        if not vals:
+            print(f"{key:>9}: not recorded")
+            continue
+        print(f"{key:>9}: median {statistics.median(vals):.3f} s, min {min(vals):.3f} s "
+              f"({len(vals)}/{len(results)} runs)")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
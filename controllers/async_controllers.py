@@ -0,0 +1,131 @@
+"""
+asyncio-Fassade für die Gerätecontroller.
+
+Die synchronen Controller bleiben die Grundlage; alle VISA-Zugriffe laufen
+weiter über deren InstrumentExecutor (ein Worker je Gerät). Die Fassade
+verpackt die Futures für asyncio, damit Skripte Wavegen, OSA und Scope in
+einer Event-Loop parallel steuern können:
+
+    osa, wg = AsyncOSAController(OSAController()), AsyncWavegenController(WavegenController())
+    await asyncio.gather(osa.connect(ip_osa), wg.connect(ip_wg))
+    await wg.set_frequency(1, 1e6)
+    wl, dbm = await osa.single_sweep(timeout=30)
+
+Abbruch (Task.cancel) und timeout verwerfen noch nicht gestartete
+Geräteaufträge; laufende Sweeps werden per abort-Event/SST beendet.
+"""
+import asyncio
+import threading
+
+import numpy as np
+
+from utils.executor import NORMAL
+
+
+class AsyncInstrument:
+    """Gemeinsame Basis: Ausführung im Geräte-Executor bzw. im Thread-Pool."""
+
+    def __init__(self, controller, default_timeout=None):
+        self.controller = controller
+        self.default_timeout = default_timeout
+
+    async def _wait(self, fut, timeout, on_cancel=None):
+        try:
+            return await asyncio.wait_for(fut, timeout if timeout is not None else self.default_timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if on_cancel:
+                on_cancel()
+            raise
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """fn im Executor des Geräts ausführen (serialisiert mit allen anderen Zugriffen)."""
+        cfut = self.controller.executor.submit_with(NORMAL, fn, *args, **kwargs)
+        # cancel() wirkt nur, solange der Auftrag noch in der Queue steht
+        return await self._wait(asyncio.wrap_future(cfut), timeout, cfut.cancel)
+
+    async def run_blocking(self, fn, *args, timeout=None, abort=None):
+        """
+        Länger blockierende Abläufe (Sweeps, Connect) im Thread-Pool ausführen;
+        deren einzelne VISA-Zugriffe gehen trotzdem durch den Executor.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(None, fn, *args)
+        return await self._wait(fut, timeout, abort.set if abort else None)
+
+    async def write(self, cmd, timeout=None):
+        return await self.run(self.controller.write, cmd, timeout=timeout)
+
+    async def query(self, cmd, timeout=None):
+        return await self.run(self.controller.query, cmd, timeout=timeout)
+
+
+class AsyncOSAController(AsyncInstrument):
+
+    async def connect(self, ip, timeout=None):
+        return await self.run_blocking(self.controller.connect, ip, timeout=timeout)
+
+    async def read_params(self, cmds, timeout=None):
+        return await self.run(self.controller.read_params, cmds, timeout=timeout)
+
+    async def set_params(self, params, timeout=None):
+        return await self.run(self.controller.set_params, params, timeout=timeout)
+
+    async def read_power(self, wl_nm, timeout=None):
+        return await self.run(self.controller.read_power, wl_nm, timeout=timeout)
+
+    async def sweep(self, params=None, timeout=None):
+        """Single Sweep; bei Abbruch/Timeout wird der Sweep am Gerät gestoppt."""
+        abort = threading.Event()
+        return await self.run_blocking(
+            lambda: self.controller.sweep(params, abort=abort), timeout=timeout, abort=abort)
+
+    async def read_trace(self, trace="A", timeout=None):
+        """(Wellenlängen, dBm) des Trace-Speichers."""
+        raw = (await self.run(self.controller.read_traces, [trace], timeout=timeout))[trace]
+        dbm = np.fromstring(raw, dtype=float, sep="\r\n")
+        wl = await self.run(self.controller.wavelength_axis, dbm.size, timeout=timeout)
+        return wl, dbm
+
+    async def single_sweep(self, params=None, timeout=None):
+        if not await self.sweep(params, timeout=timeout):
+            return None
+        return await self.read_trace(timeout=timeout)
+
+
+class AsyncWavegenController(AsyncInstrument):
+
+    async def connect(self, ip, timeout=None):
+        return await self.run_blocking(self.controller.connect, ip, timeout=timeout)
+
+    async def apply(self, channel, timeout=None, **params):
+        return await self.run(self.controller.apply, channel, timeout=timeout, **params)
+
+    async def set_frequency(self, channel, freq, timeout=None):
+        return await self.run(self.controller.set_frequency, channel, freq, timeout=timeout)
+
+    async def set_output(self, channel, on, timeout=None):
+        return await self.run(self.controller.set_output, channel, on, timeout=timeout)
+
+    async def refresh(self, channel, *params, timeout=None):
+        return await self.run(self.controller.refresh, channel, *params, timeout=timeout)
+
+
+class AsyncScopeController(AsyncInstrument):
+
+    async def connect(self, ip, timeout=None):
+        return await self.run_blocking(self.controller.connect, ip, timeout=timeout)
+
+    async def write(self, cmd, timeout=None):
+        return await self.run(lambda: self.controller.scope.write(cmd), timeout=timeout)
+
+    async def query(self, cmd, timeout=None):
+        return await self.run(lambda: self.controller.scope.query(cmd), timeout=timeout)
+
+    async def get_waveform(self, ch, timeout=None):
+        return await self.run(self.controller.get_waveform, ch, timeout=timeout)
+
+    async def get_waveforms(self, channels=None, timeout=None):
+        """{ch: (t, v)} für mehrere Kanäle."""
+        channels = channels or self.controller.get_channel_list()
+        results = await asyncio.gather(*(self.get_waveform(ch, timeout=timeout) for ch in channels))
+        return dict(zip(channels, results))
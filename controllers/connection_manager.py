@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+_rm = None
+_rm_lock = threading.Lock()
+
+
+def shared_resource_manager():
+    """Ein gemeinsamer pyvisa-ResourceManager für alle Controller (erst bei Bedarf erzeugt)."""
+    global _rm
+    with _rm_lock:
+        if _rm is None:
+            import pyvisa
+            _rm = pyvisa.ResourceManager()
+        return _rm
+
+
+class ConnectionManager:
+    """
+    Baut die Verbindungen zu allen registrierten Geräten parallel auf und
+    meldet den Zustand je Gerät ("idle", "connecting", "ready", "failed: …").
+
+    register(name, controller, connect): connect(controller) läuft in einem
+    eigenen Thread, verbindet und initialisiert die Caches; Rückgabe ein
+    Info-Text (z.B. *IDN?).
+    """
+
+    def __init__(self):
+        self.instruments = {}      # name → (controller, connect)
+        self.status = {}           # name → Zustand
+        self.info = {}             # name → Info-Text nach erfolgreichem Connect
+        self.durations = {}        # name → Dauer des Connects [s]
+
+    @property
+    def rm(self):
+        return shared_resource_manager()
+
+    def register(self, name, controller, connect):
+        self.instruments[name] = (controller, connect)
+        self.status[name] = "idle"
+
+    def ready(self, name):
+        return self.status.get(name) == "ready"
+
+    def connect_all(self, names=None, on_status=None, on_done=None):
+        """
+        Alle (bzw. die angegebenen) Geräte gleichzeitig verbinden.
+        on_status(name, status, info) nach jeder Zustandsänderung,
+        on_done(status_dict) wenn alle fertig sind (beides aus Worker-Threads).
+        Rückgabe {name: Future}.
+        """
+        names = list(names or self.instruments)
+        if not names:
+            return {}
+        pool = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="connect")
+        futures = {n: pool.submit(self._connect_one, n, on_status) for n in names}
+        pool.shutdown(wait=False)
+        if on_done:
+            def waiter():
+                wait(list(futures.values()))
+                on_done(dict(self.status))
+            threading.Thread(target=waiter, daemon=True).start()
+        return futures
+
+    def _set(self, name, status, on_status, info=None):
+        self.status[name] = status
+        if on_status:
+            on_status(name, status, info)
+
+    def _connect_one(self, name, on_status):
+        controller, connect = self.instruments[name]
+        self._set(name, "connecting", on_status)
+        t0 = time.time()
+        try:
+            info = connect(controller)
+        except Exception as e:
+            self._set(name, f"failed: {e}", on_status)
+            raise
+        self.durations[name] = time.time() - t0
+        self.info[name] = info
+        self._set(name, "ready", on_status, info)
+        return info
@@ -1,10 +1,22 @@
-import pyvisa
+from pyvisa.errors import VisaIOError
 import numpy as np
+import hashlib
+import time
+
+from utils.data_processing import wait_until_stable
+from utils.executor import InstrumentExecutor, SerializedResource, serialized
+from utils.sweep_estimator import SweepTimeEstimator
+from controllers.simulated_osa import SimulatedOSA
+from controllers.connection_manager import shared_resource_manager
 
 class OSAController:
     def __init__(self):
         self.rm = None
         self.osa = None
+        self.estimator = SweepTimeEstimator()
+        self.executor = InstrumentExecutor("osa")   # serialisiert alle VISA-Zugriffe
+        self._axis = None          # gecachte Wellenlängenachse (read-only)
+        self.params = {}           # Spiegel der Geräteparameter {cmd: Antwort}
         
         #-------------------------- Aritsu Paramterlist -----------------------------------
         self.resolutions   = ["1.0","0.5","0.2","0.1","0.07","0.05","0.03"]
@@ -13,17 +25,132 @@ class OSAController:
         self.spans         = ["1200","1000","500","200","100","50","20","10","5","2","1"]
         self.smt_points    = ["OFF", "3", "5", "7", "9", "11"]
         
+        # Trace-Speicher (A/B/C) und Trace-Modi für Burst-/Hold-Aufnahmen
+        self.traces      = ["A", "B", "C"]
+        self.trace_modes = {"write": "WRITE", "fix": "FIX", "max": "MAX", "avg": "AVG"}
+        self.trace_select_cmd = "TSL {trace}"
+        self.trace_mode_cmd   = "TTP {trace},{mode}"
+
         self.cmd_map = {"Span [nm]:":"SPN","Resolution [nm]:":"RES","Integration:":"VBW",
                         "Sampling Points:":"MPT","Smooth:":"SMT","Reference LvL [dBm]:":"RLV",
                         "Level Offset [dB]:":"LOFS"}
     def connect(self, ip):
         if self.rm is None:
-            self.rm = pyvisa.ResourceManager()
-        self.osa = self.rm.open_resource(f"TCPIP0::{ip}::INSTR")
+            self.rm = shared_resource_manager()
+        self.osa = SerializedResource(self.rm.open_resource(f"TCPIP0::{ip}::INSTR"), self.executor)
         self.osa.timeout = 300_000
+        self.invalidate_params()
         idn = self.osa.query("*IDN?")
         return idn
 
+    # ─── Sweep-Dauer & Timeout ──────────────────────────────────────────────
+    def estimate_sweep(self, params):
+        """Geschätzte Sweep-Dauer [s] für params = dict(spn, res, vbw_hz, mpt, smt)."""
+        return self.estimator.estimate(**params)
+
+    def apply_sweep_timeout(self, params, factor=3.0, min_ms=60_000):
+        """
+        VISA-Timeout passend zur erwarteten Sweep-Dauer setzen (mindestens
+        min_ms); konservativ über das Default-Modell, auch wenn das Gerät
+        laut Kalibrierung schneller ist.
+        """
+        bound = self.estimator.upper_bound(**params)
+        timeout_ms = int(max(min_ms, factor * bound * 1000 + 5000))
+        if self.osa:
+            self.osa.timeout = timeout_ms
+        return timeout_ms
+
+    # ─── Wellenlängenachse (Cache) ───────────────────────────────────────────
+    def wavelength_axis(self, npts=None):
+        """
+        Wellenlängenachse des aktuellen Sweep-Fensters als gemeinsames,
+        schreibgeschütztes Array. DCA? wird nur nach invalidate_axis() oder bei
+        abweichender Punktzahl (npts) erneut abgefragt.
+        """
+        axis = self._axis
+        if axis is None or (npts is not None and axis.size != npts):
+            staw, stow, n = map(float, self.osa.query("DCA?").split(","))
+            axis = np.linspace(staw, stow, int(n))
+            axis.flags.writeable = False
+            self._axis = axis
+        return axis
+
+    def invalidate_axis(self):
+        """Nach Änderung von CNT/SPN/MPT (oder am Gerät) aufrufen."""
+        self._axis = None
+
+    # ─── Parameter-Cache ─────────────────────────────────────────────────────
+    AXIS_PARAMS = ("CNT", "SPN", "MPT")
+
+    @staticmethod
+    def _same_value(a, b, tol=0.0):
+        """Vergleich numerisch (mit Toleranz), sonst als String."""
+        if a is None or b is None:
+            return False
+        try:
+            return abs(float(a) - float(b)) <= tol
+        except (TypeError, ValueError):
+            return str(a).strip().upper() == str(b).strip().upper()
+
+    def invalidate_params(self):
+        self.params = {}
+        self._axis = None
+
+    @serialized
+    def read_params(self, cmds):
+        """
+        Mehrere Parameter in einer Abfrage lesen ("CNT?;SPN?;…"). Antwortet das
+        Gerät nicht mit einer Antwort pro Parameter, wird einzeln abgefragt
+        (fehlerhafte Parameter fehlen dann im Ergebnis). Aktualisiert den Cache.
+        """
+        cmds = list(cmds)
+        answers = self.osa.query(";".join(f"{c}?" for c in cmds)).strip().split(";")
+        if len(answers) == len(cmds):
+            result = {c: a.strip() for c, a in zip(cmds, answers)}
+        else:
+            result = {}
+            for c in cmds:
+                try:
+                    result[c] = self.osa.query(f"{c}?").strip()
+                except Exception:
+                    pass
+        if any(c in self.AXIS_PARAMS and not self._same_value(self.params.get(c), v)
+               for c, v in result.items()):
+            self.invalidate_axis()
+        self.params.update(result)
+        return result
+
+    @serialized
+    def set_params(self, params, tol=0.1):
+        """
+        params = {cmd: value} im Geräteformat (VBW in Hz). Unveränderte Werte
+        werden übersprungen, die übrigen als ein Compound-Kommando geschrieben
+        und gebündelt verifiziert. Rückgabe {cmd: Antwort} der geschriebenen
+        Parameter; ValueError, wenn das Gerät einen Wert nicht übernommen hat.
+        """
+        changed = {c: v for c, v in params.items()
+                   if not self._same_value(self.params.get(c), v)}
+        if not changed:
+            return {}
+        self.osa.write(";".join(f"{c} {v}" for c, v in changed.items()))
+        # Cache-Einträge verwerfen, bis die Verifikation sie neu gesetzt hat
+        for c in changed:
+            self.params.pop(c, None)
+        result = self.read_params(changed)
+        if any(c in self.AXIS_PARAMS for c in changed):
+            self.invalidate_axis()
+        bad = [f"{c}: expected {v}, got {result.get(c)}" for c, v in changed.items()
+               if not self._same_value(result.get(c), v, tol)]
+        if bad:
+            raise ValueError("; ".join(bad))
+        return result
+
+    def connect_simulated(self, **kwargs):
+        """Simuliertes Gerät statt VISA-Verbindung (Debug-Modus / Tests)."""
+        self.osa = SerializedResource(SimulatedOSA(**kwargs), self.executor)
+        self.invalidate_params()
+        return self.osa.query("*IDN?")
+
     def disconnect(self):
         try:
             if self.osa:
@@ -32,6 +159,7 @@ class OSAController:
         except Exception:
             pass
         self.osa = None
+        self.invalidate_params()
 
     def write(self, cmd):
         if self.osa:
@@ -42,11 +170,282 @@ class OSAController:
             return self.osa.query(cmd)
         return None
 
+    @serialized
+    def probe(self, cmd, timeout_ms=500):
+        """
+        Einmalige Abfrage mit kurzem VISA-Timeout für evtl. nicht unterstützte
+        Befehle; None, wenn das Gerät nicht oder fehlerhaft antwortet.
+        """
+        if not self.osa:
+            return None
+        old = self.osa.timeout
+        self.osa.timeout = timeout_ms
+        try:
+            return self.osa.query(cmd)
+        except Exception:
+            return None
+        finally:
+            self.osa.timeout = old
+
     def query_binary(self, cmd):
         if self.osa:
             return self.osa.query_binary_values(cmd)
         return None
 
+    # ─── Sweep-Ende über Status-Register ─────────────────────────────────────
+    def start_sweep(self, use_srq=False):
+        """
+        Startet einen Single Sweep und meldet das Ende über *OPC → ESR Bit 0
+        (Operation Complete) an. Mit use_srq zusätzlich Service Request über
+        das ESB-Bit des Status-Bytes.
+        """
+        self.osa.write("*CLS")
+        self.osa.write("*ESE 1")
+        if use_srq:
+            self.osa.write("*SRE 32")
+        self.osa.write("SSI")
+        self.osa.write("*OPC")
+
+    def sweep_done(self):
+        """Kurze, nicht blockierende Abfrage des Operation-Complete-Bits."""
+        return bool(int(float(self.osa.query("*ESR?"))) & 1)
+
+    def wait_sweep(self, abort=None, timeout=None, poll=0.05, use_srq=False):
+        """
+        Wartet auf das Sweep-Ende ohne die VISA-Session zu blockieren.
+        Gibt True bei Sweep-Ende, False bei Abbruch über abort (threading.Event)
+        zurück; nach timeout Sekunden wird TimeoutError ausgelöst.
+        """
+        t_end = time.time() + timeout if timeout else None
+        while True:
+            if abort is not None and abort.is_set():
+                return False
+            if use_srq:
+                try:
+                    self.osa.wait_for_srq(int(poll * 1000))
+                    self.osa.read_stb()
+                    if self.sweep_done():
+                        return True
+                except VisaIOError:
+                    pass
+            else:
+                if self.sweep_done():
+                    return True
+                time.sleep(poll)
+            if t_end is not None and time.time() > t_end:
+                raise TimeoutError("OSA sweep did not complete in time")
+
+    def sweep(self, params=None, abort=None, use_srq=False, timeout=None):
+        """
+        Single Sweep starten und abbrechbar auf das Ende warten. Ohne timeout
+        wird er aus params geschätzt; bei Abbruch/Timeout wird SST gesendet.
+        """
+        if timeout is None and params:
+            # großzügig: Schätzung kann bei unbekannten Presets daneben liegen
+            timeout = max(3 * self.estimator.upper_bound(**params) + 10, 60)
+        self.start_sweep(use_srq)
+        try:
+            done = self.wait_sweep(abort=abort, timeout=timeout, use_srq=use_srq)
+        except TimeoutError:
+            self.osa.write("SST")
+            raise
+        if not done:
+            self.osa.write("SST")
+        return done
+
+    # ─── Trace-Speicher ───────────────────────────────────────────────────────
+    @serialized
+    def set_trace_mode(self, trace, mode):
+        """Trace auswählen und Modus setzen (write/fix/max/avg)."""
+        self.osa.write(self.trace_select_cmd.format(trace=trace))
+        self.osa.write(self.trace_mode_cmd.format(trace=trace, mode=self.trace_modes[mode]))
 
+    @serialized
+    def read_traces(self, traces):
+        """Mehrere Trace-Speicher direkt nacheinander abholen: {trace: DM<trace>?-Antwort}."""
+        return {tr: self.osa.query(f"DM{tr}?") for tr in traces}
+
+    def _timed_sweep(self, params, abort, use_srq, on_sweep):
+        t0 = time.time()
+        done = self.sweep(params, abort=abort, use_srq=use_srq)
+        if done and on_sweep is not None:
+            on_sweep(time.time() - t0)
+        return done
+
+    def burst_capture(self, n, params=None, abort=None, use_srq=False, on_sweep=None):
+        """
+        n Sweeps nacheinander in die Trace-Speicher A, B, C… schreiben
+        (jeder Trace wird nach seinem Sweep eingefroren) und danach alle Traces
+        in einem Block übertragen. Rückgabe {trace: raw} oder None bei Abbruch.
+        on_sweep(Sekunden) erhält die Dauer jedes Sweeps (Kalibrierung).
+        """
+        traces = self.traces[:max(1, min(n, len(self.traces)))]
+        try:
+            for tr in traces:
+                self.set_trace_mode(tr, "write")
+                if not self._timed_sweep(params, abort, use_srq, on_sweep):
+                    return None
+                self.set_trace_mode(tr, "fix")
+            return self.read_traces(traces)
+        finally:
+            self.set_trace_mode(self.traces[0], "write")
+
+    def hold_capture(self, n, mode="max", params=None, abort=None, use_srq=False,
+                     on_sweep=None):
+        """
+        n Sweeps in Trace A mit Hardware-Max-Hold bzw. -Mittelung, danach eine
+        einzige Übertragung. Rückgabe raw (DMA?) oder None bei Abbruch.
+        """
+        tr = self.traces[0]
+        self.set_trace_mode(tr, mode)
+        try:
+            for _ in range(max(1, n)):
+                if not self._timed_sweep(params, abort, use_srq, on_sweep):
+                    return None
+            return self.read_traces([tr])[tr]
+        finally:
+            self.set_trace_mode(tr, "write")
+
+    # ─── Schnelle Messungen (Settling) ───────────────────────────────────────
+    @serialized
+    def read_power(self, wl_nm):
+        """Power-Monitor bei fester Wellenlänge, Rückgabe in dBm."""
+        if not self.osa:
+            return None
+        self.osa.write(f"PWR {wl_nm}")
+        self.osa.query("*OPC?")
+        return float(self.osa.query("PWRR?"))
+
+    def quick_sweep_peak(self, abort=None, timeout=None):
+        """
+        Single Sweep mit den aktuellen Einstellungen, Rückgabe (peak_dbm, wl_nm);
+        None bei Abbruch über abort oder wenn der Sweep timeout überschreitet.
+        """
+        if not self.osa:
+            return None
+        try:
+            if not self.sweep(abort=abort, timeout=timeout):
+                return None
+        except TimeoutError:
+            return None
+        dbm = np.fromstring(self.osa.query("DMA?"), dtype=float, sep="\r\n")
+        wl = self.wavelength_axis(dbm.size)
+        idx = int(np.nanargmax(dbm))
+        return dbm[idx], wl[idx]
+
+    def wait_settled(self, method="power", wl_nm=None, tol_db=0.2, n_stable=3,
+                     timeout=2.0, settle_mpt="51", abort=None, deadline=None):
+        """
+        Wartet, bis der Peak stabil ist: n_stable aufeinanderfolgende Messungen
+        liegen innerhalb tol_db. method="power" nutzt den Power-Monitor bei
+        wl_nm, method="sweep" schnelle Sweeps mit reduzierter Punktzahl (MPT
+        über set_params, danach wiederhergestellt). Abbruch über abort, Ende
+        spätestens zu deadline (time.time()). Rückgabe (stabil, Dauer in s).
+        """
+        t0 = time.time()
+        if deadline is not None:
+            timeout = max(min(timeout, deadline - t0), 0.0)
+        t_end = t0 + timeout
+        if method == "sweep":
+            mpt = self.params.get("MPT") or self.read_params(["MPT"])["MPT"]
+            self.set_params({"MPT": settle_mpt})
+
+            def read():
+                # Settle-Sweeps enden spätestens mit dem Settle-Timeout
+                peak = self.quick_sweep_peak(abort, max(t_end - time.time(), 0.01))
+                return None if peak is None else peak[0]
+        else:
+            read = lambda: self.read_power(wl_nm)
+        try:
+            stable = wait_until_stable(read, tol_db, n_stable, timeout, abort)
+        finally:
+            if method == "sweep":
+                self.set_params({"MPT": mpt})
+        return stable, time.time() - t0
+
+
+class SweepWatcher:
+    """
+    Erkennt im Repeat-Modus neue Sweeps, damit jeder physikalische Sweep genau
+    einmal abgeholt wird. Bevorzugt das Sweep-Complete-Bit im erweiterten
+    Event-Register (ESR2?); ob das Gerät darauf antwortet, wird beim Anlegen
+    einmal mit kurzem Timeout geprüft, sonst wird ein Hash der DMA?-Daten
+    verglichen. Zwischen den Abfragen wird anhand der
+    erwarteten Sweep-Dauer gewartet statt fest zu pollen.
+    """
+    SWEEP_EVENT_QUERY = "ESR2?"
+    SWEEP_EVENT_BIT   = 0x01
+    status_timeout_factor = 3.0
+
+    def __init__(self, controller, est_sweep_s=0.5, poll=0.05, probe_timeout_ms=500):
+        self.controller = controller
+        self.est = max(est_sweep_s, 0.01)
+        self.poll = poll
+        self.use_status = self._probe_status(probe_timeout_ms)
+        self._last_hash = None
+        self.t_last = None         # Zeitstempel des letzten erkannten Sweeps
+        self.rate = 0.0            # geglättete Sweep-Rate [1/s]
+        self.count = 0
+
+    def _probe_status(self, timeout_ms):
+        """ESR2? einmal mit kurzem Timeout abfragen: True, wenn eine Zahl zurückkommt."""
+        raw = self.controller.probe(self.SWEEP_EVENT_QUERY, timeout_ms)
+        try:
+            int(float(raw))
+            return True
+        except (TypeError, ValueError):
+            return False
+
+    def _status_bit(self):
+        try:
+            return bool(int(float(self.controller.query(self.SWEEP_EVENT_QUERY))) & self.SWEEP_EVENT_BIT)
+        except Exception:
+            self.use_status = False
+            return None
+
+    def next_sweep(self, abort, deadline=None):
+        """
+        Blockiert bis zum nächsten neuen Sweep und gibt (dma_raw, timestamp)
+        zurück, bzw. None wenn abort gesetzt wurde oder deadline (time.time())
+        überschritten ist. Kommt das Status-Bit nicht innerhalb von
+        status_timeout_factor × erwarteter Sweep-Dauer, wird dauerhaft auf den
+        DMA?-Hash umgeschaltet (andere Firmware / andere Bit-Bedeutung).
+        """
+        def remaining(t):
+            return t if deadline is None else min(t, deadline - time.time())
+
+        # bis kurz vor das erwartete Sweep-Ende schlafen
+        if self.t_last is not None:
+            wait = remaining(self.t_last + 0.8 * self.est - time.time())
+            if wait > 0 and abort.wait(wait):
+                return None
+        t_status_end = time.time() + max(self.status_timeout_factor * self.est, 1.0)
+        while not abort.is_set():
+            if deadline is not None and time.time() > deadline:
+                return None
+            if self.use_status:
+                bit = self._status_bit()
+                if bit:
+                    raw = self.controller.query("DMA?")
+                    return raw, self._mark(time.time())
+                if bit is not None:
+                    if time.time() < t_status_end:
+                        abort.wait(self.poll)
+                        continue
+                    self.use_status = False
+            raw = self.controller.query("DMA?")
+            h = hashlib.blake2b(raw.encode(), digest_size=16).digest()
+            if h != self._last_hash:
+                self._last_hash = h
+                return raw, self._mark(time.time())
+            abort.wait(self.poll)
+        return None
 
-    
\ No newline at end of file
+    def _mark(self, t):
+        if self.t_last is not None:
+            dt = t - self.t_last
+            self.est = 0.7 * self.est + 0.3 * dt
+            self.rate = 1.0 / self.est
+        self.t_last = t
+        self.count += 1
+        return t
@@ -1,16 +1,33 @@
-import pyvisa
 import numpy as np
 import time
 
+from utils.executor import InstrumentExecutor, SerializedResource, serialized
+from controllers.connection_manager import shared_resource_manager
+
 UNITS            = {"V": 1, "mV": 1e-3, "uV": 1e-6}
 SCALE_FACTOR     = {"V": 1, "mV": 1e3, "uV": 1e6}
 TRIGGER_SOURCES  = ["CH1", "CH2", "CH3", "CH4"]
+# Transferbreite [Byte] → Datentyp für CURVe? (RIBinary, big endian)
+WIDTH_DTYPE      = {1: "b", 2: "h"}
 
 class ScopeController:
+    # Preamble-Felder (WFMOutpre), in einer Compound-Abfrage gelesen
+    PREAMBLE_FIELDS = {
+        "byt_nr": ("BYT_Nr", int),
+        "nr_pt":  ("NR_Pt",  int),
+        "xincr":  ("XINcr",  float),
+        "xzero":  ("XZEro",  float),
+        "pt_off": ("PT_Off", float),
+        "ymult":  ("YMUlt",  float),
+        "yzero":  ("YZEro",  float),
+        "yoff":   ("YOFf",   float),
+    }
+
     def __init__(self):
-        self.rm = pyvisa.ResourceManager()
+        self.rm = None             # gemeinsamer ResourceManager, erst beim Connect
         self.scope = None
         self.connected = False
+        self.executor = InstrumentExecutor("scope")   # serialisiert alle VISA-Zugriffe
 
         # Caches
         self.channel_order    = ["CH1", "CH2", "CH3", "CH4"]
@@ -21,10 +38,28 @@ class ScopeController:
         self.timebase_s      = 1e-8  # Default (s/div)
         self.delay_time      = 0.0
         self.xinc            = 0.0
+        # Transferbreite je Betriebsart: 8 bit reicht für die Live-Ansicht
+        self.transfer_widths = {"live": 1, "capture": 2}
+        # Live-Konvertierung ohne Allokationen: Volt-Puffer je Kanal, Zeitachse je (n, xinc)
+        self._volt_buffers   = {}
+        self._time_axis      = None
+        self._time_axis_key  = None
+        # Änderungsindikator für die Preambles: Einstellungen, die Skalierung/Zeitachse
+        # bestimmen, als eine Abfrage; höchstens alle settings_check_interval Sekunden
+        self.settings_check_interval = 1.0
+        self._settings_sig   = None
+        self._settings_check = 0.0
+        # Acquisition-Zähler (ACQ:NUMACQ?): nur bei neuen Acquisitions Kurven holen
+        self.numacq_supported = True
+        self.last_numacq     = None
+        self.acq_rate        = 0.0     # Acquisitions/s, über ~1 s gemittelt
+        self._rate_ref       = None    # (Zeit, Zähler) am Anfang des Messfensters
 
     def connect(self, ip):
         try:
-            self.scope = self.rm.open_resource(f"TCPIP::{ip}::INSTR")
+            if self.rm is None:
+                self.rm = shared_resource_manager()
+            self.scope = SerializedResource(self.rm.open_resource(f"TCPIP::{ip}::INSTR"), self.executor)
             self.scope.timeout = 2000
             self.scope.write("HEADER OFF")
             self.scope.write("DATA:ENC RIBinary")
@@ -59,43 +94,103 @@ class ScopeController:
             return self.scope.query("*IDN?")
         return "No scope connected!"
 
+    @serialized
     def init_parameters(self):
         """Cache alle wichtigen Parameter bei Connect."""
-        # Record length
-        self.rec_length_cached = int(self.scope.query("HORizontal:RECordlength?"))
-        # Timebase und Delay
-        self.timebase_s = float(self.scope.query("HORizontal:MAIN:SCAle?"))
-        self.delay_time = float(self.scope.query("HORizontal:MAIN:DELay:TIME?"))
+        # Record length, Timebase, Delay und Trigger-Level in einer Abfrage
+        cmds = ["HORizontal:RECordlength?", "HORizontal:MAIN:SCAle?", "HORizontal:MAIN:DELay:TIME?"] \
+            + [f"TRIGger:A:LEVel:{ch}?" for ch in self.channel_order]
+        try:
+            answers = self.scope.query(";:".join(cmds)).strip().split(";")
+            if len(answers) != len(cmds):
+                raise ValueError("compound query not supported")
+            rec, tb, delay, *levels = (float(a) for a in answers)
+            self.rec_length_cached, self.timebase_s, self.delay_time = int(rec), tb, delay
+            self.trigger_levels.update(zip(self.channel_order, levels))
+        except Exception:
+            self._init_parameters_serial()
         divisions = 10
         total_time = self.timebase_s * divisions
         self.xinc = total_time / self.rec_length_cached
-        # Trigger Level per Channel
+        # Änderungsindikator merken, dann Preambles (eine Abfrage je Kanal)
+        self._settings_sig = None
+        self.check_settings(force=True)
+        self.wfmpre_cache.clear()
+        for ch in self.channel_order:
+            self.cache_channel_settings(ch, self.transfer_widths["live"])
+
+    def _init_parameters_serial(self):
+        """Fallback: Parameter einzeln abfragen."""
+        self.rec_length_cached = int(self.scope.query("HORizontal:RECordlength?"))
+        self.timebase_s = float(self.scope.query("HORizontal:MAIN:SCAle?"))
+        self.delay_time = float(self.scope.query("HORizontal:MAIN:DELay:TIME?"))
         for ch in self.channel_order:
             try:
                 lvl = float(self.scope.query(f"TRIGger:A:LEVel:{ch}?"))
             except Exception:
                 lvl = float(self.scope.query("TRIGger:A:LEVel?"))
             self.trigger_levels[ch] = lvl
-        # Per Channel Kalibrierung
-        for ch in self.channel_order:
-            self.cache_channel_settings(ch)
 
-    def cache_channel_settings(self, ch):
-        """Holt YMULT, YZERO, YOFF für ch."""
+    @serialized
+    def read_preamble(self, ch, width=2):
+        """
+        Preamble von ch für die Transferbreite width in einer Abfrage lesen
+        ("WFMOutpre:BYT_Nr?;NR_Pt?;…"); YMULT/YOFF hängen von der Breite ab.
+        Rückgabe dict mit byt_nr, nr_pt, xincr, xzero, pt_off, ymult, yzero, yoff.
+        """
+        self.scope.write(f"DATA:SOURCE {ch};:DATA:WIDTH {width}")
+        names = list(self.PREAMBLE_FIELDS)
+        cmds = [f"{self.PREAMBLE_FIELDS[n][0]}?" for n in names]
+        answers = self.scope.query("WFMOutpre:" + ";".join(cmds)).strip().split(";")
+        if len(answers) != len(names):
+            # Fallback: Felder einzeln
+            answers = [self.scope.query(f"WFMOutpre:{c}") for c in cmds]
+        return {n: self.PREAMBLE_FIELDS[n][1](float(a)) for n, a in zip(names, answers)}
+
+    @serialized
+    def cache_channel_settings(self, ch, width=2):
+        """Preamble von (ch, width) in den Cache holen (None bei Fehler, z.B. Kanal aus)."""
+        key = (ch, width)
         try:
-            self.scope.write(f"DATA:SOURCE {ch}")
-            self.scope.write("DATA:ENC RIBinary")
-            self.scope.write("DATA:WIDTH 2")
-            time.sleep(0.01)
-            self.wfmpre_cache[ch] = {
-                "ymult": float(self.scope.query("WFMPRE:YMULT?")),
-                "yzero": float(self.scope.query("WFMPRE:YZERO?")),
-                "yoff":  float(self.scope.query("WFMPRE:YOFF?")),
-            }
+            self.wfmpre_cache[key] = self.read_preamble(ch, width)
+            self.xinc = self.wfmpre_cache[key]["xincr"]
         except Exception as e:
             print(f"{ch} cache error: {e}")
-            self.wfmpre_cache[ch] = None
+            self.wfmpre_cache[key] = None
+        return self.wfmpre_cache[key]
 
+    def _settings_query(self):
+        cmds = [f"{ch}:{c}?" for ch in self.channel_order for c in ("SCAle", "POSition", "OFFSet")]
+        cmds += ["HORizontal:MAIN:SCAle?", "HORizontal:RECordlength?"]
+        return ";:".join(cmds)
+
+    @serialized
+    def check_settings(self, force=False):
+        """
+        Billiger Änderungsindikator: V/div, Position, Offset aller Kanäle sowie
+        Timebase und Record Length in einer Abfrage. Hat sich etwas geändert
+        (z.B. am Frontpanel), wird der Preamble-Cache verworfen.
+        Rückgabe True, wenn der Cache verworfen wurde.
+        """
+        now = time.time()
+        if not force and now - self._settings_check < self.settings_check_interval:
+            return False
+        self._settings_check = now
+        sig = self.scope.query(self._settings_query()).strip()
+        if sig == self._settings_sig:
+            return False
+        stale = self._settings_sig is not None
+        self._settings_sig = sig
+        if stale:
+            self.wfmpre_cache.clear()
+            try:
+                *_, tb, rec = sig.split(";")
+                self.timebase_s, self.rec_length_cached = float(tb), int(float(rec))
+            except ValueError:
+                pass
+        return stale
+
+    @serialized
     def set_trigger_source(self, src):
         self.scope.write(f"TRIGger:A:EDGE:SOUR {src}")
         self.scope.write("TRIGger:A:MODE EDGE")
@@ -108,6 +203,7 @@ class ScopeController:
         self.scope.write(f"TRIGger:A:LEVel:{ch} {value_v}")
         self.trigger_levels[ch] = value_v
 
+    @serialized
     def set_timebase(self, value_ns):
         self.scope.write(f"HORizontal:MAIN:SCAle {value_ns*1e-9}")
         self.timebase_s = float(self.scope.query("HORizontal:MAIN:SCAle?"))
@@ -115,6 +211,7 @@ class ScopeController:
     def set_acquisition_mode(self, mode):
         self.scope.write(f"ACQ:MODE {mode}")
 
+    @serialized
     def set_average_count(self, count):
         self.scope.write("ACQ:MODE AVERAGE")
         self.scope.write(f"ACQ:AVER:COUN {count}")
@@ -128,22 +225,81 @@ class ScopeController:
     def single(self):
         self.scope.write("ACQ:STATE SINGLE")
 
+    @serialized
+    def acquisition_count(self):
+        """Anzahl Acquisitions seit dem letzten Start (ACQ:NUMACQ?)."""
+        return int(float(self.scope.query("ACQuire:NUMACq?")))
+
+    def poll_acquisition(self):
+        """
+        True, wenn seit dem letzten Aufruf eine neue Acquisition vorliegt.
+        Aktualisiert nebenbei acq_rate. Kennt das Gerät NUMACQ nicht, immer True.
+        """
+        if not self.numacq_supported:
+            return True
+        try:
+            count = self.acquisition_count()
+        except Exception as e:
+            print(f"NUMACQ not available, fetching every tick: {e}")
+            self.numacq_supported = False
+            return True
+        now = time.time()
+        if self._rate_ref is None or count < self._rate_ref[1]:
+            # erster Aufruf oder Zähler zurückgesetzt (Run/Stop, Einstellungen)
+            self._rate_ref = (now, count)
+        elif now - self._rate_ref[0] >= 1.0:
+            t0, c0 = self._rate_ref
+            self.acq_rate = (count - c0) / (now - t0)
+            self._rate_ref = (now, count)
+        new = count != self.last_numacq
+        self.last_numacq = count
+        return new
+
     def get_channel_list(self):
         return self.channel_order.copy()
 
-    def get_waveform(self, ch):
-        self.scope.write("DATA:START 1")
+    @serialized
+    def get_waveform(self, ch, mode="capture"):
+        """
+        Kurve von ch in Volt. mode wählt die Transferbreite aus transfer_widths
+        ("live": 1 Byte, "capture": 2 Byte); die Volt-Werte sind in beiden Fällen gleich skaliert.
+        Im Live-Modus ist v ein wiederverwendeter Kanal-Puffer (wird beim nächsten
+        Frame überschrieben), t eine schreibgeschützte, gecachte Zeitachse.
+        """
+        width = self.transfer_widths[mode]
+        # Preambles verwerfen, wenn sich Skalierung/Timebase geändert hat
+        self.check_settings()
         stop = min(self.rec_length_cached, 2000)
-        self.scope.write(f"DATA:STOP {stop}")
-        self.scope.write(f"DATA:SOURCE {ch}")
+        self.scope.write(f"DATA:START 1;:DATA:STOP {stop};:DATA:SOURCE {ch};:DATA:WIDTH {width}")
         time.sleep(0.002)
+        key = (ch, width)
+        if key not in self.wfmpre_cache:
+            self.cache_channel_settings(ch, width)
+        p = self.wfmpre_cache.get(key)
+        if not p:
+            return None, None
         raw = self.scope.query_binary_values(
-            "CURVe?", datatype="h", is_big_endian=True, container=np.array
+            "CURVe?", datatype=WIDTH_DTYPE[width], is_big_endian=True, container=np.array
         )
-        p = self.wfmpre_cache.get(ch)
-        if p:
-            v = (raw - p["yoff"]) * p["ymult"] + p["yzero"]
-            t = np.arange(len(v)) * self.xinc * 1e9
-            return t, v
+        if mode == "live":
+            v = self._volt_buffer(ch, len(raw))
         else:
-            return None, None
+            v = np.empty(len(raw))
+        np.subtract(raw, p["yoff"], out=v)
+        np.multiply(v, p["ymult"], out=v)
+        np.add(v, p["yzero"], out=v)
+        return self.time_axis(len(v), p["xincr"]), v
+
+    def _volt_buffer(self, ch, n):
+        buf = self._volt_buffers.get(ch)
+        if buf is None or buf.size != n:
+            buf = self._volt_buffers[ch] = np.empty(n)
+        return buf
+
+    def time_axis(self, n, xincr):
+        """Zeitachse [ns] aus dem Sample-Abstand der Preamble, gecacht je (n, xincr)."""
+        if self._time_axis_key != (n, xincr):
+            t = np.arange(n) * (xincr * 1e9)
+            t.setflags(write=False)
+            self._time_axis, self._time_axis_key = t, (n, xincr)
+        return self._time_axis
@@ -0,0 +1,202 @@
+import threading
+import time
+
+import numpy as np
+from pyvisa import constants
+from pyvisa.errors import VisaIOError
+
+
+class SimulatedOSA:
+    """
+    Simulierte pyvisa-Resource eines Anritsu MS9740A für den Debug-Modus und
+    Tests ohne Gerät. Unterstützt die von OSAController/OSAGUI benutzten
+    Befehle inkl. *OPC/*ESR?/SRQ, Repeat-Sweeps und Power-Monitor.
+    """
+
+    def __init__(self, sweep_time=0.5, peak_wl=1548.5, peak_dbm=-20.0):
+        self.timeout = 300_000
+        self.sweep_time = sweep_time       # Dauer eines Sweeps [s]
+        self.peak_wl = peak_wl
+        self.peak_dbm = peak_dbm
+        self.noise_dbm = -75.0
+        self.params = {"CNT": 1548.5, "SPN": 2.0, "RES": 0.1, "VBW": 1000.0,
+                       "MPT": 501, "SMT": "OFF", "RLV": 0.0, "LOFS": 0.0, "LOG": 5}
+        self._lock = threading.Lock()
+        self._sweep_end = None             # Ende des laufenden Single Sweeps
+        self._repeat_t0 = None             # Start der Repeat-Sweeps
+        self._opc_pending = False
+        self._esr = 0
+        self._ese = 0
+        self._sre = 0
+        self._sweep_count = 0
+        self._esr2 = 0                     # Bit 0: Sweep beendet
+        self._power_wl = None
+        self._trace = np.array([])
+        # Trace-Speicher A/B/C mit Modus WRITE/FIX/MAX/AVG
+        self._active = "A"
+        self._traces = {tr: np.array([]) for tr in "ABC"}
+        self._modes = {tr: "WRITE" for tr in "ABC"}
+        self._avg_n = 0
+
+    # ─── pyvisa-Resource-API ─────────────────────────────────────────────────
+    def write(self, cmd):
+        for part in cmd.split(";"):
+            part = part.strip().lstrip(":")
+            if part:
+                self._handle_write(part)
+
+    def query(self, cmd):
+        answers = []
+        for part in cmd.split(";"):
+            part = part.strip().lstrip(":")
+            if not part:
+                continue
+            if part.endswith("?"):
+                answers.append(self._handle_query(part))
+            else:
+                self._handle_write(part)
+        return ";".join(answers) + "\n"
+
+    def read_stb(self):
+        self._update()
+        esb = 32 if self._esr & self._ese else 0
+        return esb | (64 if esb and self._sre & 32 else 0)
+
+    def wait_for_srq(self, timeout=25000):
+        t_end = time.time() + timeout / 1000
+        while time.time() < t_end:
+            if self.read_stb() & 64:
+                return
+            time.sleep(0.005)
+        raise VisaIOError(constants.StatusCode.error_timeout)
+
+    def close(self):
+        self._sweep_end = None
+        self._repeat_t0 = None
+
+    # ─── Gerätelogik ─────────────────────────────────────────────────────────
+    def _update(self):
+        """Sweep-Zustand anhand der Uhr fortschreiben."""
+        now = time.time()
+        with self._lock:
+            if self._sweep_end is not None and now >= self._sweep_end:
+                self._sweep_end = None
+                self._finish_sweep()
+                if self._opc_pending:
+                    self._opc_pending = False
+                    self._esr |= 1
+            if self._repeat_t0 is not None:
+                n = int((now - self._repeat_t0) / self.sweep_time)
+                while self._sweep_count < n:
+                    self._finish_sweep()
+
+    def _finish_sweep(self):
+        self._sweep_count += 1
+        self._esr2 |= 1
+        self._trace = self._spectrum()
+        tr, mode = self._active, self._modes[self._active]
+        old = self._traces[tr]
+        if mode == "FIX":
+            return
+        if mode == "MAX" and old.size == self._trace.size:
+            self._traces[tr] = np.maximum(old, self._trace)
+        elif mode == "AVG" and old.size == self._trace.size:
+            self._avg_n += 1
+            lin = (10 ** (old / 10) * (self._avg_n - 1) + 10 ** (self._trace / 10)) / self._avg_n
+            self._traces[tr] = 10 * np.log10(lin)
+        else:
+            self._avg_n = 1
+            self._traces[tr] = self._trace
+
+    def _axis(self):
+        cnt, spn, mpt = float(self.params["CNT"]), float(self.params["SPN"]), int(self.params["MPT"])
+        return cnt - spn / 2, cnt + spn / 2, mpt
+
+    def _spectrum(self):
+        sta, sto, mpt = self._axis()
+        wl = np.linspace(sta, sto, mpt)
+        width = max(float(self.params["RES"]), 0.01)
+        drift = 0.002 * np.sin(time.time())
+        lin = 10 ** (self.peak_dbm / 10) / (1 + ((wl - self.peak_wl - drift) / (width / 2)) ** 2)
+        lin += 10 ** ((self.noise_dbm + np.random.normal(0, 1.0, mpt)) / 10)
+        return 10 * np.log10(lin)
+
+    def _handle_write(self, cmd):
+        head, _, arg = cmd.partition(" ")
+        head = head.upper()
+        self._update()
+        if head == "*CLS":
+            self._esr = 0
+            self._esr2 = 0
+        elif head == "*ESE":
+            self._ese = int(arg)
+        elif head == "*SRE":
+            self._sre = int(arg)
+        elif head == "*OPC":
+            if self._sweep_end is None:
+                self._esr |= 1
+            else:
+                self._opc_pending = True
+        elif head == "SSI":
+            self._repeat_t0 = None
+            self._power_wl = None
+            self._sweep_end = time.time() + self.sweep_time
+        elif head == "SRT":
+            self._power_wl = None
+            self._sweep_end = None
+            self._repeat_t0 = time.time()
+            self._sweep_count = 0
+        elif head == "SST":
+            self._sweep_end = None
+            self._repeat_t0 = None
+        elif head == "TSL":
+            self._active = arg.strip().upper()
+        elif head == "TTP":
+            tr, _, mode = arg.partition(",")
+            self._modes[tr.strip().upper()] = mode.strip().upper()
+            if mode.strip().upper() in ("MAX", "AVG"):
+                self._traces[tr.strip().upper()] = np.array([])
+        elif head == "PWR":
+            self._repeat_t0 = None
+            self._power_wl = float(arg)
+        elif head in self.params:
+            self.params[head] = arg.strip() if head == "SMT" else float(arg)
+
+    def _handle_query(self, cmd):
+        head = cmd[:-1].upper()
+        self._update()
+        if head == "*IDN":
+            return "ANRITSU,MS9740A-SIM,0,1.0"
+        if head == "*OPC":
+            # blockiert wie das echte Gerät bis zum Sweep-Ende
+            t_end = time.time() + self.timeout / 1000
+            while self._sweep_end is not None:
+                if time.time() > t_end:
+                    raise VisaIOError(constants.StatusCode.error_timeout)
+                time.sleep(0.005)
+                self._update()
+            return "1"
+        if head == "*ESR":
+            esr, self._esr = self._esr, 0
+            return str(esr)
+        if head == "ESR2":
+            esr2, self._esr2 = self._esr2, 0
+            return str(esr2)
+        if head == "*STB":
+            return str(self.read_stb())
+        if head == "DCA":
+            sta, sto, mpt = self._axis()
+            return f"{sta:.3f},{sto:.3f},{mpt}"
+        if head in ("DMA", "DMB", "DMC"):
+            tr = head[-1]
+            if self._traces[tr].size == 0:
+                self._traces[tr] = self._spectrum()
+            return "\r\n".join(f"{v:.2f}" for v in self._traces[tr])
+        if head == "PWRR":
+            wl = self._power_wl if self._power_wl is not None else self.peak_wl
+            width = max(float(self.params["RES"]), 0.01)
+            lin = 10 ** (self.peak_dbm / 10) / (1 + ((wl - self.peak_wl) / (width / 2)) ** 2)
+            return f"{10 * np.log10(lin + 10 ** (self.noise_dbm / 10)):.2f}"
+        if head in self.params:
+            return str(self.params[head])
+        return "0"
@@ -1,18 +1,43 @@
-import pyvisa
+from controllers.connection_manager import shared_resource_manager
+from utils.dispatcher import CoalescingDispatcher
+from utils.executor import InstrumentExecutor, SerializedResource, serialized
 
 class WavegenController:
+    # Parameter → SCPI-Befehl je Kanal (Reihenfolge = Sende-Reihenfolge)
+    PARAM_CMDS = {
+        "func":   "SOUR{ch}:FUNC",
+        "volt":   "SOUR{ch}:VOLT",
+        "offs":   "SOUR{ch}:VOLT:OFFS",
+        "width":  "SOUR{ch}:PULS:WIDT",
+        "load":   "OUTP{ch}:LOAD",
+        "freq":   "SOUR{ch}:FREQ",
+        "phase":  "SOUR{ch}:PHAS",
+        "output": "OUTP{ch}",
+    }
+
     def __init__(self):
-        self.rm = pyvisa.ResourceManager()
+        self.rm = None             # gemeinsamer ResourceManager, erst beim Connect
         self.gen = None
+        self.executor = InstrumentExecutor("wavegen")   # serialisiert alle VISA-Zugriffe
+        # Spiegel des Gerätezustands je Kanal {param: Wert}, leer = unbekannt
+        self.state = {1: {}, 2: {}}
+        # schnelle UI-Eingaben (Frequenz-Buttons, Delay) gebündelt senden
+        self.dispatcher = CoalescingDispatcher(min_interval=0.05, name="wavegen-dispatch")
 
     def connect(self, ip):
-        self.gen = self.rm.open_resource(f"TCPIP0::{ip}::inst0::INSTR", timeout=5000)
+        if self.rm is None:
+            self.rm = shared_resource_manager()
+        self.gen = SerializedResource(
+            self.rm.open_resource(f"TCPIP0::{ip}::inst0::INSTR", timeout=5000), self.executor)
+        self.invalidate()
         return self.gen
 
     def disconnect(self):
+        self.dispatcher.cancel()
         if self.gen:
             self.gen.close()
             self.gen = None
+        self.invalidate()
 
     def write(self, cmd):
         if self.gen:
@@ -22,3 +47,119 @@ class WavegenController:
         if self.gen:
             return self.gen.query(cmd)
         return None
+
+    # ─── Zustandsspiegel ─────────────────────────────────────────────────────
+    @staticmethod
+    def _scpi_token(value):
+        """SCPI-Wert normiert: Anführungszeichen weg, "PULSe" → Kurzform "PULS"."""
+        s = str(value).strip().strip('"\'')
+        if s != s.upper() and s != s.lower():
+            # gemischte Schreibweise = SCPI-Notation, Großbuchstaben bilden die Kurzform
+            s = "".join(c for c in s if not c.islower())
+        return s.upper()
+
+    @classmethod
+    def _same(cls, a, b):
+        """Vergleich numerisch, sonst normierte SCPI-Werte ("PULS" == "PULSe")."""
+        if a is None or b is None:
+            return False
+        if isinstance(a, bool) or isinstance(b, bool):
+            return bool(a) == bool(b)
+        try:
+            fa, fb = float(a), float(b)
+            return abs(fa - fb) <= 1e-9 * max(abs(fa), abs(fb), 1.0)
+        except (TypeError, ValueError):
+            return cls._scpi_token(a) == cls._scpi_token(b)
+
+    @staticmethod
+    def _format(param, value):
+        if param == "output":
+            return "ON" if value else "OFF"
+        return str(value)
+
+    @staticmethod
+    def _parse(param, resp):
+        resp = resp.strip()
+        if param == "output":
+            return resp.upper() in ("1", "ON")
+        if param == "func":
+            return resp
+        return float(resp)
+
+    def invalidate(self, channel=None, *params):
+        """Gespiegelten Zustand verwerfen (ganzer Kanal oder einzelne Parameter)."""
+        for ch in ([channel] if channel else list(self.state)):
+            if params:
+                for p in params:
+                    self.state[ch].pop(p, None)
+            else:
+                self.state[ch] = {}
+
+    @serialized
+    def apply(self, channel, **params):
+        """
+        Gewünschten Zustand setzen: nur Parameter, die vom bekannten Zustand
+        abweichen, werden in einem Compound-Kommando gesendet.
+        Rückgabe: gesendeter Befehl ("" wenn nichts zu tun war).
+        """
+        known = self.state[channel]
+        cmds = []
+        for p in self.PARAM_CMDS:
+            if p in params and not self._same(known.get(p), params[p]):
+                cmds.append(f"{self.PARAM_CMDS[p].format(ch=channel)} {self._format(p, params[p])}")
+        if not cmds or not self.gen:
+            return ""
+        cmd = ";:".join(cmds)
+        try:
+            self.gen.write(cmd)
+        except Exception:
+            # Zustand unklar → beim nächsten Mal neu lesen
+            self.invalidate(channel, *params)
+            raise
+        known.update(params)
+        return cmd
+
+    def set_frequency(self, channel, freq):
+        """Frequenz setzen: höchstens ein einzelner Write."""
+        return self.apply(channel, freq=freq)
+
+    def set_frequency_later(self, channel, freq, on_error=None):
+        """Frequenz über den Dispatcher setzen: nur der letzte Wert wird gesendet."""
+        self.dispatcher.submit(("freq", channel), lambda: self.set_frequency(channel, freq), on_error)
+
+    def set_output(self, channel, on):
+        return self.apply(channel, output=bool(on))
+
+    @serialized
+    def refresh(self, channel, *params):
+        """
+        Parameter (Default: alle) in einer gebündelten Abfrage neu lesen und
+        den Spiegel aktualisieren. Rückgabe {param: Wert}.
+        """
+        params = list(params or self.PARAM_CMDS)
+        cmds = [f"{self.PARAM_CMDS[p].format(ch=channel)}?" for p in params]
+        answers = self.gen.query(";:".join(cmds)).strip().split(";")
+        if len(answers) != len(params):
+            answers = [self.gen.query(c) for c in cmds]
+        values = {p: self._parse(p, a) for p, a in zip(params, answers)}
+        self.state[channel].update(values)
+        return values
+
+    def get_many(self, channel, *params):
+        """Mehrere gespiegelte Werte; fehlende in einer gebündelten Abfrage nachladen."""
+        missing = [p for p in params if p not in self.state[channel]]
+        if missing:
+            self.refresh(channel, *missing)
+        return {p: self.state[channel][p] for p in params}
+
+    def get(self, channel, param, refresh=False):
+        """Gespiegelter Wert, nur bei unbekanntem Zustand (oder refresh) vom Gerät."""
+        if refresh or param not in self.state[channel]:
+            self.refresh(channel, param)
+        return self.state[channel][param]
+
+    def frequency(self, channel=1, refresh=False):
+        return self.get(channel, "freq", refresh)
+
+    def output_state(self, channel, refresh=False):
+        return self.get(channel, "output", refresh)
@@ -1,26 +1,150 @@
+import tkinter as tk
 from tkinter import ttk
-from gui.widgets.scope_gui import ScopeGUI
-from gui.widgets.wavegen_gui import WavegenGUI
-from gui.widgets.osa_gui import OSAGUI
-from utils.plot_viewer import PlotViewer
+from controllers.connection_manager import ConnectionManager
 
 class MainGUI(ttk.Frame):
-    def __init__(self, parent, scope_ctrl, wavegen_ctrl, osa_ctrl):
+    def __init__(self, parent, scope_ctrl, wavegen_ctrl, osa_ctrl, connections=None):
         super().__init__(parent)
         self.pack(fill="both", expand=True)
+        self.connections = connections or ConnectionManager()
+        self.scope_ctrl, self.wavegen_ctrl, self.osa_ctrl = scope_ctrl, wavegen_ctrl, osa_ctrl
+
+        # Connect All + Bereitschaft je Gerät
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", padx=5, pady=(5,0))
+        self.connect_all_btn = tk.Button(bar, text="Connect All", bg="red", fg="white",
+                                         command=self.connect_all)
+        self.connect_all_btn.pack(side="left", padx=5)
+        self.conn_labels = {}
+        for name in ("OSA", "Scope", "Wavegen"):
+            lbl = tk.Label(bar, text=f"{name}: --", fg="gray")
+            lbl.pack(side="left", padx=8)
+            self.conn_labels[name] = lbl
 
         # Tab Control
-        notebook = ttk.Notebook(self)
-        notebook.pack(fill="both", expand=True)
-
-        # Tabs
-        scope_tab   = ScopeGUI(notebook, controller=scope_ctrl)
-        wavegen_tab = WavegenGUI(notebook, controller=wavegen_ctrl)
-        osa_tab     = OSAGUI(notebook, controller=osa_ctrl, wavegen_controller=wavegen_ctrl)
-        plot_tab    = PlotViewer(notebook)  # <- das war der Fehler: vorher war 'tab_control'
-
-        # Tabs hinzufügen
-        notebook.add(osa_tab, text="OSA")
-        notebook.add(scope_tab, text="Oscilloscope")
-        notebook.add(wavegen_tab, text="Wavegen")
-        notebook.add(plot_tab, text="Plot Viewer")  # <- jetzt korrekt eingefügt
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill="both", expand=True)
+
+        # Tabs nur als Platzhalter anlegen, Inhalt (inkl. matplotlib) erst beim ersten Auswählen
+        self._tab_factories = {
+            "OSA":          self._make_osa_tab,
+            "Oscilloscope": self._make_scope_tab,
+            "Wavegen":      self._make_wavegen_tab,
+            "Plot Viewer":  self._make_plot_tab,
+        }
+        self._tab_frames = {}
+        self.tabs = {}
+        for name in self._tab_factories:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=name)
+            self._tab_frames[name] = frame
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        # ersten Tab erst bauen, wenn das Fenster steht
+        self.after_idle(self._on_tab_changed)
+
+    # ─── Lazy Tabs ────────────────────────────────────────────────────────────
+    def _make_osa_tab(self, parent):
+        from gui.widgets.osa_gui import OSAGUI
+        return OSAGUI(parent, controller=self.osa_ctrl, wavegen_controller=self.wavegen_ctrl)
+
+    def _make_scope_tab(self, parent):
+        from gui.widgets.scope_gui import ScopeGUI
+        return ScopeGUI(parent, controller=self.scope_ctrl)
+
+    def _make_wavegen_tab(self, parent):
+        from gui.widgets.wavegen_gui import WavegenGUI
+        return WavegenGUI(parent, controller=self.wavegen_ctrl, osa_controller=self.osa_ctrl)
+
+    def _make_plot_tab(self, parent):
+        from utils.plot_viewer import PlotViewer
+        return PlotViewer(parent)
+
+    def tab(self, name):
+        """Tab-Widget holen, beim ersten Zugriff bauen."""
+        if name not in self.tabs:
+            widget = self._tab_factories[name](self._tab_frames[name])
+            widget.pack(fill="both", expand=True)
+            self.tabs[name] = widget
+        return self.tabs[name]
+
+    def _on_tab_changed(self, event=None):
+        try:
+            name = self.notebook.tab(self.notebook.select(), "text")
+        except tk.TclError:
+            return
+        self.tab(name)
+
+    @property
+    def osa_tab(self):
+        return self.tab("OSA")
+
+    @property
+    def scope_tab(self):
+        return self.tab("Oscilloscope")
+
+    @property
+    def wavegen_tab(self):
+        return self.tab("Wavegen")
+
+    # ─── Connect All ──────────────────────────────────────────────────────────
+    def _register_instruments(self):
+        """Connect-Funktionen mit den aktuellen IPs (Tk-Variablen nur hier im GUI-Thread lesen)."""
+        osa_ip  = self.osa_tab.osa_ip.get().strip()
+        osa_sim = self.osa_tab.debug_modus.get()
+        scope_ip = self.scope_tab.scope_ip.get().strip()
+        wg_ip   = self.wavegen_tab.ip_entry.get().strip()
+
+        def connect_scope(ctrl):
+            if not ctrl.connect(scope_ip):
+                raise ConnectionError(f"no scope at {scope_ip}")
+            return f"{ctrl.rec_length_cached} pts"
+
+        def connect_wavegen(ctrl):
+            ctrl.connect(wg_ip)
+            # Zustandsspiegel beider Kanäle gleich im Connect-Thread füllen
+            ctrl.refresh(1)
+            ctrl.refresh(2)
+            return wg_ip
+
+        osa_tab = self.osa_tab
+        self.connections.register("OSA", osa_tab.controller,
+                                  lambda ctrl: osa_tab.open_connection(osa_ip, osa_sim))
+        self.connections.register("Scope", self.scope_tab.controller, connect_scope)
+        self.connections.register("Wavegen", self.wavegen_tab.controller, connect_wavegen)
+
+    def connect_all(self):
+        names = [n for n, tab, connected in (
+            ("OSA", self.osa_tab, self.osa_tab.connection_state.get() == "connected"),
+            ("Scope", self.scope_tab, self.scope_tab.controller.is_connected()),
+            ("Wavegen", self.wavegen_tab, self.wavegen_tab.controller.gen is not None),
+        ) if not connected]
+        if not names:
+            return
+        self._register_instruments()
+        self.connect_all_btn.config(state="disabled", bg="yellow", fg="black")
+        self.connections.connect_all(
+            names,
+            on_status=lambda n, st, info: self.after(0, self._on_conn_status, n, st, info),
+            on_done=lambda status: self.after(0, self._on_conn_done, status))
+
+    def _on_conn_status(self, name, status, info):
+        lbl = self.conn_labels[name]
+        if status == "ready":
+            dt = self.connections.durations.get(name, 0.0)
+            lbl.config(text=f"{name}: ready ({dt:.1f} s)", fg="green")
+            if name == "OSA":
+                self.osa_tab.on_connected(info)
+            elif name == "Scope":
+                self.scope_tab.on_connected()
+            elif name == "Wavegen":
+                self.wavegen_tab.on_connected()
+                self.osa_tab.on_wavegen_connected()
+        elif status == "connecting":
+            lbl.config(text=f"{name}: connecting…", fg="orange")
+        else:
+            lbl.config(text=f"{name}: {status}", fg="red")
+
+    def _on_conn_done(self, status):
+        all_ready = all(st == "ready" for st in status.values() if st != "idle")
+        self.connect_all_btn.config(state="normal", fg="white",
+                                    bg="green" if all_ready else "red")
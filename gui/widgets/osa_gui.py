@@ -6,11 +6,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.ticker import MaxNLocator, AutoMinorLocator
-from scipy.signal import find_peaks
 import tkinter.simpledialog as simpledialog
-from controllers.osa_controller import OSAController
+from controllers.osa_controller import OSAController, SweepWatcher
 import os
 
+from utils.sweep_estimator import format_duration
+from utils.pipeline import TwoStagePipeline
+from utils.data_processing import find_peaks
+from utils.decimation import MinMaxDecimator
+from utils.executor import submit_to_tk
 from utils.helpers import (
     CreateToolTip,
     integration_string_to_hz,
@@ -21,7 +25,9 @@ from utils.helpers import (
     save_event_log,
     save_with_metadata,
     get_lin_unit_and_data,
-    meta_daten)
+    meta_daten,
+    list_index_for_sweep,
+    tracking_window)
 
 class OSAGUI(ttk.Frame):
     def __init__(self, parent, controller=None, wavegen_controller=None):
@@ -65,10 +71,17 @@ class OSAGUI(ttk.Frame):
         self.scan_abort     = threading.Event()
         self.pause_event   = threading.Event()
         self.scan_running  = False    # Thread aktiv (auch wenn gerade pausiert)
+        self.use_srq       = tk.BooleanVar(value=False)   # Sweep-Ende per SRQ statt ESR-Polling
+        # Burst-Aufnahme über die Trace-Speicher
+        self.burst_count   = tk.IntVar(value=3)
+        self.burst_mode    = tk.StringVar(value="Traces")     # Traces / Max hold / Average
+        self.last_extra_dbm = None
 
         # Spec-Figure (gemeinsam für dBm und linear) + Scan-Figure
         self.fig_spec, self.ax_spec = plt.subplots(figsize=(6,4), dpi=150)
         self.fig_scan, self.ax_scan = plt.subplots(figsize=(6,4), dpi=150)
+        # Spektrum dezimiert zeichnen (Min/Max pro Pixel, neu beim Zoomen)
+        self.spec_decimator = MinMaxDecimator(self.ax_spec)
         
         # Merke dir die letzten Daten, damit Toggle re-plottet
         self.last_wavelengths = np.array([])
@@ -97,6 +110,25 @@ class OSAGUI(ttk.Frame):
         self._scan_freqs = []
         self._scan_peaks = []
         self._scan_wl = []
+        self._scan_windows = []     # (center, span) [nm] des Sweeps je Scan-Zeile
+
+        # Settling-Erkennung pro Scan-Schritt
+        self.auto_settle    = tk.BooleanVar(value=False)
+        self.settle_method  = tk.StringVar(value="power")
+        self.settle_tol     = tk.DoubleVar(value=0.2)
+        self.settle_timeout = tk.DoubleVar(value=2.0)
+        self._last_peak_wl  = None
+        self._scan_plot_pending = False
+
+        # Tracking-Zoom: aktuelles Fenster (None = volles Fenster aus den Parametern)
+        self.tracking        = tk.BooleanVar(value=False)
+        self.track_span      = tk.DoubleVar(value=2.0)
+        self.track_min_level = tk.DoubleVar(value=-60.0)
+        self._track_window   = None
+
+        # Messart pro Scan-Schritt: Spektral-Sweep oder Power-Monitor
+        self.scan_measure   = tk.StringVar(value="Spectrum")
+        self.pm_wl          = tk.DoubleVar(value=1548.5)
        
         
         #Peak finder
@@ -222,6 +254,19 @@ class OSAGUI(ttk.Frame):
             self.quality_buttons.append(btn)
         row+=1
 
+        # Tracking: schmales Fenster um den letzten Peak
+        track=tk.LabelFrame(param,text="Peak Tracking",padx=4,pady=4)
+        track.grid(row=row,column=0,columnspan=4,sticky="ew",pady=(6,0))
+        ttk.Checkbutton(track,text="Track peak",variable=self.tracking,
+                        command=self._on_tracking_toggled).grid(row=0,column=0,padx=4)
+        tk.Label(track,text="Window [nm]:").grid(row=0,column=1,sticky="e")
+        track_e=tk.Entry(track,textvariable=self.track_span,width=6)
+        track_e.grid(row=0,column=2,padx=4)
+        CreateToolTip(track_e,"Span around the last peak in repeat/scan mode")
+        tk.Label(track,text="Lost below [dBm]:").grid(row=0,column=3,sticky="e")
+        tk.Entry(track,textvariable=self.track_min_level,width=6).grid(row=0,column=4,padx=4)
+        row+=1
+
         # Sweep Buttons + Progress
         btns=tk.Frame(param)
         btns.grid(row=row,column=0,columnspan=4,pady=(8,4))
@@ -229,6 +274,21 @@ class OSAGUI(ttk.Frame):
         self.single_btn.pack(side="left",padx=6)
         self.scanmode_btn=tk.Button(btns,text="Scan Mode OFF",bg="lightgray",command=self.toggle_scan_mode)
         self.scanmode_btn.pack(side="left",padx=6)
+        srq_cb=ttk.Checkbutton(btns,text="SRQ",variable=self.use_srq)
+        srq_cb.pack(side="left",padx=6)
+        row+=1
+
+        # Burst: mehrere Sweeps in die Trace-Speicher, danach ein Transfer
+        burst=tk.Frame(param)
+        burst.grid(row=row,column=0,columnspan=4,pady=(0,4))
+        self.burst_btn=ttk.Button(burst,text="Burst",command=self.burst_sweep)
+        self.burst_btn.pack(side="left",padx=6)
+        tk.Spinbox(burst,from_=1,to=99,width=4,textvariable=self.burst_count).pack(side="left",padx=2)
+        burst_cb=ttk.Combobox(burst,textvariable=self.burst_mode,state="readonly",width=9,
+                              values=["Traces","Max hold","Average"])
+        burst_cb.pack(side="left",padx=6)
+        CreateToolTip(burst_cb,"Traces: one sweep per trace memory (A/B/C)\n"
+                               "Max hold / Average: N sweeps into trace A, one transfer")
         row+=1
 
         self.progressbar=ttk.Progressbar(param,mode="determinate",length=200)
@@ -297,6 +357,33 @@ class OSAGUI(ttk.Frame):
                   command=lambda: self.scale_scan_freq(0.1)).grid(row=1, column=len(steps), padx=6, pady=2)
         scan_row += 1
 
+        # Messart
+        tk.Label(self.scan_tab, text="Measure:").grid(row=scan_row, column=0, sticky="e", padx=4, pady=2)
+        meas = tk.Frame(self.scan_tab)
+        meas.grid(row=scan_row, column=1, columnspan=3, sticky="w", padx=4, pady=2)
+        meas_cb = ttk.Combobox(meas, values=["Spectrum", "Power meter"], textvariable=self.scan_measure,
+                               width=12, state="readonly")
+        meas_cb.pack(side="left")
+        CreateToolTip(meas_cb, "Power meter: PWR/PWRR? at fixed WL, much faster than a sweep")
+        tk.Label(meas, text="WL [nm]:").pack(side="left", padx=(8,2))
+        tk.Entry(meas, textvariable=self.pm_wl, width=9).pack(side="left")
+        tk.Button(meas, text="← Peak", command=self._pm_wl_from_peak).pack(side="left", padx=4)
+        scan_row += 1
+
+        # Settling: statt fester Pause warten, bis der Peak stabil ist
+        settle = tk.LabelFrame(self.scan_tab, text="Settling", padx=5, pady=3)
+        settle.grid(row=scan_row, column=0, columnspan=4, sticky="ew", padx=4, pady=2)
+        ttk.Checkbutton(settle, text="Auto", variable=self.auto_settle).grid(row=0, column=0, padx=2)
+        settle_cb = ttk.Combobox(settle, values=["power", "sweep"], textvariable=self.settle_method,
+                                 width=7, state="readonly")
+        settle_cb.grid(row=0, column=1, padx=2)
+        tk.Label(settle, text="Tol [dB]:").grid(row=0, column=2, sticky="e")
+        tk.Entry(settle, textvariable=self.settle_tol, width=5).grid(row=0, column=3, padx=2)
+        tk.Label(settle, text="Timeout [s]:").grid(row=0, column=4, sticky="e")
+        tk.Entry(settle, textvariable=self.settle_timeout, width=5).grid(row=0, column=5, padx=2)
+        CreateToolTip(settle_cb, "power: power monitor at last peak WL\nsweep: fast sweeps with 51 points")
+        scan_row += 1
+
         # Start / Stop Scan Buttons
         self.scan_btn = tk.Button(
             self.scan_tab,
@@ -329,6 +416,19 @@ class OSAGUI(ttk.Frame):
         btn_rem = ttk.Button(self.burst_tab, text="Remove Selected", command=self.remove_scanlist_entry)
         btn_rem.grid(row=0, column=3, padx=6, pady=4)
 
+        # Dwell pro Listeneintrag + OSA-Synchronisation
+        list_opts = tk.Frame(self.burst_tab)
+        list_opts.grid(row=2, column=0, columnspan=4, sticky="w", padx=6, pady=4)
+        tk.Label(list_opts, text="Dwell (s):").pack(side="left")
+        self.list_dwell = tk.Entry(list_opts, width=8)
+        # Default 2 s pro Eintrag (früher 1/n s): muss mehrere OSA-Sweeps abdecken
+        self.list_dwell.insert(0, "2.0")
+        self.list_dwell.pack(side="left", padx=(2,10))
+        CreateToolTip(self.list_dwell, "Time per list entry, should cover several OSA sweeps")
+        self.list_sync_osa = tk.BooleanVar(value=True)
+        ttk.Checkbutton(list_opts, text="Sync OSA repeat sweeps",
+                        variable=self.list_sync_osa).pack(side="left")
+
 
         # Peak Displays
         tk.Label(self.scan_tab, text="Current Peak:", fg="darkgreen")\
@@ -517,119 +617,187 @@ class OSAGUI(ttk.Frame):
         if self.connection_state.get() == "disconnected":
             if not self.debug_modus.get():
                 self.connect_osa()
+            else:
+                self.connect_simulated_osa()
         else:
             self.disconnect_osa()
         self.update_conn_btn()
 
     # ─── OSA Verbindung ───────────────────────────────────────────────────────
-    def connect_osa(self):
-        try:
-            import pyvisa
-            if self.controller.rm is None:
-                self.controller.rm = pyvisa.ResourceManager()
-            append_event(self.event_log, self.log_text, "SEND", "*IDN?")
-            self.controller.osa = self.controller.rm.open_resource(
-                f"TCPIP0::{self.osa_ip.get()}::INSTR"
-            )
-            self.controller.osa.timeout = 300_000
+    def open_connection(self, ip, simulated=False):
+        """Verbindung aufbauen (ohne Tk-Zugriffe, läuft auch im ConnectionManager-Thread)."""
+        if simulated:
+            return self.controller.connect_simulated()
+        resp = self.controller.connect(ip)
+        self.controller.write("LOG 5")
+        return resp
+
+    def on_connected(self, resp):
+        """Nach erfolgreichem Connect im GUI-Thread: Status, Buttons, Parameter."""
+        append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
+        prefix = "Simulated" if self.debug_modus.get() else "Connected"
+        self.status_var.set(f"{prefix}: {resp.strip()}")
+        self.connection_state.set("connected")
+        self.read_all_params()
+        self.update_conn_btn()
 
-            resp = self.controller.osa.query("*IDN?")
-            append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
+    def on_wavegen_connected(self):
+        self.wg_connect_btn.config(text="Disconnect WG", bg="green", fg="white")
 
-            append_event(self.event_log, self.log_text, "SEND", "LOG 5")
-            self.controller.osa.write("LOG 5")
+    def connect_osa(self):
+        append_event(self.event_log, self.log_text, "SEND", "*IDN?;LOG 5")
+        self._open_connection_later(self.osa_ip.get().strip())
 
-            self.status_var.set(f"Connected: {resp.strip()}")
-            self.connection_state.set("connected")
-            self.read_all_params()
-        except Exception as e:
+    def connect_simulated_osa(self):
+        """Debug-Modus: simuliertes MS9740A statt echter Verbindung."""
+        self._open_connection_later(None, simulated=True)
+
+    def _open_connection_later(self, ip, simulated=False):
+        """Verbindung im OSA-Executor aufbauen, Ergebnis im GUI-Thread anzeigen."""
+        def failed(e):
             messagebox.showerror("OSA Error", f"Connection failed: {e}")
             self.connection_state.set("disconnected")
             self.controller.osa = None
+            self.update_conn_btn()
+        self.status_var.set("Connecting…")
+        submit_to_tk(self, self.controller.executor, self.open_connection, ip, simulated,
+                     on_done=self.on_connected, on_error=failed)
 
     def disconnect_osa(self):
         self.repeat_abort.set()
         if getattr(self.controller, "osa", None):
             append_event(self.event_log, self.log_text, "SEND", "SST")
-            try:
-                self.controller.osa.write("SST")
-                self.controller.osa.close()
-            except:
-                pass
-        self.controller.osa = None
+            # SST + close im Executor, hinter einer evtl. laufenden Transaktion
+            submit_to_tk(self, self.controller.executor, self.controller.disconnect,
+                         on_error=lambda e: self.error_var.set(f"Disconnect failed: {e}"))
         self.connection_state.set("disconnected")
         self.status_var.set("Status: Not connected")
 
     # ─── Parameter aus OSA auslesen ────────────────────────────────────────────
     def read_all_params(self):
+        if not self.controller.osa:
+            return
+        cmds = ["CNT", "SPN", "RES", "VBW", "MPT", "RLV", "LOFS"]
+        append_event(self.event_log, self.log_text, "SEND", ";".join(f"{c}?" for c in cmds))
+        # nicht blockierend: läuft ggf. erst nach einer laufenden Sweep-Transaktion
+        submit_to_tk(self, self.controller.executor, self.controller.read_params, cmds,
+                     on_done=self._show_params,
+                     on_error=lambda e: self.error_var.set(f"Read failed: {e}"))
+
+    def _show_params(self, resp):
         try:
-            osa = self.controller.osa
-            if not osa:
-                return
+            append_event(self.event_log, self.log_text, "RESPONSE", ";".join(resp.values()))
             for cmd, var, cast in [
-                ("CNT?", self.central_wl, float),
-                ("SPN?", self.span, lambda x: str(int(float(x)))),
-                ("RES?", self.resolution, float),
-                ("VBW?", self.integration, str),
-                ("MPT?", self.points, lambda x: str(int(float(x)))),
+                ("CNT", self.central_wl, float),
+                ("SPN", self.span, lambda x: str(int(float(x)))),
+                ("RES", self.resolution, float),
+                ("VBW", self.integration, str),
+                ("MPT", self.points, lambda x: str(int(float(x)))),
+                ("RLV", self.reference_lvl, float),
+                ("LOFS", self.level_offset, float),
             ]:
-                append_event(self.event_log, self.log_text, "SEND", cmd)
-                resp = osa.query(cmd)
-                append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
-                var.set(cast(resp.strip()))
-
-            try:
-                append_event(self.event_log, self.log_text, "SEND", "RLV?")
-                resp = osa.query("RLV?")
-                append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
-                self.reference_lvl.set(float(resp.strip()))
-            except:
-                pass
-            try:
-                append_event(self.event_log, self.log_text, "SEND", "LOFS?")
-                resp = osa.query("LOFS?")
-                append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
-                self.level_offset.set(float(resp.strip()))
-            except:
-                pass
+                try:
+                    var.set(cast(resp[cmd]))
+                except (KeyError, ValueError):
+                    # RLV/LOFS werden nicht von jeder Firmware beantwortet
+                    if cmd not in ("RLV", "LOFS"):
+                        raise
 
             self.status_var.set("Parameters loaded.")
+            self._update_sweep_timeout()
         except Exception as e:
             self.error_var.set(f"Read failed: {e}")
 
-    # ─── Einzelparameter setzen ─────────────────────────────────────────────────
-    def set_param(self, cmd, value):
+    # ─── Parameter setzen (Write-Through-Cache im Controller) ──────────────────
+    def set_params(self, params, on_done=None):
+        """
+        params = {cmd: value} wie in den Eingabefeldern (VBW z.B. "100Hz").
+        Nur geänderte Werte gehen als ein Compound-Kommando raus, verifiziert
+        wird mit einer gebündelten Abfrage. Läuft ohne zu blockieren im
+        Executor; on_done() wird danach im GUI-Thread aufgerufen (auch bei Fehler).
+        """
         if self.connection_state.get() != "connected":
+            if on_done:
+                on_done()
             return
-        osa = self.controller.osa
-
-        append_event(self.event_log, self.log_text, "SEND", f"{cmd} {value}")
-        try:
-            if cmd == "VBW":
-                hz = integration_string_to_hz(value)
-                osa.write(f"{cmd} {hz}")
-                append_event(self.event_log, self.log_text, "SEND", "VBW?")
-                resp = osa.query("VBW?")
-                append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
-                if int(round(float(resp))) != int(round(hz)):
-                    raise ValueError(f"expected {hz}, got {resp}")
+        dev = {cmd: integration_string_to_hz(v) if cmd == "VBW" else v
+               for cmd, v in params.items()}
+        append_event(self.event_log, self.log_text, "SEND",
+                     ";".join(f"{c} {v}" for c, v in dev.items()))
+
+        def finished():
+            if any(c in ("SPN", "RES", "VBW", "MPT", "SMT") for c in params):
+                self._update_sweep_timeout()
+            if on_done:
+                on_done()
+
+        def done(resp):
+            if resp:
+                append_event(self.event_log, self.log_text, "RESPONSE", ";".join(resp.values()))
             else:
-                osa.write(f"{cmd} {value}")
-                append_event(self.event_log, self.log_text, "SEND", f"{cmd}?")
-                resp = osa.query(f"{cmd}?")
-                append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
-                try:
-                    if abs(float(resp) - float(value)) > 0.1:
-                        raise ValueError(f"expected {value}, got {resp}")
-                except ValueError:
-                    if resp.strip().upper() != str(value).strip().upper():
-                        raise
+                append_event(self.event_log, self.log_text, "INFO", "unchanged, skipped")
             self.error_var.set("")
-        except Exception as e:
-            self.error_var.set(f"{cmd} set warning: {e}")
+            finished()
+
+        def failed(e):
+            self.error_var.set(f"{'/'.join(params)} set warning: {e}")
+            finished()
+
+        submit_to_tk(self, self.controller.executor, self.controller.set_params, dev,
+                     on_done=done, on_error=failed)
+
+    def set_param(self, cmd, value):
+        self.set_params({cmd: value})
+
+    # ─── Sweep-Dauer / Timeout ─────────────────────────────────────────────────
+    def _sweep_params(self):
+        """Aktuelle Sweep-Einstellungen für den Sweep-Zeit-Schätzer."""
+        spn = self._track_window[1] if self._track_window else float(self.span.get())
+        return dict(spn=spn, res=float(self.resolution.get()),
+                    vbw_hz=integration_string_to_hz(self.integration.get()),
+                    mpt=int(float(self.points.get())), smt=self.smooth_points.get())
+
+    def _estimate_sweep(self):
+        try:
+            return self.controller.estimate_sweep(self._sweep_params())
+        except (ValueError, tk.TclError):
+            return None
+
+    def _update_sweep_timeout(self):
+        try:
+            ms = self.controller.apply_sweep_timeout(self._sweep_params())
+        except (ValueError, tk.TclError):
+            return
+        est = self._estimate_sweep()
+        append_event(self.event_log, self.log_text, "INFO",
+                     f"Estimated sweep {est:.1f} s, VISA timeout {ms/1000:.0f} s")
+
+    def _record_sweep_time(self, params, seconds):
+        """Gemessene Sweep-Dauer in die Kalibrierung übernehmen."""
+        try:
+            self.controller.estimator.add_measurement(seconds=seconds, **params)
+        except Exception:
+            pass
+
+    def _scan_step_count(self):
+        try:
+            f0, f1, df = float(self.scan_start.get()), float(self.scan_end.get()), float(self.scan_step.get())
+        except ValueError:
+            return 0
+        return int(np.floor((f1 - f0) / df)) + 1 if df > 0 and f1 >= f0 else 0
+
+    def _tick_sweep_progress(self, t0, est):
+        """Fortschritt/ETA eines Single Sweeps aus der geschätzten Dauer."""
+        if not self.sweep_running:
+            return
+        elapsed = time.time() - t0
+        self.progressbar["value"] = min(95, 10 + 85 * elapsed / est)
+        self.status_var.set(f"Sweep running… {elapsed:.0f}/{est:.0f} s")
+        self.master.after(250, self._tick_sweep_progress, t0, est)
 
     # ─── Quality Presets ───────────────────────────────────────────────────────
     def apply_quality(self, quality):
+        quality = quality.lower()
         if quality == "high":
             res, vbw, mpt = "0.03", "10Hz", "1001"
         elif quality == "med":
@@ -639,40 +807,102 @@ class OSAGUI(ttk.Frame):
         self.resolution.set(res)
         self.integration.set(vbw)
         self.points.set(mpt)
-        self.set_param("RES", res)
-        self.set_param("VBW", vbw)
-        self.set_param("MPT", mpt)
+        # ein Round-Trip für das ganze Preset
+        self.set_params({"RES": res, "VBW": vbw, "MPT": mpt})
         self.status_var.set(f"Quality: {quality}")
 
+        # Warnung, wenn ein Scan mit diesem Preset sehr lange dauert
+        est = self._estimate_sweep()
+        n = self._scan_step_count() if self.scan_mode else 0
+        if est and n and est * n > 3600:
+            messagebox.showwarning(
+                "Long scan",
+                f"Quality '{quality}': ~{est:.1f} s per sweep, "
+                f"{n} scan steps → {format_duration(est * n)} (h:mm:ss)")
+
+    # ─── Tracking-Zoom ─────────────────────────────────────────────────────────
+    def _full_window(self):
+        return float(self.central_wl.get()), float(self.span.get())
+
+    def _set_window(self, center, span):
+        """Setzt CNT/SPN über set_params (aus einem Worker-Thread) und wartet auf das Ergebnis."""
+        done = threading.Event()
+        self.master.after(0, lambda: self.set_params({"CNT": center, "SPN": span}, on_done=done.set))
+        done.wait(timeout=10)
+
+    def _update_tracking(self, wl, dbm):
+        """Nach jedem Sweep: Fenster auf den Peak nachführen bzw. bei Verlust aufweiten."""
+        if not self.tracking.get():
+            return
+        try:
+            full_c, full_s = self._full_window()
+            track_s = min(float(self.track_span.get()), full_s)
+            min_level = float(self.track_min_level.get())
+        except (ValueError, tk.TclError):
+            return
+        center, span = self._track_window or (full_c, full_s)
+        new = tracking_window(wl, dbm, center, span, min_level, full_c, full_s)
+        if new is None and span > track_s and np.nanmax(dbm) >= min_level:
+            # Peak gefunden, aber noch volles Fenster → auf Tracking-Fenster zoomen
+            new = (round(float(wl[int(np.nanargmax(dbm))]), 3), track_s)
+        if new is None:
+            return
+        c, sp = new
+        self._track_window = None if (c, sp) == (full_c, full_s) else (c, sp)
+        txt = f"CNT {c} / SPN {sp}" + (" (peak lost, full span)" if self._track_window is None else "")
+        self.master.after(0, lambda: append_event(self.event_log, self.log_text, "TRACK", txt))
+        self._set_window(c, sp)
+
+    def _on_tracking_toggled(self):
+        if not self.tracking.get() and self._track_window is not None:
+            # zurück auf das eingestellte Fenster
+            self._track_window = None
+            c, sp = self._full_window()
+            self.set_params({"CNT": c, "SPN": sp})
+
+    @staticmethod
+    def _window_of(wl):
+        """(center, span) [nm] der Wellenlängenachse eines Sweeps, NaN ohne Trace."""
+        if wl is None or len(wl) == 0:
+            return (np.nan, np.nan)
+        w0, w1 = float(wl[0]), float(wl[-1])
+        return ((w0 + w1) / 2, w1 - w0)
+
+    def _window_metadata(self, wl=None):
+        """Tatsächliches Sweep-Fenster des Traces wl für die Metadaten."""
+        meta = {"tracking": "on" if self.tracking.get() else "off"}
+        if wl is not None and len(wl):
+            center, span = self._window_of(wl)
+            meta["window_center"] = f"{center:.3f}"
+            meta["window_span"]   = f"{span:.3f}"
+        return meta
+
     # ─── Button Update ─────────────────────────────────────────────────────────
     def set_button_states(self, mode="stopped"):
         """
         Schaltet die Beschriftung und den Zustand der Sweep-Buttons um.
-        mode: "single" | "repeat" | "stopped"
+        mode: "single" | "burst" | "repeat" | "stopped"
         """
-        if mode == "single":
-            # Single-Sweep läuft
-            self.single_btn.config(text="Stop", state="normal")
-            self.repeat_btn.config(text="Repeat Sweep", state="disabled")
+        # Repeat-Button existiert nur, wenn er im Layout angelegt wurde
+        repeat_btn = getattr(self, "repeat_btn", None)
+        if mode in ("single", "burst"):
+            # Single-Sweep bzw. Burst läuft: jeweiliger Button stoppt
+            self.single_btn.config(text="Stop" if mode == "single" else "Single Sweep",
+                                   state="normal" if mode == "single" else "disabled")
+            self.burst_btn.config(text="Stop" if mode == "burst" else "Burst",
+                                  state="normal" if mode == "burst" else "disabled")
+            if repeat_btn:
+                repeat_btn.config(text="Repeat Sweep", state="disabled")
         else:
             # Beide gestoppt
             self.single_btn.config(text="Single Sweep", state="normal")
-            self.repeat_btn.config(text="Repeat Sweep", state="normal")
+            self.burst_btn.config(text="Burst", state="normal")
+            if repeat_btn:
+                repeat_btn.config(text="Repeat Sweep", state="normal")
 
 
     # ─── Single Sweep ──────────────────────────────────────────────────────────
     def single_sweep(self):
-        # Beim Start eines Single-Sweeps die Wavegen-Frequenz abfragen und speichern
-        try:
-            resp = self.wavegen_controller.query("SOUR1:FREQ?")
-            self.single_sweep_freq = float(resp)
-        except Exception:
-            self.single_sweep_freq = None
-
-        # In der Statuszeile anzeigen, falls erfolgreich
-        if self.single_sweep_freq is not None:
-            self.status_var.set(f"Single Sweep @ {self.single_sweep_freq:.6f} Hz")
-
         # Wenn gerade ein Sweep läuft, abbrechen
         if self.sweep_running:
             self.repeat_abort.set()
@@ -684,7 +914,12 @@ class OSAGUI(ttk.Frame):
         self.sweep_running = True
         self.repeat_abort.clear()
         self.set_button_states("single")
+        self.progressbar.config(mode="determinate")
         self.progressbar["value"] = 0
+        self._sweep_t_params = self._sweep_params()
+        est = self._estimate_sweep()
+        if est:
+            self.master.after(250, self._tick_sweep_progress, time.time(), est)
 
         # Single-Sweep im Hintergrund starten
         threading.Thread(target=self.single_sweep_thread, daemon=True).start()
@@ -693,33 +928,32 @@ class OSAGUI(ttk.Frame):
     def single_sweep_thread(self):
         try:
             osa = self.controller.osa
-            self.status_var.set("Sweep running…")
-            self.progressbar["value"] = 10
-    
-            # 1) Gerät zurücksetzen und Sweep starten
-            for cmd in ("*CLS", "SSI"):
-                if self.repeat_abort.is_set():
-                    self.master.after(0, lambda: self.status_var.set("Sweep aborted"))
-                    return
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", cmd))
-                osa.write(cmd)
-    
-            # 2) Auf Fertigmeldung warten
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "*OPC?"))
-            osa.query("*OPC?")
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", "1"))
-    
+            # Wavegen-Frequenz beim Start des Sweeps (Zustandsspiegel, Query nur wenn unbekannt)
+            try:
+                self.single_sweep_freq = float(self.wavegen_controller.frequency(1))
+            except Exception:
+                self.single_sweep_freq = None
+            text = ("Sweep running…" if self.single_sweep_freq is None
+                    else f"Single Sweep @ {self.single_sweep_freq:.6f} Hz")
+            self.master.after(0, lambda: (self.status_var.set(text),
+                                          self.progressbar.config(value=10)))
+    
+            # 1) Sweep starten, 2) Ende über Status-Register abwarten (abbrechbar)
             if self.repeat_abort.is_set():
                 self.master.after(0, lambda: self.status_var.set("Sweep aborted"))
                 return
+            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "*CLS;*ESE 1;SSI;*OPC"))
+            t_sweep = time.time()
+            done = self.controller.sweep(self._sweep_t_params, abort=self.repeat_abort,
+                                         use_srq=self.use_srq.get())
+            if not done:
+                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "SST"))
+                self.master.after(0, lambda: self.status_var.set("Sweep aborted"))
+                return
+            self._record_sweep_time(self._sweep_t_params, time.time() - t_sweep)
+            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", "ESR: operation complete"))
     
-            # 3) Sweep-Daten abholen
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DCA?"))
-            dca = osa.query("DCA?")
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", dca.strip()))
-            staw, stow, npts = map(float, dca.split(","))
-            wl = np.linspace(staw, stow, int(npts))
-    
+            # 3) Sweep-Daten abholen (Wellenlängenachse aus dem Cache)
             if self.repeat_abort.is_set():
                 self.master.after(0, lambda: self.status_var.set("Sweep aborted"))
                 return
@@ -727,38 +961,107 @@ class OSAGUI(ttk.Frame):
             self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DMA?"))
             dbm = np.fromstring(osa.query("DMA?"), dtype=float, sep="\r\n")
             self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", "<binary>"))
+            wl = self.controller.wavelength_axis(dbm.size)
             lin = 10 ** (dbm / 10)
     
             # 4) Peak berechnen und anzeigen
             idx = int(np.nanargmax(dbm))
             val, wl0 = dbm[idx], wl[idx]
-            try:
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "SOUR1:FREQ?"))
-                resp = self.wavegen_controller.query("SOUR1:FREQ?")
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", resp.strip()))
-                freq = float(resp)
-            except:
-                freq = 0.0
-    
+            freq = self.single_sweep_freq or 0.0
             self.master.after(0, lambda v=val, w=wl0, f=freq: self._set_peak(v, w, f))
     
             # 5) Plotten
             self.master.after(0, lambda w=wl, ln=lin, db=dbm: 
                              self.plot_results(w, ln, db, live=False))
     
-            self.progressbar["value"] = 100
-            self.status_var.set("Sweep done.")
+            self.master.after(0, lambda: (self.progressbar.config(value=100),
+                                          self.status_var.set("Sweep done.")))
         except Exception as e:
-            self.error_var.set(f"Sweep failed: {e}")
-            self.status_var.set("Sweep error")
+            self.master.after(0, lambda e=e: (self.error_var.set(f"Sweep failed: {e}"),
+                                              self.status_var.set("Sweep error")))
         finally:
             # Auf jeden Fall zurücksetzen
             self.sweep_running = False
-            # Buttons wieder aktivieren
+            # Buttons wieder aktivieren, Progressbar anhalten
+            self.master.after(0, self.set_button_states, "stopped")
+            self.master.after(0, self.progressbar.stop)
+
+    # ─── Burst (Trace-Speicher) ──────────────────────────────────────────────
+    def burst_sweep(self):
+        if self.controller.osa is None:
+            messagebox.showerror("Error", "Not connected to OSA.")
+            return
+        if self.sweep_running:
+            self.repeat_abort.set()
+            self.status_var.set("Sweep stopped.")
+            return
+        try:
+            n = max(1, int(self.burst_count.get()))
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Error", "Invalid burst count.")
+            return
+        mode = self.burst_mode.get()
+        if mode == "Traces" and n > len(self.controller.traces):
+            n = len(self.controller.traces)
+            self.burst_count.set(n)
+        self.sweep_running = True
+        self.repeat_abort.clear()
+        self.set_button_states("burst")
+        self.progressbar.config(mode="determinate")
+        self.progressbar["value"] = 0
+        self._sweep_t_params = self._sweep_params()
+        est = self._estimate_sweep()
+        if est:
+            self.master.after(250, self._tick_sweep_progress, time.time(), est * n)
+        append_event(self.event_log, self.log_text, "Button", f"Burst {mode} x{n}")
+        threading.Thread(target=self._burst_thread, args=(n, mode), daemon=True).start()
+
+    def _burst_thread(self, n, mode):
+        try:
+            self.master.after(0, lambda: self.status_var.set(f"Burst running ({n} sweeps)…"))
+            params, srq = self._sweep_t_params, self.use_srq.get()
+            try:
+                # Frequenz beim Start des Bursts (Zustandsspiegel, Query nur wenn unbekannt)
+                freq = float(self.wavegen_controller.frequency(1))
+            except Exception:
+                freq = 0.0
+            record = lambda seconds: self._record_sweep_time(params, seconds)
+            t0 = time.time()
+            if mode == "Traces":
+                raws = self.controller.burst_capture(n, params, abort=self.repeat_abort,
+                                                     use_srq=srq, on_sweep=record)
+            else:
+                hold = "max" if mode == "Max hold" else "avg"
+                raw = self.controller.hold_capture(n, hold, params, abort=self.repeat_abort,
+                                                   use_srq=srq, on_sweep=record)
+                raws = {self.controller.traces[0]: raw} if raw is not None else None
+            if raws is None:
+                self.master.after(0, lambda: self.status_var.set("Burst aborted"))
+                return
+            dt = time.time() - t0
+            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE",
+                                                      f"{len(raws)} trace(s), {dt:.2f} s"))
+
+            traces = [np.fromstring(r, dtype=float, sep="\r\n") for r in raws.values()]
+            wl = self.controller.wavelength_axis(traces[0].size)
+
+            # kombinierter Trace: Leistungsmittel über die Einzel-Sweeps
+            dbm = traces[0] if len(traces) == 1 else \
+                10 * np.log10(np.mean([10 ** (t / 10) for t in traces], axis=0))
+            lin = 10 ** (dbm / 10)
+            idx = int(np.nanargmax(dbm))
+            self.master.after(0, lambda v=dbm[idx], w=wl[idx]: self._set_peak(v, w, freq))
+            extra = traces if len(traces) > 1 else None
+            self.master.after(0, lambda: self.plot_results(wl, lin, dbm, extra=extra))
+            self.master.after(0, lambda: self.progressbar.config(value=100))
+            self.master.after(0, lambda: self.status_var.set(
+                f"Burst done: {n} sweeps in {dt:.1f} s"))
+        except Exception as e:
+            self.master.after(0, lambda e=e: self.error_var.set(f"Burst failed: {e}"))
+            self.master.after(0, lambda: self.status_var.set("Sweep error"))
+        finally:
+            self.sweep_running = False
             self.master.after(0, self.set_button_states, "stopped")
-            # Falls du einen indeterminierten Progressbar benutzt, evtl. auch:
-            try: self.progressbar.stop()
-            except: pass
 
     # ─── Repeat Sweep ─────────────────────────────────────────────────────────
     def start_repeat_sweep(self):
@@ -787,32 +1090,27 @@ class OSAGUI(ttk.Frame):
         osa.write("SRT")
         self.master.after(0, lambda: self.status_var.set("Repeat (live polling)…"))
     
+        watcher = SweepWatcher(self.controller, self._estimate_sweep() or 0.5)
         while not self.repeat_abort.is_set():
             try:
-                # Abbruchscheck
-                if self.repeat_abort.is_set():
+                # 1) auf einen neuen Sweep warten (jeder Sweep genau einmal)
+                got = watcher.next_sweep(self.repeat_abort)
+                if got is None:
                     break
-    
-                # 1) Sweep-Beschreibung holen
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DCA?"))
-                dca = osa.query("DCA?")
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", dca.strip()))
-                staw, stow, npts = map(float, dca.split(","))
-                wl = np.linspace(staw, stow, int(npts))
-    
-                # 2) Power-Daten holen
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DMA?"))
-                raw = osa.query("DMA?")
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", "<binary>"))
+                raw, t_sweep = got
+                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", "DMA? <new sweep>"))
                 dbm = np.fromstring(raw, dtype=float, sep="\r\n")
                 lin = 10 ** (dbm / 10)
+
+                # 2) Wellenlängenachse (Cache, DCA? nur nach Parameteränderung)
+                wl = self.controller.wavelength_axis(dbm.size)
+                if len(wl) != len(dbm):
+                    # Fenster während des Sweeps geändert → verwerfen
+                    continue
     
                 # 3) Wavegen-Frequenz (nur wenn verbunden)
                 if getattr(self.wavegen_controller, "gen", None) is not None:
-                    self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "SOUR1:FREQ?"))
-                    resp = self.wavegen_controller.query("SOUR1:FREQ?")
-                    self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", resp.strip()))
-                    freq_text = f"{float(resp):.3f} Hz"
+                    freq_text = f"{self.wavegen_controller.frequency(1):.3f} Hz"
                 else:
                     freq_text = "Wavegen DC"
     
@@ -835,11 +1133,14 @@ class OSAGUI(ttk.Frame):
                 self._max_peak_dbm = cur_val
                 self.master.after(0, lambda t=text: self.max_peak_var.set(t))
     
+            self._last_peak_wl = cur_wl
+    
             # 5) Plot updaten
             self.master.after(0, lambda w=wl, ln=lin, db=dbm: self.plot_results(w, ln, db, live=True))
-    
-            # kurze Pause
-            time.sleep(0.3)
+            self._update_tracking(wl, dbm)
+            ts = time.strftime("%H:%M:%S", time.localtime(t_sweep))
+            self.master.after(0, lambda r=watcher.rate, n=watcher.count, ts=ts: self.status_var.set(
+                f"Repeat: sweep #{n} @ {ts}, {r:.2f} sweeps/s"))
     
         # Repeat-Mode beenden
         self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "SST"))
@@ -867,52 +1168,47 @@ class OSAGUI(ttk.Frame):
     
             # OSA in Repeat-Mode schalten
             append_event(self.event_log, self.log_text, "SEND", "SRT")
-            if not self.debug_modus.get(): 
-                self.controller.osa.write("SRT")
-    
-            # Mit Wavegen verbinden, falls nötig
-            if getattr(self.wavegen_controller, "gen", None) is None:
+            if not self.debug_modus.get():
+                submit_to_tk(self, self.controller.executor, self.controller.write, "SRT",
+                             on_error=lambda e: self.error_var.set(f"SRT failed: {e}"))
+
+            # Wavegen ggf. verbinden und Frequenz frisch lesen – im Wavegen-Executor
+            ip = self.wg_ip.get().strip()
+            wg = self.wavegen_controller
+
+            def prepare():
+                connected = False
+                if getattr(wg, "gen", None) is None:
+                    wg.connect(ip)
+                    connected = True
                 try:
-                    ip = self.wg_ip.get().strip()
-                    self.wavegen_controller.connect(ip)
-                    self.wg_connect_btn.config(text="Disconnect WG", bg="green")
+                    # beim Eintritt einmal frisch lesen, danach gilt der Spiegel
+                    return connected, round(wg.frequency(1, refresh=True), 3)
                 except Exception as e:
-                    messagebox.showerror("Wavegen Error", f"Connection failed: {e}")
-                    # Modus wieder ausschalten
-                    if not self.debug_modus.get():
-                        self.scan_mode = False
-                        self.scanmode_btn.config(text="Scan Mode OFF", bg="lightgray")
-                        self.single_btn.config(state="normal")
-                        self.repeat_btn.config(state="normal")
-                        return
-    
-            # Aktuelle Frequenz abfragen (mit Logging)
+                    return connected, e
+
+            def prepared(result):
+                connected, f0 = result
+                if connected:
+                    self.wg_connect_btn.config(text="Disconnect WG", bg="green")
+                self._enter_scan_mode(f0)
+
+            def connect_failed(e):
+                messagebox.showerror("Wavegen Error", f"Connection failed: {e}")
+                if self.debug_modus.get():
+                    self._enter_scan_mode(0.0)
+                    return
+                # Modus wieder ausschalten
+                self.scan_mode = False
+                self.scanmode_btn.config(text="Scan Mode OFF", bg="lightgray")
+                self.single_btn.config(state="normal")
+                repeat_btn = getattr(self, "repeat_btn", None)
+                if repeat_btn:
+                    repeat_btn.config(state="normal")
+
             append_event(self.event_log, self.log_text, "SEND", "SOUR1:FREQ?")
-            try:
-                resp = self.wavegen_controller.query("SOUR1:FREQ?")
-                append_event(self.event_log, self.log_text, "RESPONSE", resp.strip())
-                f0 = round(float(resp), 3)
-            except Exception as e:
-                append_event(self.event_log, self.log_text, "ERROR", f"Freq query failed: {e}")
-                f0 = 0.0
-    
-            # In das Feld eintragen
-            self.curr_freq_var.set(f0)
-    
-            # Scan-Felder vorbelegen
-            self.scan_start.delete(0, tk.END)
-            self.scan_start.insert(0, f"{f0-1:.3f}")
-            self.scan_end.delete(0, tk.END)
-            self.scan_end.insert(0, f"{f0+1:.3f}")
-    
-            # Live-Polling starten
-            self.repeat_running = True
-            self.repeat_abort.clear()
-            threading.Thread(target=self.repeat_polling_loop, daemon=True).start()
-    
-            # Scan-Frame anzeigen
-            self.scan_frame.grid()
-    
+            submit_to_tk(self, wg.executor, prepare, on_done=prepared, on_error=connect_failed)
+
         else:
             # Exit Scan Mode → Live-Polling stoppen
             append_event(self.event_log, self.log_text, "INFO", "Exit Scan Mode")
@@ -926,6 +1222,33 @@ class OSAGUI(ttk.Frame):
             # Buttons wieder aktivieren
             self.single_btn.config(state="normal")
 
+    def _enter_scan_mode(self, f0):
+        """Scan Mode: Frequenzfelder vorbelegen und Live-Polling starten (GUI-Thread)."""
+        if not self.scan_mode:
+            return
+        if isinstance(f0, Exception):
+            append_event(self.event_log, self.log_text, "ERROR", f"Freq query failed: {f0}")
+            f0 = 0.0
+        else:
+            append_event(self.event_log, self.log_text, "RESPONSE", f"{f0}")
+
+        # In das Feld eintragen
+        self.curr_freq_var.set(f0)
+
+        # Scan-Felder vorbelegen
+        self.scan_start.delete(0, tk.END)
+        self.scan_start.insert(0, f"{f0-1:.3f}")
+        self.scan_end.delete(0, tk.END)
+        self.scan_end.insert(0, f"{f0+1:.3f}")
+
+        # Live-Polling starten
+        self.repeat_running = True
+        self.repeat_abort.clear()
+        threading.Thread(target=self.repeat_polling_loop, daemon=True).start()
+
+        # Scan-Frame anzeigen
+        self.scan_frame.grid()
+
     def toggle_scan_run_pause(self):
         # if never started, kick off a fresh scan
         if not self.scan_running and not hasattr(self, "_scan_f0"):
@@ -960,7 +1283,8 @@ class OSAGUI(ttk.Frame):
             self._scan_f0 = float(self.scan_start.get())
             self._scan_f1 = float(self.scan_end.get())
             self._scan_df = float(self.scan_step.get())
-        except ValueError:
+            self._scan_pm_wl = float(self.pm_wl.get())
+        except (ValueError, tk.TclError):
             messagebox.showerror("Scan error", "Invalid frequency parameters")
             return
         
@@ -971,62 +1295,184 @@ class OSAGUI(ttk.Frame):
         threading.Thread(target=self._scan_thread, daemon=True).start()
 
     def _scan_thread(self):
+        """
+        Scan als Pipeline: die I/O-Stufe stellt die Frequenz ein, wartet das
+        Settling ab und misst; Parsen, Peak-Analyse und GUI-Übergabe laufen
+        parallel dazu in der Verarbeitungsstufe.
+        """
         self.master.after(0, lambda:append_event(self.event_log, self.log_text, "INFO", "Scan_thread started"))
+        self._scan_pipeline = TwoStagePipeline(
+            produce=self._scan_io_stage,
+            process=self._scan_process_step,
+            abort=self.scan_abort,
+            on_done=self._scan_finished,
+            on_error=lambda e: self.master.after(0, lambda: self.error_var.set(f"Scan error: {e}")),
+        ).start()
+
+    def _scan_io_stage(self, emit, abort):
+        """I/O-Stufe: Frequenz setzen, Settling, Sweep bzw. Power-Messung, Rohdaten weiterreichen."""
         osa = self.controller.osa
         f = self._scan_f0
         df = self._scan_df
-        while not self.scan_abort.is_set() and f <= self._scan_f1:
+        power_mode = self.scan_measure.get() == "Power meter"
+        pm_wl = self._scan_pm_wl
+        if power_mode:
+            # laufende Repeat-Sweeps beenden, der Power-Monitor misst ohne Sweep
+            osa.write("SST")
+        # noch gepufferte Frequenz-Buttons senden, bevor der Scan übernimmt
+        self.wavegen_controller.dispatcher.flush(1.0)
+        n_steps = max(self._scan_step_count(), 1)
+        est = self._estimate_sweep() or 1.0
+        sweep_params = self._sweep_params()
+        step = 0
+        t_scan = time.time()
+        self.master.after(0, lambda: self.progressbar.config(mode="determinate", value=0))
+        self.master.after(0, lambda: append_event(self.event_log, self.log_text, "INFO",
+                          f"Scan: {n_steps} steps, estimated {format_duration(n_steps * (est + 0.1))}"))
+        while not abort.is_set() and f <= self._scan_f1:
+            # Fortschritt/ETA: nach dem ersten Schritt aus der gemessenen Schrittdauer
+            if step:
+                per_step = (time.time() - t_scan) / step
+            else:
+                per_step = est + 0.1
+            eta = format_duration(per_step * (n_steps - step))
+            self.master.after(0, lambda i=step, e=eta: (
+                self.progressbar.config(value=100 * i / n_steps),
+                self.status_var.set(f"Scan {i}/{n_steps}, ETA {e}")))
+            step += 1
             # --- hier warten, solange wir im Pausen-Modus sind ---
-            while self.pause_event.is_set() and not self.scan_abort.is_set():
+            while self.pause_event.is_set() and not abort.is_set():
                 time.sleep(0.1)
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", f"SOUR1:FREQ {f}"))
+            self.master.after(0, lambda f=f: append_event(self.event_log, self.log_text, "SEND", f"SOUR1:FREQ {f}"))
             try:
-                self.wavegen_controller.write(f"SOUR1:FREQ {f}")
-                time.sleep(0.1)
+                self.wavegen_controller.set_frequency(1, f)
             except:
                 pass
+            self._wait_step_settled()
             self.master.after(0, lambda v=f: self.curr_freq_var.set(round(v,3)))
 
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "*CLS"))
-            osa.write("*CLS")
-            self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "SSI"))
-            osa.write("SSI")
-            try:
-                osa.query("*OPC?")
-            except:
-                pass
+            if power_mode:
+                # Power-Monitor bei fester Wellenlänge statt Spektral-Sweep
+                try:
+                    self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", f"PWR {pm_wl}"))
+                    val = self.controller.read_power(pm_wl)
+                except Exception as e:
+                    self.master.after(0, lambda e=e: self.error_var.set(f"Power read error: {e}"))
+                    f += df
+                    continue
+                emit(("power", f, pm_wl, val))
+            else:
+                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "*CLS;*ESE 1;SSI;*OPC"))
+                try:
+                    t_sweep = time.time()
+                    if not self.controller.sweep(sweep_params, abort=abort,
+                                                 use_srq=self.use_srq.get()):
+                        break
+                    self._record_sweep_time(sweep_params, time.time() - t_sweep)
+                except Exception as e:
+                    # Sweep evtl. noch aktiv: stoppen und den Schritt verwerfen,
+                    # statt einen unvollständigen Trace für f zu lesen
+                    self.master.after(0, lambda e=e: self.error_var.set(f"Sweep error: {e}"))
+                    try:
+                        osa.write("SST")
+                    except Exception:
+                        pass
+                    f += df
+                    continue
 
-            try:
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DCA?"))
-                dca = osa.query("DCA?")
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", dca.strip()))
-                staw, stow, npts = map(float, dca.split(","))
-                wl = np.linspace(staw, stow, int(npts))
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DMA?"))
-                dbm = np.fromstring(osa.query("DMA?"), dtype=float, sep="\r\n")
-                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "RESPONSE", "<binary>"))
-                lin = 10 ** (dbm / 10)
-            except Exception as e:
-                self.master.after(0, lambda e=e: self.error_var.set(f"Data read error: {e}"))
-                f += df
-                continue
+                try:
+                    self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SEND", "DMA?"))
+                    raw = osa.query("DMA?")
+                except Exception as e:
+                    self.master.after(0, lambda e=e: self.error_var.set(f"Data read error: {e}"))
+                    f += df
+                    continue
+                if self.tracking.get():
+                    # Tracking braucht den Peak vor dem nächsten Sweep → hier auswerten
+                    try:
+                        wl, dbm = self._parse_trace(raw)
+                    except Exception as e:
+                        self.master.after(0, lambda e=e: self.error_var.set(f"Data read error: {e}"))
+                        f += df
+                        continue
+                    self._update_tracking(wl, dbm)
+                    emit(("spectrum", f, wl, dbm))
+                else:
+                    emit(("raw", f, raw))
+            f += df
 
+    def _parse_trace(self, raw):
+        """DMA?-Antwort → (wl, dbm); Achse wird bei abweichender Punktzahl neu per DCA? gelesen."""
+        dbm = np.fromstring(raw, dtype=float, sep="\r\n")
+        return self.controller.wavelength_axis(dbm.size), dbm
+
+    def _scan_process_step(self, item):
+        """Verarbeitungsstufe: Parsen, Peak bestimmen, Ergebnisse an die GUI übergeben."""
+        kind, f = item[0], item[1]
+        window = (np.nan, np.nan)
+        if kind == "power":
+            _, _, wl0, val = item
+        else:
+            if kind == "raw":
+                wl, dbm = self._parse_trace(item[2])
+            else:
+                wl, dbm = item[2], item[3]
+            lin = 10 ** (dbm / 10)
             idx = int(np.nanargmax(dbm))
             val, wl0 = dbm[idx], wl[idx]
-            self.master.after(0, lambda v=val, w=wl0, f=f: self._set_peak(v, w, f))
+            window = self._window_of(wl)
+            self._last_peak_wl = wl0
             self.master.after(0, lambda w=wl, ln=lin, db=dbm: self.plot_results(w, ln, db, live=True))
-            self._scan_freqs.append(f)
-            self._scan_peaks.append(val)
-            self._scan_wl.append(wl0)
-            self.master.after(0, lambda f=f, p=val, w=wl0: self.scan_table.insert("", "end",
-                  values=(f"{f:.3f}", f"{p:.2f}", f"{w:.3f}")))
-            self.master.after(0, self.update_scan_plot)
-            f += df
+        self.master.after(0, lambda v=val, w=wl0, f=f: self._set_peak(v, w, f))
+        self._scan_freqs.append(f)
+        self._scan_peaks.append(val)
+        self._scan_wl.append(wl0)
+        self._scan_windows.append(window)
+        self.master.after(0, lambda f=f, p=val, w=wl0: self.scan_table.insert("", "end",
+              values=(f"{f:.3f}", f"{p:.2f}", f"{w:.3f}")))
+        self._request_scan_plot()
+
+    def _request_scan_plot(self):
+        """Scan-Plot höchstens einmal pro GUI-Durchlauf neu zeichnen."""
+        if self._scan_plot_pending:
+            return
+        self._scan_plot_pending = True
+        def draw():
+            self._scan_plot_pending = False
+            self.update_scan_plot()
+        self.master.after(0, draw)
 
+    def _scan_finished(self):
         self.scan_running = False
         self.master.after(0, self.start_repeat_sweep)
         
         
+    def _pm_wl_from_peak(self):
+        """Übernimmt die letzte Peak-Wellenlänge als Power-Monitor-Wellenlänge."""
+        if self._last_peak_wl is not None:
+            self.pm_wl.set(round(float(self._last_peak_wl), 3))
+        elif self.last_wavelengths.size and self.last_power_dbm.size:
+            self.pm_wl.set(round(float(self.last_wavelengths[int(np.nanargmax(self.last_power_dbm))]), 3))
+
+    def _wait_step_settled(self):
+        """Nach einem Frequenzschritt warten: feste 0.1 s oder Auto-Settling."""
+        if not self.auto_settle.get():
+            time.sleep(0.1)
+            return
+        try:
+            tol, timeout = self.settle_tol.get(), self.settle_timeout.get()
+        except tk.TclError:
+            tol, timeout = 0.2, 2.0
+        if self.scan_measure.get() == "Power meter":
+            wl = self.pm_wl.get()
+        else:
+            wl = self._last_peak_wl if self._last_peak_wl is not None else self.central_wl.get()
+        stable, dt = self.controller.wait_settled(
+            method=self.settle_method.get(), wl_nm=wl, tol_db=tol,
+            timeout=timeout, abort=self.scan_abort)
+        msg = f"settled after {dt:.2f} s" if stable else f"not settled after {dt:.2f} s (timeout)"
+        self.master.after(0, lambda: append_event(self.event_log, self.log_text, "SETTLE", msg))
+
     # ─── Scan stoppen und Repeat zurück ───────────────────────────────────────
     def stop_scan(self):
         # Scan-Thread abbrechen
@@ -1036,7 +1482,7 @@ class OSAGUI(ttk.Frame):
         self.start_repeat_sweep()
 
     # ─── Plot-Update ─────────────────────────────────────────────────────────
-    def plot_results(self, wavelengths, data_lin, data_dbm, live=False):
+    def plot_results(self, wavelengths, data_lin, data_dbm, live=False, extra=None):
         self.master.after(0, lambda: append_event(self.event_log, self.log_text, "INFO", "called plot_results "))
         max_lin = np.nanmax(data_lin) if len(data_lin) else 1
         if max_lin < 1e-6:
@@ -1054,14 +1500,19 @@ class OSAGUI(ttk.Frame):
         self.last_wavelengths = wavelengths
         self.last_power_dbm   = data_dbm
         self.last_power_lin   = scaled_lin
+        self.last_extra_dbm   = extra
         
         self.ax_spec.clear()
+        # Einzel-Traces einer Burst-Aufnahme dünn hinterlegen
+        for i, tr in enumerate(extra or []):
+            y = 10 ** (tr / 10) * factor if self.current_plot_scale == "linear" else tr
+            self.spec_decimator.plot(wavelengths, y, lw=0.7, alpha=0.5, label=f"Trace {chr(65 + i)}")
         if self.current_plot_scale == "linear":
-            self.ax_spec.plot(wavelengths, scaled_lin)  
+            self.spec_decimator.plot(wavelengths, scaled_lin)
             self.ax_spec.set_title(f"OSA Linear Scale{txt}")
             self.ax_spec.set_ylabel(f"Power ({unit})")
         else:
-            self.ax_spec.plot(wavelengths, data_dbm)
+            self.spec_decimator.plot(wavelengths, data_dbm)
             self.ax_spec.set_title(f"OSA dBm Scale{' (Live)' if live else ''}")
             self.ax_spec.set_ylabel("Power (dBm)")
 
@@ -1084,7 +1535,8 @@ class OSAGUI(ttk.Frame):
             # Notebook auf den Linear-Tab switchen
             #self.notebook.select(self.linear_tab)
             # Linear-Plot aktualisieren
-            self.plot_results(self.last_wavelengths, self.last_power_lin, self.last_power_dbm)
+            self.plot_results(self.last_wavelengths, self.last_power_lin, self.last_power_dbm,
+                              extra=self.last_extra_dbm)
             
         else:
             # zurück auf dBm
@@ -1092,7 +1544,8 @@ class OSAGUI(ttk.Frame):
             self.toggle_plot_btn.config(text="⇒ Linear")
             append_event(self.event_log, self.log_text, "Button", "changed Plot to dBm")
             #self.notebook.select(self.plot_spec_tab)
-            self.plot_results(self.last_wavelengths, self.last_power_lin, self.last_power_dbm)
+            self.plot_results(self.last_wavelengths, self.last_power_lin, self.last_power_dbm,
+                              extra=self.last_extra_dbm)
             
     def update_scan_plot(self):
         # 1) Achse leeren
@@ -1224,19 +1677,17 @@ class OSAGUI(ttk.Frame):
 
     # ─── Wavegen Control ─────────────────────────────────────────────────────
     def toggle_wavegen_connection(self):
-        if getattr(self.wavegen_controller, "gen", None) is None:
-            try:
-                ip = self.wg_ip.get().strip()
-                self.wavegen_controller.connect(ip)
-                self.wg_connect_btn.config(text="Disconnect WG", bg="green", fg="white")
-            except Exception as e:
-                messagebox.showerror("Wavegen Error", f"Connection failed: {e}")
+        wg = self.wavegen_controller
+        if getattr(wg, "gen", None) is None:
+            submit_to_tk(self, wg.executor, wg.connect, self.wg_ip.get().strip(),
+                         on_done=lambda _: self.on_wavegen_connected(),
+                         on_error=lambda e: messagebox.showerror(
+                             "Wavegen Error", f"Connection failed: {e}"))
         else:
-            try:
-                self.wavegen_controller.disconnect()
-                self.wg_connect_btn.config(text="Connect WG", bg="red")
-            except Exception as e:
-                messagebox.showerror("Wavegen Error", f"Disconnection failed: {e}")
+            submit_to_tk(self, wg.executor, wg.disconnect,
+                         on_done=lambda _: self.wg_connect_btn.config(text="Connect WG", bg="red"),
+                         on_error=lambda e: messagebox.showerror(
+                             "Wavegen Error", f"Disconnection failed: {e}"))
 
     def toggle_wavegen_panel(self):
         if self.wavegen_embed.winfo_ismapped():
@@ -1245,7 +1696,8 @@ class OSAGUI(ttk.Frame):
             from gui.widgets.wavegen_gui import WavegenGUI
             if not hasattr(self, 'wavegen_gui'):
                 self.wavegen_gui = WavegenGUI(self.wavegen_embed,
-                                              controller=self.wavegen_controller)
+                                              controller=self.wavegen_controller,
+                                              osa_controller=self.controller)
                 self.wavegen_gui.pack(fill="both", expand=True)
             self.wavegen_embed.grid()
 
@@ -1267,13 +1719,17 @@ class OSAGUI(ttk.Frame):
         new_f = self.curr_freq_var.get() + step
         self.curr_freq_var.set(new_f)
         append_event(self.event_log, self.log_text, "SEND", f"SOUR1:FREQ {new_f}")
-        self.wavegen_controller.write(f"SOUR1:FREQ {new_f}")
+        self.wavegen_controller.set_frequency_later(1, new_f, self._dispatch_error)
 
     def scale_scan_freq(self, factor):
         new_f = self.curr_freq_var.get() * factor
         self.curr_freq_var.set(new_f)
         append_event(self.event_log, self.log_text, "SEND", f"SOUR1:FREQ {new_f}")
-        self.wavegen_controller.write(f"SOUR1:FREQ {new_f}")
+        self.wavegen_controller.set_frequency_later(1, new_f, self._dispatch_error)
+
+    def _dispatch_error(self, e):
+        # aus dem Dispatcher-Thread
+        self.master.after(0, lambda: self.error_var.set(f"Wavegen write failed: {e}"))
 
     # ─── Log speichern ───────────────────────────────────────────────────────
     def _save_event_log(self):
@@ -1296,11 +1752,25 @@ class OSAGUI(ttk.Frame):
             messagebox.showwarning("No Data", "Run a sweep first!")
             return
 
-        # 2) Single-Sweep-Freq holen (oder per Dialog nachfragen)
-        try:
-            resp = self.wavegen_controller.query("SOUR1:FREQ?")
-            freq = f"{float(resp):.6f}"
-        except Exception:
+        # 2) Frequenz und Pulsbreite aus dem Wavegen-Spiegel (ggf. Query im Executor)
+        wg = self.wavegen_controller
+
+        def read():
+            values = {}
+            for key, fn in (("freq", lambda: wg.frequency(1)), ("width", lambda: wg.get(1, "width"))):
+                try:
+                    values[key] = float(fn())
+                except Exception:
+                    values[key] = None
+            return values
+        submit_to_tk(self, wg.executor, read, on_done=self._save_sweep_with,
+                     on_error=lambda e: self._save_sweep_with({"freq": None, "width": None}))
+
+    def _save_sweep_with(self, wg_values):
+        """save_sweep, zweiter Teil im GUI-Thread: fehlende Werte erfragen und speichern."""
+        if wg_values["freq"] is not None:
+            freq = f"{wg_values['freq']:.6f}"
+        else:
             freq_val = simpledialog.askfloat(
                 "Frequency Required",
                 "Could not read wavegen frequency.\nPlease enter frequency in Hz:",
@@ -1311,13 +1781,10 @@ class OSAGUI(ttk.Frame):
                 return
             freq = f"{freq_val:.6f}"
 
-        # 3) Pulsbreite vom Wavegen holen (in s → umrechnen in ns)
-        try:
-            resp_pw = self.wavegen_controller.query("SOUR1:PULS:WIDT?")
-            pw_s = float(resp_pw)
-            pw_ns = pw_s * 1e9
-            pulse_width = f"{pw_ns:.3f}"
-        except Exception:
+        # 3) Pulsbreite vom Wavegen (in s → umrechnen in ns)
+        if wg_values["width"] is not None:
+            pulse_width = f"{wg_values['width'] * 1e9:.3f}"
+        else:
             pw_val = simpledialog.askfloat(
                 "Pulse width required",
                 "Could not read pulse width from wavegen.\nPlease enter pulse width in ns:",
@@ -1360,7 +1827,8 @@ class OSAGUI(ttk.Frame):
             scan_stop     = "-",
             scan_step     = "-",
             instrument    = "Anritsu MS9740A",
-            notes         = "Single Sweep"
+            notes         = "Single Sweep",
+            **self._window_metadata(self.last_wavelengths)
         )
         # Einheit für Parameter überschreiben
         meta["param_units"]["power"] = lin_unit
@@ -1384,11 +1852,16 @@ class OSAGUI(ttk.Frame):
             messagebox.showwarning("No Scan","First do a scan!")
             return
 
+        # Sweep-Fenster je Zeile (Tracking ändert es pro Schritt, Power-Meter: NaN)
+        windows = np.array(self._scan_windows, dtype=float).reshape(-1, 2)
+        if len(windows) != len(self._scan_freqs):
+            windows = np.full((len(self._scan_freqs), 2), np.nan)
         arr = np.column_stack((self._scan_freqs,
                                self._scan_peaks,
-                               self._scan_wl))
-        cols  = ["frequency","peak","wavelength"]
-        units = ["Hz","dBm","nm"]
+                               self._scan_wl,
+                               windows))
+        cols  = ["frequency","peak","wavelength","window_center","window_span"]
+        units = ["Hz","dBm","nm","nm","nm"]
         meta = meta_daten(
             resolution    = self.resolution.get(),
             integration   = self.integration.get(),
@@ -1405,7 +1878,10 @@ class OSAGUI(ttk.Frame):
             scan_stop     = self.scan_end.get(),
             scan_step     = self.scan_step.get(),
             instrument    = "Anritsu MS9740A",
-            notes         = f"Full scan {self.scan_start.get()}–{self.scan_end.get()} Hz"
+            notes         = f"Full scan {self.scan_start.get()}–{self.scan_end.get()} Hz",
+            scan_measure  = self.scan_measure.get(),
+            power_meter_wl = self.pm_wl.get() if self.scan_measure.get() == "Power meter" else None,
+            **self._window_metadata()
         )
         save_with_metadata(
             arr=arr,
@@ -1457,7 +1933,7 @@ class OSAGUI(ttk.Frame):
             messagebox.showerror("Format error",
                 "Array braucht mind. 2 Spalten: freq und peak")
             return
-        data = data[:, :3]  # nur 3 Spalten maximal
+        data = data[:, :5]  # freq, peak, wl (+ Sweep-Fenster center/span)
     
         # --- In interne Lists speichern ---
         freqs = data[:, 0]
@@ -1467,6 +1943,8 @@ class OSAGUI(ttk.Frame):
         self._scan_freqs = freqs.tolist()
         self._scan_peaks = peaks.tolist()
         self._scan_wl    = wls.tolist()
+        self._scan_windows = ([tuple(w) for w in data[:, 3:5]] if data.shape[1] >= 5
+                              else [(np.nan, np.nan)] * len(freqs))
         self.status_var.set(f"{len(self._scan_freqs)} Punkte geladen")
     
         # --- Achsengrenzen in den Eingabefeldern setzen ---
@@ -1683,40 +2161,168 @@ class OSAGUI(ttk.Frame):
 
 
     def start_list_scan(self):
-        if not getattr(self, "scan_list", None):
+        if getattr(self, "scan_list", None) is None or len(self.scan_list) == 0:
             messagebox.showwarning("No list", "Please load a scan-list first")
             return
     
-        freqs = self.scan_list
+        freqs = list(self.scan_list)
         n     = len(freqs)
-        dwell = 1.0 / n
+        try:
+            dwell = float(self.list_dwell.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid dwell time.")
+            return
+        if dwell <= 0:
+            messagebox.showerror("Error", "Dwell time must be > 0 s.")
+            return
+
+        sync = self.list_sync_osa.get() and self.controller.osa is not None
+        # jeder Listeneintrag muss mindestens einen vollständigen OSA-Sweep abdecken
+        est = self._estimate_sweep() if sync else None
+        if est and dwell < est:
+            messagebox.showerror(
+                "Error",
+                f"Dwell time {dwell:g} s is shorter than one OSA sweep (~{est:.1f} s).\n"
+                f"Use at least {est:.1f} s, better several sweeps.")
+            return
         append_event(self.event_log, self.log_text, "INFO", "Calculated list parameters")
-    
-        # 1) Enter List mode
-        self.wavegen_controller.write("SOURce1:FREQuency:MODE LIST")
-        append_event(self.event_log, self.log_text, "SEND", "SOURce1:FREQuency:MODE LIST")
-    
-        # 2) Download frequencies
-        cmd = "SOURce1:LIST:FREQuency " + ",".join(str(f) for f in freqs)
-        self.wavegen_controller.write(cmd)
-        append_event(self.event_log, self.log_text, "SEND", cmd)
-    
-        # 3) Set dwell time per step
-        cmd = f"SOURce1:LIST:DWELL {dwell}"
-        self.wavegen_controller.write(cmd)
-        append_event(self.event_log, self.log_text, "SEND", cmd)
-    
-        # 4) Use internal trigger to step automatically
-        self.wavegen_controller.write("TRIGger:SOURce IMMediate")
-        append_event(self.event_log, self.log_text, "SEND", "TRIGger:SOURce IMMediate")
-    
-        # 5) Arm and start the list
-        self.wavegen_controller.write("INITiate")
+        if sync:
+            # Live-Polling stoppen, Repeat-Sweeps übernimmt der List-Scan-Thread;
+            # dem Polling-Thread 0.5 s zum Beenden geben, ohne die GUI zu blockieren
+            self.repeat_abort.set()
+            self.repeat_running = False
+            self.master.after(500, self._run_list_scan, freqs, dwell, sync)
+        else:
+            self._run_list_scan(freqs, dwell, sync)
+
+    def _run_list_scan(self, freqs, dwell, sync):
+        """List-Mode am Wavegen laden und starten; die Writes laufen im Wavegen-Executor."""
+        n = len(freqs)
+        wg = self.wavegen_controller
+        cmds = ["SOURce1:FREQuency:MODE LIST",                                  # 1) List mode
+                "SOURce1:LIST:FREQuency " + ",".join(str(f) for f in freqs),    # 2) Frequenzen
+                f"SOURce1:LIST:DWELL {dwell}",                                  # 3) Dwell pro Schritt
+                "TRIGger:SOURce IMMediate"]                                     # 4) interner Trigger
+        for cmd in cmds:
+            append_event(self.event_log, self.log_text, "SEND", cmd)
+        if sync:
+            append_event(self.event_log, self.log_text, "SEND", "*CLS;SRT")
         append_event(self.event_log, self.log_text, "SEND", "INITiate")
-    
-        # 6) Update GUI status
-        self.status_var.set(f"List scan started: {n} frequencies, dwell={dwell:.3f}s")
-        append_event(self.event_log, self.log_text, "INFO", "List scan started")
+
+        def load_and_start():
+            for cmd in cmds:
+                wg.write(cmd)
+            if sync:
+                # OSA vor dem Start der Liste in Repeat schalten
+                self.controller.write("*CLS")
+                self.controller.write("SRT")
+            # 5) Arm and start the list
+            wg.write("INITiate")
+            t0 = time.time()
+            # Frequenz läuft jetzt im Gerät durch, gespiegelter Wert ist ungültig
+            wg.invalidate(1, "freq")
+            return t0
+
+        def started(t0):
+            # 6) Update GUI status
+            self.status_var.set(f"List scan started: {n} frequencies, dwell={dwell:.3f}s")
+            append_event(self.event_log, self.log_text, "INFO", "List scan started")
+            if sync:
+                self.scan_running = True
+                self.scan_abort.clear()
+                threading.Thread(target=self._list_scan_thread,
+                                 args=(freqs, dwell, t0), daemon=True).start()
+            else:
+                # ohne OSA-Sync: nach Ablauf der Liste Spiegel verwerfen und neu lesen
+                self.master.after(int(n * dwell * 1000) + 100, self._list_scan_finished)
+
+        def failed(e):
+            self.error_var.set(f"List scan start failed: {e}")
+            append_event(self.event_log, self.log_text, "ERROR", f"List scan start failed: {e}")
+
+        submit_to_tk(self, wg.executor, load_and_start, on_done=started, on_error=failed)
+
+    def _list_scan_finished(self):
+        self.wavegen_controller.invalidate(1, "freq")
+        threading.Thread(target=self._refresh_wavegen_freq, daemon=True).start()
+        self.status_var.set("List scan done")
+        append_event(self.event_log, self.log_text, "INFO", "List scan done")
+
+    def _refresh_wavegen_freq(self):
+        try:
+            self.wavegen_controller.refresh(1, "freq")
+        except Exception as e:
+            self.master.after(0, lambda e=e: self.error_var.set(f"Wavegen read error: {e}"))
+
+    def _list_scan_thread(self, freqs, dwell, t0):
+        """
+        Liest die Repeat-Sweeps des OSA, während der Wavegen seine Liste
+        selbstständig abarbeitet, und ordnet jeden Sweep über Zeitstempel
+        und Dwell dem Listen-Index zu. Pro Index wird der stärkste Peak behalten.
+        """
+        self.master.after(0, lambda: append_event(self.event_log, self.log_text, "INFO", "List scan thread started"))
+        osa = self.controller.osa
+        n = len(freqs)
+        t_end_list = t0 + n * dwell
+        best = {}            # index -> (peak_dbm, wl)
+        watcher = SweepWatcher(self.controller, self._estimate_sweep() or 0.5)
+        t_prev = None        # Ende des vorherigen Sweeps = Start des aktuellen
+        self._scan_freqs, self._scan_peaks, self._scan_wl = [], [], []
+        self._scan_windows = []
+        self.master.after(0, self._refresh_scan_table)
+
+        while not self.scan_abort.is_set() and time.time() < t_end_list:
+            try:
+                got = watcher.next_sweep(self.scan_abort, deadline=t_end_list)
+            except Exception as e:
+                self.master.after(0, lambda e=e: self.error_var.set(f"List scan read error: {e}"))
+                break
+            if got is None:
+                break
+            raw, t_now = got
+            t_start, t_prev = t_prev, t_now
+
+            idx = list_index_for_sweep(t_start, t_now, t0, dwell, n)
+            if idx is None:
+                self.master.after(0, lambda: append_event(self.event_log, self.log_text, "INFO",
+                                                          "Sweep across step boundary discarded"))
+                continue
+
+            try:
+                dbm = np.fromstring(raw, dtype=float, sep="\r\n")
+                wl = self.controller.wavelength_axis(dbm.size)
+            except Exception as e:
+                self.master.after(0, lambda e=e: self.error_var.set(f"List scan parse error: {e}"))
+                continue
+            lin = 10 ** (dbm / 10)
+            k = int(np.nanargmax(dbm))
+            val, wl0 = dbm[k], wl[k]
+            f = float(freqs[idx])
+            self.master.after(0, lambda v=val, w=wl0, f=f: self._set_peak(v, w, f))
+            self.master.after(0, lambda w=wl, ln=lin, db=dbm: self.plot_results(w, ln, db, live=True))
+
+            if idx not in best or val > best[idx][0]:
+                best[idx] = (val, wl0, self._window_of(wl))
+                order = sorted(best)
+                self._scan_freqs = [float(freqs[i]) for i in order]
+                self._scan_peaks = [best[i][0] for i in order]
+                self._scan_wl    = [best[i][1] for i in order]
+                self._scan_windows = [best[i][2] for i in order]
+                self.master.after(0, self._refresh_scan_table)
+                self.master.after(0, self.update_scan_plot)
+
+        try:
+            osa.write("SST")
+            self.wavegen_controller.write("SOURce1:FREQuency:MODE CW")
+        except Exception:
+            pass
+        # Frequenz nach dem List-Mode unbekannt: verwerfen und neu lesen
+        self.wavegen_controller.invalidate(1, "freq")
+        self._refresh_wavegen_freq()
+        self.scan_running = False
+        msg = f"List scan done: {len(best)}/{n} frequencies measured"
+        self.master.after(0, lambda: self.status_var.set(msg))
+        self.master.after(0, lambda: append_event(self.event_log, self.log_text, "INFO", msg))
 
 
 
@@ -1754,11 +2360,18 @@ class OSAGUI(ttk.Frame):
     # ─── Aufräumen bei Schließen ─────────────────────────────────────────────
     def on_closing(self):
         self.repeat_abort.set()
-        try:
-            if self.controller.osa:
-                append_event(self.event_log, self.log_text, "SEND", "SST")
-                self.controller.osa.write("SST")
-        except:
-            pass
-        self.master.destroy()
+        if not self.controller.osa:
+            self.master.destroy()
+            return
+        append_event(self.event_log, self.log_text, "SEND", "SST")
+
+        def close(_=None):
+            try:
+                self.master.destroy()
+            except tk.TclError:
+                pass        # schon geschlossen (Fallback-Timer)
+        # SST im Executor senden und erst danach schließen; hängt das Gerät, nach 2 s trotzdem
+        submit_to_tk(self, self.controller.executor, self.controller.write, "SST",
+                     on_done=close, on_error=close)
+        self.master.after(2000, close)
 
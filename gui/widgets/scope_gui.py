@@ -1,11 +1,16 @@
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.colors import to_rgb
 
 from controllers.scope_controller import ScopeController
-from utils.helpers import get_best_unit, nice_divisor, format_rec_length, convert_volts_to_display
+from utils.helpers import get_best_unit, unit_for_absmax, nice_divisor, format_rec_length, convert_volts_to_display
+from utils.data_processing import FrameStats, PersistenceHistogram
+from utils.decimation import MinMaxDecimator
+from utils.executor import submit_to_tk
 
 UNITS = {"V": 1, "mV": 1e-3, "uV": 1e-6}
 SCALE_FACTOR = {"V": 1, "mV": 1e3, "uV": 1e6}
@@ -16,6 +21,7 @@ class ScopeGUI(ttk.Frame):
         super().__init__(parent)
         self.controller = controller if controller else ScopeController()
         self.running = False
+        self._acq_pending = False   # Acquisition-Job im Executor unterwegs
 
         self.channel_order = self.controller.get_channel_list()
         self.include_channels = {ch: tk.BooleanVar(value=(ch in ["CH2", "CH3"])) for ch in self.channel_order}
@@ -38,13 +44,25 @@ class ScopeGUI(ttk.Frame):
         self.rec_length_cached = 2000
         self.acq_mode_var = tk.StringVar(value="SAMPLE")
         self.avg_count_var = tk.StringVar(value="16")
+        self.live_width_var = tk.StringVar(value="8 bit")
+        # Anzeige: Linien oder Nachleuchten (Persistence) im Haupt-Plot
+        self.display_mode = tk.StringVar(value="Lines")
+        self.persist_frames = tk.IntVar(value=50)
+        self.persistence = {}       # ch → PersistenceHistogram
 
         self.channel_btns = {}
         self.channel_tabs = {}
         self.channel_figs = {}
         self.channel_axes = {}
         self.channel_canvases = {}
+        self.channel_decimators = {}
         self.latest_data = {}
+        self.latest_stats = {}      # ch → FrameStats des letzten Frames
+        self._plot_buffers = {}     # (Ansicht, ch) → Anzeigepuffer, pro Frame überschrieben
+        # Frame-Statistik für die Anzeige der Raten
+        self.frames_drawn = 0
+        self.display_rate = 0.0
+        self._rate_t0 = time.time()
 
         self._build_gui()
         self.after(self.refresh_interval.get(), self._plot_timer)
@@ -66,7 +84,23 @@ class ScopeGUI(ttk.Frame):
         ctr.pack(fill=tk.X, padx=5, pady=(0,2))
         ttk.Label(ctr, text="Plot Refresh [ms]:").pack(side=tk.LEFT, padx=5)
         tk.Spinbox(ctr, from_=50, to=1000, increment=50, textvariable=self.refresh_interval, width=6).pack(side=tk.LEFT, padx=5)
-        tk.Checkbutton(ctr, text="Normalize Data", variable=self.normalize_data).pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(ctr, text="Normalize Data", variable=self.normalize_data,
+                       command=self.clear_persistence).pack(side=tk.LEFT, padx=5)
+        ttk.Label(ctr, text="Live Transfer:").pack(side=tk.LEFT, padx=(15,3))
+        cb_width = ttk.Combobox(ctr, values=["8 bit", "16 bit"], textvariable=self.live_width_var,
+                                width=6, state="readonly")
+        cb_width.pack(side=tk.LEFT, padx=3)
+        cb_width.bind("<<ComboboxSelected>>", lambda e: self.set_live_width())
+        ttk.Label(ctr, text="Display:").pack(side=tk.LEFT, padx=(15,3))
+        cb_disp = ttk.Combobox(ctr, values=["Lines", "Persistence"], textvariable=self.display_mode,
+                               width=11, state="readonly")
+        cb_disp.pack(side=tk.LEFT, padx=3)
+        cb_disp.bind("<<ComboboxSelected>>", lambda e: self.clear_persistence())
+        ttk.Label(ctr, text="Persist [frames]:").pack(side=tk.LEFT, padx=(8,3))
+        tk.Spinbox(ctr, from_=1, to=10000, increment=10, textvariable=self.persist_frames, width=6).pack(side=tk.LEFT, padx=3)
+        ttk.Button(ctr, text="Clear", width=6, command=self.clear_persistence).pack(side=tk.LEFT, padx=3)
+        self.rate_label = tk.Label(ctr, text="Acq: -- /s   Display: -- /s")
+        self.rate_label.pack(side=tk.LEFT, padx=15)
 
         ctrl = ttk.Frame(self)
         ctrl.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -154,23 +188,33 @@ class ScopeGUI(ttk.Frame):
         self.ax_main.set_xlabel("Time (ns)")
         self.ax_main.set_ylabel("Normalized")
         self.ax_main.grid()
+        self.main_decimator = MinMaxDecimator(self.ax_main)
         self.canvas_main = FigureCanvasTkAgg(self.fig_main, master=self.main_tab)
         self.canvas_main.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         ttk.Button(self.main_tab, text="Save All PNG", command=self.save_main_plot).pack(side=tk.BOTTOM, pady=5)
         self.update_channel_tabs()
 
     def toggle_connect(self):
+        ex = self.controller.executor
         if self.controller.is_connected():
             self.running = False
-            self.controller.disconnect()
-        else:
-            ip = self.scope_ip.get().strip()
-            ok = self.controller.connect(ip)
+            submit_to_tk(self, ex, self.controller.disconnect,
+                         on_done=lambda _: self.update_connect_button())
+            return
+        ip = self.scope_ip.get().strip()
+
+        def done(ok):
             if ok:
-                self.running = True
-                self.rec_length_label.config(text=format_rec_length(self.controller.rec_length_cached))
-            else:
-                messagebox.showerror("Fehler", "Keine Verbindung zum Oszilloskop möglich!")
+                self.on_connected()
+                return
+            messagebox.showerror("Fehler", "Keine Verbindung zum Oszilloskop möglich!")
+            self.update_connect_button()
+        submit_to_tk(self, ex, self.controller.connect, ip, on_done=done)
+
+    def on_connected(self):
+        """Nach erfolgreichem Connect im GUI-Thread: Anzeige und Live-Betrieb starten."""
+        self.running = True
+        self.rec_length_label.config(text=format_rec_length(self.controller.rec_length_cached))
         self.update_connect_button()
 
     def update_connect_button(self):
@@ -191,81 +235,100 @@ class ScopeGUI(ttk.Frame):
                 self.run_stop_btn.config(bg="red", text="Stop")
 
     def verify_parameters(self):
-        try:
-            tb = float(self.controller.scope.query("HORizontal:MAIN:SCAle?")) * 1e9
-            self.timebase_ns.set(tb)
-        except Exception:
-            pass
-        try:
-            rl = int(self.controller.scope.query("HORizontal:RECordlength?"))
-            self.rec_length_cached = rl
-            self.rec_length_label.config(text=format_rec_length(rl))
-        except Exception:
-            pass
-        try:
-            mode = self.controller.scope.query("ACQ:MODE?").strip()
-            self.acq_mode_var.set(mode)
-        except Exception:
-            pass
-        if self.acq_mode_var.get() == "AVERAGE":
+        scope = self.controller.scope
+        src = self.trigger_source_var.get()
+        mode_before = self.acq_mode_var.get()
+
+        def read():
+            # jede Abfrage einzeln: eine fehlende Antwort lässt die übrigen Werte stehen
+            vals = {}
+            queries = [("tb", "HORizontal:MAIN:SCAle?", float),
+                       ("rl", "HORizontal:RECordlength?", int),
+                       ("mode", "ACQ:MODE?", str.strip)]
+            for key, cmd, conv in queries:
+                try:
+                    vals[key] = conv(scope.query(cmd))
+                except Exception:
+                    pass
+            if vals.get("mode", mode_before) == "AVERAGE":
+                try:
+                    vals["cnt"] = int(scope.query("ACQ:AVER:COUN?"))
+                except Exception:
+                    pass
             try:
-                cnt = int(self.controller.scope.query("ACQ:AVER:COUN?"))
-                self.avg_count_var.set(str(cnt))
+                vals["lvl"] = float(scope.query(f"TRIGger:A:LEVel:{src}?"))
             except Exception:
                 pass
-        try:
-            src = self.trigger_source_var.get()
-            lvl = float(self.controller.scope.query(f"TRIGger:A:LEVel:{src}?"))
-            val, unit = convert_volts_to_display(lvl)
-            self.scope_threshold.set(f"{val:.3f}")
-            self.scope_threshold_unit.set(unit)
-        except Exception:
-            pass
+            return vals
+
+        def show(vals):
+            if "tb" in vals:
+                self.timebase_ns.set(vals["tb"] * 1e9)
+            if "rl" in vals:
+                self.rec_length_cached = vals["rl"]
+                self.rec_length_label.config(text=format_rec_length(vals["rl"]))
+            if "mode" in vals:
+                self.acq_mode_var.set(vals["mode"])
+            if "cnt" in vals:
+                self.avg_count_var.set(str(vals["cnt"]))
+            if "lvl" in vals:
+                self._show_trigger_level(vals["lvl"])
+        submit_to_tk(self, self.controller.executor, read, on_done=show)
+
+    def _show_trigger_level(self, lvl):
+        val, unit = convert_volts_to_display(lvl)
+        self.scope_threshold.set(f"{val:.3f}")
+        self.scope_threshold_unit.set(unit)
 
     def set_scope_trigger_source(self):
-        try:
-            src = self.trigger_source_var.get()
-            lvl = self.controller.set_trigger_source(src)
-            val, unit = convert_volts_to_display(lvl)
-            self.scope_threshold.set(f"{val:.3f}")
-            self.scope_threshold_unit.set(unit)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to set trigger source:\n{e}")
+        src = self.trigger_source_var.get()
+        submit_to_tk(self, self.controller.executor, self.controller.set_trigger_source, src,
+                     on_done=self._show_trigger_level,
+                     on_error=lambda e: messagebox.showerror("Error", f"Failed to set trigger source:\n{e}"))
 
     def set_scope_threshold(self):
         try:
             src = self.trigger_source_var.get()
             volts = float(self.scope_threshold.get()) * UNITS[self.scope_threshold_unit.get()]
-            self.controller.set_trigger_level(src, volts)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to set trigger level:\n{e}")
+            return
+        submit_to_tk(self, self.controller.executor, self.controller.set_trigger_level, src, volts,
+                     on_error=lambda e: messagebox.showerror("Error", f"Failed to set trigger level:\n{e}"))
 
     def set_acquisition_mode(self):
-        try:
-            mode = self.acq_mode_var.get()
-            self.controller.set_acquisition_mode(mode)
+        mode = self.acq_mode_var.get()
+
+        def done(_):
             if mode == "AVERAGE":
                 self.combo_avg_count.config(state="readonly")
                 self.set_avg_count()
             else:
                 self.combo_avg_count.config(state="disabled")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to set acquisition mode:\n{e}")
+        submit_to_tk(self, self.controller.executor, self.controller.set_acquisition_mode, mode,
+                     on_done=done,
+                     on_error=lambda e: messagebox.showerror("Error", f"Failed to set acquisition mode:\n{e}"))
 
     def set_avg_count(self):
         try:
             cnt = int(self.avg_count_var.get())
-            self.controller.set_average_count(cnt)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to set average count:\n{e}")
+            return
+        submit_to_tk(self, self.controller.executor, self.controller.set_average_count, cnt,
+                     on_error=lambda e: messagebox.showerror("Error", f"Failed to set average count:\n{e}"))
+
+    def set_live_width(self):
+        """Transferbreite der Live-Ansicht (Speichern holt immer mit 16 bit)."""
+        self.controller.transfer_widths["live"] = 1 if self.live_width_var.get() == "8 bit" else 2
 
     def set_timebase(self, val_ns):
-        try:
+        def apply():
             self.controller.set_timebase(val_ns)
-            tb = self.controller.scope.query("HORizontal:MAIN:SCAle?")
-            self.timebase_ns.set(float(tb) * 1e9)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to set timebase:\n{e}")
+            return float(self.controller.scope.query("HORizontal:MAIN:SCAle?"))
+        submit_to_tk(self, self.controller.executor, apply,
+                     on_done=lambda tb: self.timebase_ns.set(tb * 1e9),
+                     on_error=lambda e: messagebox.showerror("Error", f"Failed to set timebase:\n{e}"))
 
     def decrease_timebase(self):
         new_tb = max(self.timebase_ns.get() / 2, 0.1)
@@ -296,7 +359,8 @@ class ScopeGUI(ttk.Frame):
     def update_channel_tabs(self):
         for ch in list(self.channel_tabs):
             self.tab_control.forget(self.channel_tabs[ch])
-            for d in (self.channel_tabs, self.channel_figs, self.channel_axes, self.channel_canvases):
+            for d in (self.channel_tabs, self.channel_figs, self.channel_axes, self.channel_canvases,
+                      self.channel_decimators):
                 d.pop(ch, None)
         for ch in self.channel_order:
             if self.include_channels[ch].get():
@@ -313,6 +377,7 @@ class ScopeGUI(ttk.Frame):
                 self.channel_figs[ch]     = fig
                 self.channel_axes[ch]     = ax
                 self.channel_canvases[ch] = canvas
+                self.channel_decimators[ch] = MinMaxDecimator(ax)
                 self.tab_control.add(frame, text=ch)
 
     def _plot_timer(self):
@@ -325,21 +390,73 @@ class ScopeGUI(ttk.Frame):
         for ch, btn in self.channel_btns.items():
             t, _ = self.latest_data.get(ch, (None, None))
             btn.config(relief=tk.SUNKEN if t is not None else tk.RAISED)
+        self.update_rates()
         self.after(1000, self._gui_timer)
 
+    def update_rates(self):
+        """Effektive Acquisition- und Anzeige-Rate (Frames/s) anzeigen."""
+        now = time.time()
+        dt = now - self._rate_t0
+        if dt > 0:
+            self.display_rate = self.frames_drawn / dt
+        self.frames_drawn, self._rate_t0 = 0, now
+        if self.controller.numacq_supported:
+            acq = f"{self.controller.acq_rate:.1f}"
+        else:
+            acq = "n/a"
+        self.rate_label.config(text=f"Acq: {acq} /s   Display: {self.display_rate:.1f} /s")
+
     def acquisition_step(self):
-        for ch in self.channel_order:
-            if not self.include_channels[ch].get():
-                continue
-            t, v = self.controller.get_waveform(ch)
-            if t is not None and v is not None:
-                if self.normalize_data.get():
-                    m = np.max(np.abs(v))
-                    v = v / m if m else v
+        if self._acq_pending:
+            return
+        enabled = [ch for ch in self.channel_order if self.include_channels[ch].get()]
+        # nur bei neuer Acquisition holen; neu eingeschaltete Kanäle sofort
+        missing = any(ch not in self.latest_data for ch in enabled)
+        normalize = self.normalize_data.get()
+
+        def grab():
+            # im Scope-Executor: NUMACQ-Abfrage und Transfer blockieren die GUI nicht
+            if not self.controller.poll_acquisition() and not missing:
+                return None
+            return {ch: self.fetch_waveform(ch, "live", normalize) for ch in enabled}
+
+        def show(frames):
+            self._acq_pending = False
+            if frames is None:
+                return
+            for ch, (t, v, stats) in frames.items():
                 self.latest_data[ch] = (t, v)
-            else:
-                self.latest_data[ch] = (None, None)
-        self.update_plot()
+                self.latest_stats[ch] = stats
+            self.update_plot()
+            self.frames_drawn += 1
+
+        def failed(e):
+            self._acq_pending = False
+            print(f"Acquisition failed: {e}")
+        self._acq_pending = True
+        submit_to_tk(self, self.controller.executor, grab, on_done=show, on_error=failed)
+
+    def fetch_waveform(self, ch, mode, normalize=False):
+        """
+        (t, v, stats) von ch holen, ggf. normiert (in place); (None, None, None)
+        wenn nicht verfügbar. stats (FrameStats) wird einmal pro Frame berechnet.
+        Läuft im Executor, daher normalize als Wert statt Tk-Variable.
+        """
+        t, v = self.controller.get_waveform(ch, mode)
+        if t is None or v is None:
+            return None, None, None
+        stats = FrameStats(v)
+        if normalize and stats.absmax:
+            np.divide(v, stats.absmax, out=v)
+            stats = stats.scaled(1 / stats.absmax)
+        return t, v, stats
+
+    def _scaled(self, view, ch, v, factor):
+        """v * factor in den wiederverwendeten Anzeigepuffer (view, ch) schreiben."""
+        buf = self._plot_buffers.get((view, ch))
+        if buf is None or buf.size != v.size:
+            buf = self._plot_buffers[(view, ch)] = np.empty(v.size)
+        return np.multiply(v, factor, out=buf)
 
     def update_plot(self):
         self.ax_main.clear()
@@ -352,11 +469,10 @@ class ScopeGUI(ttk.Frame):
         units = {}
         for ch,(t,v) in self.latest_data.items():
             if t is None: continue
-            max_t = max(max_t, np.max(t))
-            unit_ch = get_best_unit(v)
-            scale_ch = SCALE_FACTOR[unit_ch]
-            v_scaled = v * scale_ch
-            v_div_ch = nice_divisor(np.nanmax(np.abs(v_scaled))/5)
+            max_t = max(max_t, t[-1])
+            stats = self.latest_stats.get(ch) or FrameStats(v)
+            unit_ch = unit_for_absmax(stats.absmax)
+            v_div_ch = nice_divisor(stats.absmax * SCALE_FACTOR[unit_ch] / 5)
             scales[ch] = v_div_ch
             units[ch] = unit_ch
         if max_t <= 0:
@@ -366,14 +482,25 @@ class ScopeGUI(ttk.Frame):
         self.ax_main.set_xticks(xticks)
         self.ax_main.set_ylim(-5,5)
         self.ax_main.set_yticks(np.arange(-5,6))
+        persistence = self.display_mode.get() == "Persistence"
+        if persistence:
+            # V/div und Einheit beim Eintritt (bzw. nach Clear) einfrieren
+            for ch in scales:
+                scales[ch], units[ch] = self._persistence_hist(ch).freeze((scales[ch], units[ch]))
         for ch,(t,v) in self.latest_data.items():
             if t is None or ch not in scales: continue
-            v_norm = (v * SCALE_FACTOR[units[ch]]) / scales[ch]
-            self.ax_main.plot(
+            v_norm = self._scaled("main", ch, v, SCALE_FACTOR[units[ch]] / scales[ch])
+            if persistence:
+                if self.include_channels[ch].get():
+                    self.accumulate_persistence(ch, v_norm)
+                continue
+            self.main_decimator.plot(
                 t, v_norm,
                 label=self.channel_names[ch].get(),
                 color=self.channel_colors[ch].get()
             )
+        if persistence:
+            self.draw_persistence(max_t, [ch for ch in scales if self.include_channels[ch].get()])
         for idx,ch in enumerate(scales):
             disp_val, disp_unit = convert_volts_to_display(scales[ch] * UNITS[units[ch]])
             self.ax_main.text(
@@ -383,7 +510,7 @@ class ScopeGUI(ttk.Frame):
                 color=self.channel_colors[ch].get(),
                 fontsize=10, verticalalignment='bottom'
             )
-        if scales:
+        if scales and not persistence:
             self.ax_main.legend(loc="upper right")
         self.canvas_main.draw()
         for ch in self.channel_order:
@@ -399,25 +526,69 @@ class ScopeGUI(ttk.Frame):
             if t is None:
                 canvas.draw()
                 continue
-            unit_ch = get_best_unit(v)
-            v_scaled = v * SCALE_FACTOR[unit_ch]
-            v_div_ch = nice_divisor(np.nanmax(np.abs(v_scaled))/5)
-            ax.set_xlim(0, np.max(t))
-            xticks_ch = np.arange(0, np.max(t)+self.timebase_ns.get(), self.timebase_ns.get())
+            stats = self.latest_stats.get(ch) or FrameStats(v)
+            unit_ch = unit_for_absmax(stats.absmax)
+            v_scaled = self._scaled("tab", ch, v, SCALE_FACTOR[unit_ch])
+            v_div_ch = nice_divisor(stats.absmax * SCALE_FACTOR[unit_ch] / 5)
+            ax.set_xlim(0, t[-1])
+            xticks_ch = np.arange(0, t[-1]+self.timebase_ns.get(), self.timebase_ns.get())
             ax.set_xticks(xticks_ch)
             ax.set_ylim(-v_div_ch*5, v_div_ch*5)
             ax.set_yticks(np.arange(-5,6)*v_div_ch)
-            ax.plot(t, v_scaled, color=self.channel_colors[ch].get())
+            self.channel_decimators[ch].plot(t, v_scaled, color=self.channel_colors[ch].get())
             disp_val, disp_unit = convert_volts_to_display(v_div_ch)
+            # Messwerte in der echten Einheit des Kanals, auch bei normierten Daten
+            meas_unit = unit_for_absmax(stats.volts(stats.absmax))
+            vpp = stats.volts(stats.vpp) * SCALE_FACTOR[meas_unit]
+            rms = stats.volts(stats.rms) * SCALE_FACTOR[meas_unit]
             ax.text(
                 0.02, 0.02,
-                f"{disp_val:.2f} {disp_unit}/div",
+                f"{disp_val:.2f} {disp_unit}/div   Vpp {vpp:.3g} {meas_unit}   RMS {rms:.3g} {meas_unit}",
                 transform=ax.transAxes,
                 color=self.channel_colors[ch].get(),
                 fontsize=10, verticalalignment='bottom'
             )
             canvas.draw()
 
+    # ─── Persistence ─────────────────────────────────────────────────────────
+    def clear_persistence(self):
+        for hist in self.persistence.values():
+            hist.clear()
+
+    def _persistence_hist(self, ch):
+        hist = self.persistence.get(ch)
+        if hist is None:
+            hist = self.persistence[ch] = PersistenceHistogram()
+        return hist
+
+    def accumulate_persistence(self, ch, v_div):
+        """Frame (in div, -5…5) ins Nachleucht-Gitter von ch einsortieren."""
+        hist = self._persistence_hist(ch)
+        try:
+            frames = max(self.persist_frames.get(), 1)
+        except tk.TclError:
+            frames = 50
+        hist.decay = np.exp(-1.0 / frames)
+        hist.add(v_div)
+
+    def draw_persistence(self, max_t, channels):
+        """Alle Kanäle als ein RGBA-Bild: Kanalfarbe, Deckkraft = Häufigkeit."""
+        hists = [(ch, self.persistence[ch]) for ch in channels if ch in self.persistence]
+        if not hists:
+            return
+        h, w = hists[0][1].grid.shape
+        rgb = np.zeros((h, w, 3))
+        alpha = np.zeros((h, w))
+        for ch, hist in hists:
+            a = hist.intensity()
+            rgb += a[..., None] * np.array(to_rgb(self.channel_colors[ch].get()))
+            np.maximum(alpha, a, out=alpha)
+        img = np.empty((h, w, 4))
+        np.clip(rgb, 0, 1, out=img[..., :3])
+        img[..., 3] = alpha
+        self.ax_main.imshow(img, extent=(0, max_t, -5, 5), origin="lower",
+                            aspect="auto", interpolation="nearest")
+
     def save_main_plot(self):
         path = filedialog.asksaveasfilename(defaultextension=".png")
         if path:
@@ -434,10 +605,23 @@ class ScopeGUI(ttk.Frame):
             messagebox.showinfo("Saved", f"{ch} plot saved to:\n{path}")
 
     def save_numpy_data(self):
-        if not self.latest_data:
+        if not self.controller.is_connected():
+            self._save_numpy(self.latest_data)
+            return
+        enabled = [ch for ch in self.channel_order if self.include_channels[ch].get()]
+        normalize = self.normalize_data.get()
+
+        def capture():
+            # Capture mit voller Auflösung (16 bit) statt der Live-Daten
+            return {ch: self.fetch_waveform(ch, "capture", normalize)[:2] for ch in enabled}
+        submit_to_tk(self, self.controller.executor, capture, on_done=self._save_numpy,
+                     on_error=lambda e: messagebox.showerror("Error", f"Capture failed:\n{e}"))
+
+    def _save_numpy(self, data):
+        if not data:
             messagebox.showwarning("No Data", "No data to save.")
             return
-        valid = [(t,v) for t,v in self.latest_data.values() if t is not None]
+        valid = [(t,v) for t,v in data.values() if t is not None]
         if not valid:
             messagebox.showwarning("No Data", "No valid data to save.")
             return
@@ -446,7 +630,7 @@ class ScopeGUI(ttk.Frame):
         arr = np.full((max_len, len(self.channel_order)+1), np.nan)
         arr[:,0] = time_base
         for i,ch in enumerate(self.channel_order, start=1):
-            t,v = self.latest_data.get(ch,(None,None))
+            t,v = data.get(ch,(None,None))
             if t is None: continue
             unit_ch = get_best_unit(v)
             v_scaled = v * SCALE_FACTOR[unit_ch]
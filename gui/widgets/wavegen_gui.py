@@ -6,6 +6,7 @@ import time
 from controllers.wavegen_controller import WavegenController
 from controllers.osa_controller import OSAController
 from utils.tooltip import Tooltip
+from utils.executor import submit_to_tk
 
 class WavegenGUI(ttk.Frame):
     def __init__(self, parent, controller=None, osa_controller: OSAController=None):
@@ -130,6 +131,13 @@ class WavegenGUI(ttk.Frame):
         self.osa_wl_entry.insert(0, "1550")
         self.osa_wl_entry.grid(row=2, column=1, padx=5, pady=2)
         Tooltip(self.osa_wl_entry, "Wavelength for power-meter (nm)")
+        self.auto_settle = tk.BooleanVar(value=False)
+        settle_cb = tk.Checkbutton(scan_frame, text="Auto settle", variable=self.auto_settle)
+        settle_cb.grid(row=2, column=2, columnspan=2, sticky="w", padx=5, pady=2)
+        if self.osa_ctrl is None:
+            # ohne OSA-Controller gibt es nichts zum Einschwingen
+            settle_cb.config(state=tk.DISABLED)
+        Tooltip(settle_cb, "Proceed as soon as OSA power is stable (Pause = timeout)")
         tk.Button(scan_frame, text="Start Scan", command=self.start_scan)\
             .grid(row=3, column=0, padx=5, pady=5)
         tk.Button(scan_frame, text="Stop Scan", command=self.stop_scan)\
@@ -143,31 +151,42 @@ class WavegenGUI(ttk.Frame):
 
         self.update_mode()
 
-    def toggle_connection(self):
+    def toggle_connection(self, then=None):
+        """Connect/Disconnect im Executor; then() läuft nach erfolgreichem Connect."""
         if self.controller.gen is None:
-            try:
-                ip = self.ip_entry.get().strip()
-                self.controller.connect(ip)
-                self.status("Generator connected")
-                self.connect_button.config(text="Disconnect", bg="green")
-                self.read_settings(1)
-                if self.independent:
-                    self.read_settings(2)
-                self.update_output_buttons()
-            except Exception as e:
+            ip = self.ip_entry.get().strip()
+
+            def connected(_):
+                self.on_connected()
+                if then:
+                    then()
+
+            def failed(e):
                 messagebox.showerror("Error", f"Connection failed: {e}")
                 self.controller.disconnect()
                 self.connect_button.config(text="Connect", bg="red")
+            self.status("Connecting...")
+            submit_to_tk(self, self.controller.executor, self.controller.connect, ip,
+                         on_done=connected, on_error=failed)
         else:
-            try:
-                self.controller.disconnect()
+            def disconnected(_):
                 self.status("Disconnected")
                 self.connect_button.config(text="Connect", bg="red")
                 self.gen_button1.config(text="Channel 1 OFF", bg="red")
                 self.gen_button2.config(text="Channel 2 OFF", bg="red")
                 self.generator_on = {1: False, 2: False}
-            except Exception as e:
-                messagebox.showerror("Error", f"Disconnection failed: {e}")
+            submit_to_tk(self, self.controller.executor, self.controller.disconnect,
+                         on_done=disconnected,
+                         on_error=lambda e: messagebox.showerror("Error", f"Disconnection failed: {e}"))
+
+    def on_connected(self):
+        """Nach erfolgreichem Connect im GUI-Thread: Buttons und Kanalwerte."""
+        self.status("Generator connected")
+        self.connect_button.config(text="Disconnect", bg="green")
+        self.read_settings(1, refresh=False)
+        if self.independent:
+            self.read_settings(2, refresh=False)
+        self.update_output_buttons()
 
     def toggle_mode(self):
         self.independent = not self.independent
@@ -250,9 +269,8 @@ class WavegenGUI(ttk.Frame):
 
     def set_settings(self, channel):
         if self.controller.gen is None:
-            self.toggle_connection()
-            if self.controller.gen is None:
-                return
+            self.toggle_connection(then=lambda: self.set_settings(channel))
+            return
         try:
             e = self.entries_ch[channel]
             freq = float(e["Frequency (Hz):"].get())
@@ -261,33 +279,49 @@ class WavegenGUI(ttk.Frame):
             width_ns = int(round(float(e["Pulse Width (ns):"].get())))
             func = self.func_var_ch[channel].get()
 
-            self.controller.write(f"SOUR{channel}:FUNC {func}")
-            self.controller.write(f"SOUR{channel}:VOLT {volt}")
-            self.controller.write(f"SOUR{channel}:VOLT:OFFS {offs}")
+            params = dict(func=func, volt=volt, offs=offs, load=50, freq=freq)
             if func == "PULSe":
-                self.controller.write(f"SOUR{channel}:PULS:WIDT {width_ns*1e-9}")
-            self.controller.write(f"OUTP{channel}:LOAD 50")
-            self.controller.write(f"SOUR{channel}:FREQ {freq}")
-            self.current_frequency[channel] = freq
-            self.status(f"Ch{channel} settings applied: {freq:.3f} Hz")
-            if not self.independent and channel==1:
-                self.update_phase_from_delay()
-            self.update_output_buttons()
+                params["width"] = width_ns*1e-9
         except Exception as e:
             messagebox.showerror("Error", f"Set settings failed (Ch{channel}): {e}")
+            return
 
-    def read_settings(self, channel):
+        def send():
+            self.controller.apply(channel, **params)
+            self.after(0, self._settings_applied, channel, freq)
+        # offene Button-Eingaben zuerst raus, dann nur geänderte Parameter (ohne die GUI zu blockieren)
+        self.controller.dispatcher.after_pending(send, lambda e: self.after(
+            0, lambda: messagebox.showerror("Error", f"Set settings failed (Ch{channel}): {e}")))
+
+    def _settings_applied(self, channel, freq):
+        self.current_frequency[channel] = freq
+        self.status(f"Ch{channel} settings applied: {freq:.3f} Hz")
+        if not self.independent and channel==1:
+            self.update_phase_from_delay()
+        self.update_output_buttons()
+
+    def read_settings(self, channel, refresh=True):
         if self.controller.gen is None:
-            self.toggle_connection()
-            if self.controller.gen is None:
-                return
+            self.toggle_connection(then=lambda: self.read_settings(channel, refresh))
+            return
+        params = ("func", "freq", "volt", "offs", "width", "output")
+
+        def read():
+            # alle Kanalparameter inkl. Ausgang in einer Abfrage
+            if refresh:
+                st = self.controller.refresh(channel, *params)
+            else:
+                # Spiegel nutzen (z.B. nach Connect All bereits gefüllt), Fehlendes gebündelt
+                st = self.controller.get_many(channel, *params)
+            self.after(0, self._show_settings, channel, st)
+        # nach den offenen Button-Eingaben lesen, Anzeige per after im GUI-Thread
+        self.controller.dispatcher.after_pending(read, lambda e: self.after(
+            0, lambda: messagebox.showerror("Error", f"Read settings failed (Ch{channel}): {e}")))
+
+    def _show_settings(self, channel, st):
         try:
-            func = self.controller.query(f"SOUR{channel}:FUNC?").strip()
-            freq = float(self.controller.query(f"SOUR{channel}:FREQ?").strip())
-            volt = float(self.controller.query(f"SOUR{channel}:VOLT?").strip())
-            offs = float(self.controller.query(f"SOUR{channel}:VOLT:OFFS?").strip())
-            width_resp = float(self.controller.query(f"SOUR{channel}:PULS:WIDT?").strip())
-            width_ns = int(round(width_resp * 1e9))
+            func, freq, volt, offs = st["func"], st["freq"], st["volt"], st["offs"]
+            width_ns = int(round(st["width"] * 1e9))
 
             e = self.entries_ch[channel]
             e["Frequency (Hz):"].delete(0, tk.END);    e["Frequency (Hz):"].insert(0, f"{freq:.3f}")
@@ -298,8 +332,7 @@ class WavegenGUI(ttk.Frame):
             self.current_frequency[channel] = freq
 
             self.status(f"Ch{channel} settings read")
-            state = self.controller.query(f"OUTP{channel}?").strip()
-            is_on = state in ("1","ON")
+            is_on = st["output"]
             btn = self.gen_button1 if channel==1 else self.gen_button2
             btn.config(text=f"Channel {channel} {'ON' if is_on else 'OFF'}",
                        bg="green" if is_on else "red")
@@ -327,46 +360,53 @@ class WavegenGUI(ttk.Frame):
             e2["Pulse Width (ns):"].delete(0, tk.END);   e2["Pulse Width (ns):"].insert(0, f"{width_ns}")
             self.func_var_ch[2].set(func)
 
-            self.controller.write(f"SOUR2:FUNC {func}")
-            self.controller.write(f"SOUR2:VOLT {volt}")
-            self.controller.write(f"SOUR2:VOLT:OFFS {offs}")
-            self.controller.write(f"SOUR2:PULS:WIDT {width_ns*1e-9}")
-            self.controller.write(f"OUTP2:LOAD 50")
-            self.controller.write(f"SOUR2:FREQ {freq}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Apply failed: {e}")
+            return
+
+        def done(_):
             self.current_frequency[2] = freq
             self.status("Ch2 params applied from Ch1")
             self.update_output_buttons()
-        except Exception as e:
-            messagebox.showerror("Error", f"Apply failed: {e}")
+        submit_to_tk(self, self.controller.executor, self.controller.apply, 2,
+                     func=func, volt=volt, offs=offs, width=width_ns*1e-9, load=50, freq=freq,
+                     on_done=done, on_error=lambda e: messagebox.showerror("Error", f"Apply failed: {e}"))
 
     def toggle_generator(self, channel):
         if self.controller.gen is None:
-            self.toggle_connection()
-            if self.controller.gen is None:
-                return
-        try:
-            is_on = not self.generator_on[channel]
-            cmd = "ON" if is_on else "OFF"
-            self.controller.write(f"OUTP{channel} {cmd}")
-            btn = self.gen_button1 if channel==1 else self.gen_button2
-            btn.config(text=f"Channel {channel} {cmd}",
-                       bg="green" if is_on else "red")
-            self.generator_on[channel] = is_on
+            self.toggle_connection(then=lambda: self.toggle_generator(channel))
+            return
+        is_on = not self.generator_on[channel]
+        cmd = "ON" if is_on else "OFF"
+
+        def done(_):
+            self._show_output(channel, is_on)
             self.status(f"Channel {channel} {cmd}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Toggle error (Ch{channel}): {e}")
+        submit_to_tk(self, self.controller.executor, self.controller.set_output, channel, is_on,
+                     on_done=done,
+                     on_error=lambda e: messagebox.showerror("Error", f"Toggle error (Ch{channel}): {e}"))
+
+    def _show_output(self, ch, is_on):
+        btn = self.gen_button1 if ch==1 else self.gen_button2
+        btn.config(text=f"Channel {ch} {'ON' if is_on else 'OFF'}",
+                   bg="green" if is_on else "red")
+        self.generator_on[ch] = is_on
 
     def update_output_buttons(self):
-        for ch in (1,2):
-            try:
-                state = self.controller.query(f"OUTP{ch}?").strip()
-                is_on = state in ("1","ON")
-                btn = self.gen_button1 if ch==1 else self.gen_button2
-                btn.config(text=f"Channel {ch} {'ON' if is_on else 'OFF'}",
-                           bg="green" if is_on else "red")
-                self.generator_on[ch] = is_on
-            except:
-                pass
+        def read():
+            # Ausgangszustand aus dem Spiegel, OUTP? nur wenn unbekannt
+            states = {}
+            for ch in (1,2):
+                try:
+                    states[ch] = self.controller.output_state(ch)
+                except Exception:
+                    pass
+            return states
+
+        def show(states):
+            for ch, is_on in states.items():
+                self._show_output(ch, is_on)
+        submit_to_tk(self, self.controller.executor, read, on_done=show)
 
     def adjust_frequency(self, channel, step):
         try:
@@ -377,7 +417,7 @@ class WavegenGUI(ttk.Frame):
             self.entries_ch[channel]["Frequency (Hz):"].delete(0, tk.END)
             self.entries_ch[channel]["Frequency (Hz):"].insert(0, f"{new_f:.3f}")
             if self.controller.gen:
-                self.controller.write(f"SOUR{channel}:FREQ {new_f}")
+                self.controller.set_frequency_later(channel, new_f, self._dispatch_error)
                 self.current_frequency[channel] = new_f
                 self.status(f"Ch{channel} freq adjusted to {new_f:.3f} Hz")
                 if not self.independent and channel==1:
@@ -395,7 +435,7 @@ class WavegenGUI(ttk.Frame):
             self.entries_ch[channel]["Frequency (Hz):"].delete(0, tk.END)
             self.entries_ch[channel]["Frequency (Hz):"].insert(0, f"{new_f:.3f}")
             if self.controller.gen:
-                self.controller.write(f"SOUR{channel}:FREQ {new_f}")
+                self.controller.set_frequency_later(channel, new_f, self._dispatch_error)
                 self.current_frequency[channel] = new_f
                 self.status(f"Ch{channel} freq set to {new_f:.3f} Hz")
         except Exception as e:
@@ -409,10 +449,15 @@ class WavegenGUI(ttk.Frame):
             self.phase_deg = phase
             self.phase_label.config(text=f"{phase:.2f}")
             if self.controller.gen:
-                self.controller.write(f"SOUR2:PHASe {phase}")
+                self.controller.dispatcher.submit(
+                    ("phase", 2), lambda: self.controller.apply(2, phase=phase), self._dispatch_error)
         except Exception as e:
             messagebox.showerror("Error", f"Phase update failed: {e}")
 
+    def _dispatch_error(self, e):
+        # kommt aus dem Dispatcher-Thread → Anzeige im GUI-Thread
+        self.after(0, lambda: self.status(f"Send failed: {e}"))
+
     def start_scan(self):
         try:
             f0    = float(self.start_entry.get())
@@ -420,23 +465,26 @@ class WavegenGUI(ttk.Frame):
             step  = float(self.step_entry.get())
             pause = float(self.pause_entry.get())
             wl    = float(self.osa_wl_entry.get())
+            auto  = self.auto_settle.get()
         except Exception as e:
             messagebox.showerror("Error", f"Invalid scan params: {e}")
             return
 
         def worker():
+            self.controller.dispatcher.flush(1.0)
             results = []
             f = f0
             while f <= f1:
                 # set wavegen
-                self.controller.write(f"SOUR1:FREQ {f}")
-                time.sleep(pause)
+                self.controller.set_frequency(1, f)
+                have_osa = self.osa_ctrl and getattr(self.osa_ctrl, "osa", None)
+                if auto and have_osa:
+                    self.osa_ctrl.wait_settled(method="power", wl_nm=wl, timeout=pause)
+                else:
+                    time.sleep(pause)
                 # measure OSA if available
-                if self.osa_ctrl and getattr(self.osa_ctrl, "osa", None):
-                    osa = self.osa_ctrl.osa
-                    osa.write(f"PWR {wl}")
-                    osa.query("*OPC?")
-                    p = float(osa.query("PWRR?"))
+                if have_osa:
+                    p = self.osa_ctrl.read_power(wl)
                     results.append((f, p))
                 f += step
             if results:
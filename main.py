@@ -4,23 +4,38 @@ from gui.main_gui import MainGUI
 from controllers.scope_controller import ScopeController
 from controllers.wavegen_controller import WavegenController
 from controllers.osa_controller import OSAController
+from controllers.connection_manager import ConnectionManager
 
-def main():
+def build_app():
+    """Fenster und Main-GUI erzeugen (ohne mainloop, auch für benchmarks/startup_time.py)."""
     root = tk.Tk()
     root.title("AIO Control Modular")
     root.geometry("1200x900")
     root.focus_force()
-    root.state("zoomed")
+    try:
+        root.state("zoomed")
+    except tk.TclError:
+        # "zoomed" gibt es nur unter Windows, "-zoomed" nur unter X11
+        try:
+            root.attributes("-zoomed", True)
+        except tk.TclError:
+            pass
 
 
     # Controller erzeugen (können optional später mit Parametern instanziiert werden)
     scope_ctrl = ScopeController()
     wavegen_ctrl = WavegenController()
     osa_ctrl = OSAController()
+    # paralleler Verbindungsaufbau, ein gemeinsamer ResourceManager
+    connections = ConnectionManager()
 
     # Main-GUI starten
-    app = MainGUI(root, scope_ctrl, wavegen_ctrl, osa_ctrl)
+    app = MainGUI(root, scope_ctrl, wavegen_ctrl, osa_ctrl, connections)
     app.pack(fill="both", expand=True)
+    return root, app
+
+def main():
+    root, app = build_app()
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from utils.decimation import MinMaxDecimator, MinMaxPyramid, minmax_decimate
+
+
+class _FakeLine:
+    def __init__(self, ax, x, y):
+        self.axes, self.x, self.y = ax, x, y
+
+    def set_data(self, x, y):
+        self.x, self.y = x, y
+
+
+class _FakeAx:
+    """Minimales Axes-Double: plot/clear/callbacks ohne matplotlib."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.callbacks = self
+        self.lines = []
+
+    def connect(self, name, fn):
+        pass
+
+    def get_window_extent(self):
+        raise RuntimeError("kein Fenster")
+
+    def plot(self, x, y, *args, **kwargs):
+        line = _FakeLine(self, x, y)
+        self.lines.append(line)
+        return [line]
+
+
+@pytest.fixture(scope="module")
+def series():
+    x = np.arange(1_000_003, dtype=float)
+    y = np.sin(x / 500.0) + np.random.default_rng(0).normal(0, 0.1, x.size)
+    return x, y
+
+
+@pytest.mark.parametrize("buckets", [2, 7, 100, 333, 1000, 1500, 4096])
+@pytest.mark.parametrize("xlim", [None, (0, 5_000), (12_345, 600_001), (999_000, 2e6)])
+def test_pyramid_query_stays_within_two_points_per_bucket(series, buckets, xlim):
+    pyr = MinMaxPyramid(*series)
+    xs, ys = pyr.query(buckets, xlim)
+    assert len(xs) == len(ys)
+    assert len(ys) <= 2 * buckets
+
+
+@pytest.mark.parametrize("m", [50, 2001, 2999, 3001, 10_007, 50_001])
+def test_minmax_decimate_bound_and_peaks(m):
+    x = np.arange(m, dtype=float)
+    y = np.zeros(m)
+    y[m // 3] = 5.0
+    xs, ys = minmax_decimate(x, y, 1000)
+    assert len(ys) <= 2 * 1000
+    assert ys.max() == 5.0
+
+
+def test_pyramid_query_keeps_extremes(series):
+    x, y = series
+    pyr = MinMaxPyramid(x, y)
+    _, ys = pyr.query(800)
+    assert ys.min() == y.min()
+    assert ys.max() == y.max()
+
+
+def test_decimator_reuses_pyramid_until_data_changes(series):
+    x, y = series
+    ax = _FakeAx()
+    dec = MinMaxDecimator(ax, pyramid_min=200_000)
+    dec.plot(x, y)
+    first = dec._lines[0][1]
+    ax.clear()
+    dec.plot(x[:], y[:])                # neue Views, gleiche Daten
+    assert dec._lines[0][1] is first
+    y2 = y.copy()
+    dec.plot(x, y2)                     # anderes Array → neue Pyramide
+    assert dec._lines[-1][1] is not first
+    y2[::7] += 1.0                      # in place geändert → neu bauen
+    second = dec._lines[-1][1]
+    dec.plot(x, y2)
+    assert dec._lines[-1][1] is not second
+
+
+def test_decimator_without_pyramid_min_decimates_directly(series):
+    x, y = series
+    dec = MinMaxDecimator(_FakeAx())
+    dec.plot(x, y)
+    assert not isinstance(dec._lines[0][1], MinMaxPyramid)
+    assert len(dec._lines[0][0].y) <= 2 * dec.default_px
@@ -0,0 +1,51 @@
+import threading
+
+from utils.executor import InstrumentExecutor, TkResultPump, submit_to_tk
+
+
+class _FakeRoot:
+    """Tk-Ersatz: after() merkt sich Callbacks, run() führt sie im Testthread aus."""
+
+    def __init__(self):
+        self.calls = []
+        self.thread = threading.current_thread()
+
+    def _root(self):
+        return self
+
+    def after(self, ms, fn, *args):
+        assert threading.current_thread() is self.thread, "after() aus fremdem Thread"
+        self.calls.append((fn, args))
+
+    def run(self, executor):
+        executor.submit(lambda: None).result()      # Worker ist fertig
+        while self.calls:
+            fn, args = self.calls.pop(0)
+            fn(*args)
+
+
+def test_results_are_delivered_in_tk_thread():
+    root, ex = _FakeRoot(), InstrumentExecutor("test")
+    got, errors = [], []
+
+    def fail():
+        raise ValueError("kaputt")
+    submit_to_tk(root, ex, lambda: threading.current_thread(), on_done=got.append)
+    submit_to_tk(root, ex, fail, on_error=errors.append)
+    root.run(ex)
+    assert got and got[0] is not root.thread
+    assert isinstance(errors[0], ValueError)
+    assert not root._tk_result_pump._polling
+
+
+def test_failing_callback_does_not_stop_polling():
+    root, ex = _FakeRoot(), InstrumentExecutor("test")
+    got = []
+
+    def boom(_):
+        raise RuntimeError("Callback-Fehler")
+    submit_to_tk(root, ex, lambda: 1, on_done=boom)
+    submit_to_tk(root, ex, lambda: 2, on_done=got.append)
+    root.run(ex)
+    assert got == [2]
+    assert TkResultPump.for_widget(root)._pending == 0
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from utils.data_processing import FrameStats
+
+
+def test_stats_match_numpy():
+    v = np.random.default_rng(1).normal(0.3, 2.0, 10_000)
+    st = FrameStats(v)
+    assert st.min == v.min() and st.max == v.max()
+    assert st.absmax == np.abs(v).max()
+    assert st.mean == pytest.approx(v.mean())
+    assert st.rms == pytest.approx(np.sqrt(np.mean(v * v)))
+    assert st.nan_count == 0
+
+
+def test_nans_are_counted_and_ignored():
+    v = np.array([1.0, np.nan, -3.0, 2.0, np.nan])
+    st = FrameStats(v)
+    assert st.nan_count == 2
+    assert (st.min, st.max, st.absmax) == (-3.0, 2.0, 3.0)
+    assert st.mean == pytest.approx(0.0)
+    empty = FrameStats(np.full(4, np.nan))
+    assert empty.nan_count == 4 and empty.rms == 0.0
@@ -0,0 +1,195 @@
+import threading
+import time
+
+import pytest
+from pyvisa import constants
+from pyvisa.errors import VisaIOError
+
+from controllers.osa_controller import OSAController, SweepWatcher
+from controllers.simulated_osa import SimulatedOSA
+from utils.executor import SerializedResource
+
+
+def _controller(sim):
+    ctrl = OSAController()
+    ctrl.estimator.path = None          # keine Kalibrierdatei schreiben
+    ctrl.osa = SerializedResource(sim, ctrl.executor)
+    return ctrl
+
+
+@pytest.fixture
+def osa():
+    ctrl = OSAController()
+    ctrl.estimator.path = None
+    ctrl.connect_simulated(sweep_time=0.2)
+    yield ctrl
+    ctrl.disconnect()
+
+
+def _abort_after(seconds):
+    abort = threading.Event()
+    threading.Timer(seconds, abort.set).start()
+    return abort
+
+
+# ─── Sweep-Ende / Abbruch ─────────────────────────────────────────────────
+def test_sweep_completes_via_esr_polling(osa):
+    t0 = time.time()
+    assert osa.sweep(abort=threading.Event()) is True
+    assert 0.15 < time.time() - t0 < 1.0
+
+
+def test_sweep_completes_via_srq(osa):
+    assert osa.sweep(abort=threading.Event(), use_srq=True) is True
+
+
+def test_sweep_done_is_nonblocking(osa):
+    osa.start_sweep()
+    t0 = time.time()
+    assert osa.sweep_done() is False
+    assert time.time() - t0 < 0.1
+    assert osa.wait_sweep(timeout=2.0) is True
+
+
+@pytest.mark.parametrize("use_srq", [False, True])
+def test_sweep_abort_is_fast(use_srq):
+    ctrl = _controller(SimulatedOSA(sweep_time=5.0))
+    t0 = time.time()
+    assert ctrl.sweep(abort=_abort_after(0.1), use_srq=use_srq) is False
+    assert time.time() - t0 < 0.5
+    ctrl.disconnect()
+
+
+def test_sweep_timeout_raises(osa):
+    osa.osa.sweep_time = 5.0
+    with pytest.raises(TimeoutError):
+        osa.sweep(abort=threading.Event(), timeout=0.1)
+
+
+def test_quick_sweep_peak_returns_none_on_abort(osa):
+    osa.osa.sweep_time = 5.0
+    t0 = time.time()
+    assert osa.quick_sweep_peak(abort=_abort_after(0.1)) is None
+    assert time.time() - t0 < 0.5
+
+
+def test_quick_sweep_peak_finds_peak(osa):
+    dbm, wl = osa.quick_sweep_peak(abort=threading.Event())
+    assert wl == pytest.approx(1548.5, abs=0.05)
+    assert dbm > -30
+
+
+# ─── Repeat-Sweeps ────────────────────────────────────────────────────────
+def test_sweep_watcher_uses_status_bit(osa):
+    osa.write("SRT")
+    watcher = SweepWatcher(osa, est_sweep_s=0.2)
+    abort = threading.Event()
+    _, t1 = watcher.next_sweep(abort)
+    _, t2 = watcher.next_sweep(abort)
+    assert watcher.use_status
+    assert t2 - t1 == pytest.approx(0.2, abs=0.1)
+
+
+class _NoEsr2OSA(SimulatedOSA):
+    """Firmware ohne erweitertes Event-Register: ESR2? liefert immer 0."""
+
+    def _handle_query(self, cmd):
+        if cmd.upper().startswith("ESR2"):
+            return "0"
+        return super()._handle_query(cmd)
+
+
+def test_sweep_watcher_falls_back_to_hash():
+    osa = _controller(_NoEsr2OSA(sweep_time=0.2))
+    osa.write("SRT")
+    watcher = SweepWatcher(osa, est_sweep_s=0.1)
+    abort = threading.Event()
+    raws = [watcher.next_sweep(abort, deadline=time.time() + 5)[0] for _ in range(3)]
+    assert not watcher.use_status
+    assert len(set(raws)) == 3
+
+
+class _SilentEsr2OSA(SimulatedOSA):
+    """Firmware, die ESR2? ignoriert: die Abfrage läuft in den VISA-Timeout."""
+
+    def _handle_query(self, cmd):
+        if cmd.upper().startswith("ESR2"):
+            time.sleep(self.timeout / 1000)
+            raise VisaIOError(constants.StatusCode.error_timeout)
+        return super()._handle_query(cmd)
+
+
+def test_sweep_watcher_probes_esr2_with_short_timeout():
+    osa = _controller(_SilentEsr2OSA(sweep_time=0.2))
+    osa.osa.timeout = 60_000
+    osa.write("SRT")
+    t0 = time.time()
+    watcher = SweepWatcher(osa, est_sweep_s=0.2, probe_timeout_ms=200)
+    assert time.time() - t0 < 1.0
+    assert not watcher.use_status
+    assert osa.osa.timeout == 60_000
+    raw, _ = watcher.next_sweep(threading.Event(), deadline=time.time() + 2)
+    assert raw
+
+
+# ─── Parameter ────────────────────────────────────────────────────────────
+def test_set_params_writes_only_changes(osa):
+    osa.read_params(["CNT", "SPN", "RES"])
+    assert osa.set_params({"CNT": 1548.5}) == {}
+    result = osa.set_params({"SPN": 5, "RES": 0.05})
+    assert float(result["SPN"]) == 5
+    assert float(osa.params["RES"]) == 0.05
+    assert float(osa.read_params(["SPN"])["SPN"]) == 5
+
+
+def test_set_params_invalidates_axis(osa):
+    axis = osa.wavelength_axis()
+    osa.set_params({"SPN": 10})
+    assert osa.wavelength_axis() is not axis
+    assert osa.wavelength_axis()[-1] - osa.wavelength_axis()[0] == pytest.approx(10)
+
+
+class _FixedResOSA(SimulatedOSA):
+    """Gerät, das RES-Änderungen ignoriert."""
+
+    def _handle_write(self, cmd):
+        if not cmd.upper().startswith("RES"):
+            super()._handle_write(cmd)
+
+
+def test_set_params_reports_rejected_value():
+    osa = _controller(_FixedResOSA())
+    with pytest.raises(ValueError):
+        osa.set_params({"RES": 0.5})
+
+
+# ─── Settling ─────────────────────────────────────────────────────────────
+def test_wait_settled_sweep_restores_mpt_via_cache(osa):
+    osa.osa.sweep_time = 0.05
+    osa.set_params({"MPT": 1001})
+    stable, _ = osa.wait_settled(method="sweep", tol_db=5.0, timeout=3.0,
+                                 abort=threading.Event())
+    assert stable
+    assert float(osa.params["MPT"]) == 1001
+    assert osa.wavelength_axis().size == 1001
+
+
+def test_wait_settled_sweep_honours_abort_and_deadline(osa):
+    osa.osa.sweep_time = 5.0
+    t0 = time.time()
+    stable, _ = osa.wait_settled(method="sweep", timeout=10.0, abort=_abort_after(0.1))
+    assert not stable and time.time() - t0 < 0.5
+    t0 = time.time()
+    stable, _ = osa.wait_settled(method="sweep", timeout=10.0, abort=threading.Event(),
+                                 deadline=time.time() + 0.2)
+    assert not stable and time.time() - t0 < 0.6
+
+
+# ─── Trace-Speicher ───────────────────────────────────────────────────────
+def test_burst_capture_reports_each_sweep(osa):
+    osa.osa.sweep_time = 0.05
+    durations = []
+    raws = osa.burst_capture(3, abort=threading.Event(), on_sweep=durations.append)
+    assert sorted(raws) == ["A", "B", "C"]
+    assert len(durations) == 3 and all(d >= 0.05 for d in durations)
+    assert len(set(raws.values())) == 3
@@ -0,0 +1,52 @@
+import numpy as np
+
+from utils.data_processing import PersistenceHistogram
+from utils.helpers import nice_divisor
+
+
+def _frame(amplitude, n=1000):
+    return amplitude * np.sin(np.linspace(0, 4 * np.pi, n))
+
+
+def _accumulate(hist, frames):
+    """Wie ScopeGUI.update_plot: Autoscale je Frame, im Persistence-Modus eingefroren."""
+    for v in frames:
+        auto = nice_divisor(np.max(np.abs(v)) / 5)
+        hist.add(v / hist.freeze(auto))
+
+
+def test_glitch_frame_does_not_rescale_grid():
+    frames = [_frame(0.9)] * 5 + [_frame(3.6)] + [_frame(0.9)] * 5
+    hist = PersistenceHistogram(width=100, height=100, decay=1.0)
+    _accumulate(hist, frames)
+    assert hist.scale == 0.2
+
+    # Referenz: alle Frames in derselben festen Skala eingetragen
+    ref = PersistenceHistogram(width=100, height=100, decay=1.0)
+    for v in frames:
+        ref.add(v / 0.2)
+    np.testing.assert_array_equal(hist.grid, ref.grid)
+
+    # der Glitch (18 div Spitze) ragt über das Gitter hinaus statt auf 3.6 div zu schrumpfen
+    glitch = PersistenceHistogram(width=100, height=100, decay=1.0)
+    glitch.add(_frame(3.6) / 0.2)
+    assert glitch.grid.sum() < 1000
+
+
+def test_clear_releases_frozen_scale():
+    hist = PersistenceHistogram(decay=1.0)
+    _accumulate(hist, [_frame(0.9)])
+    assert hist.scale == 0.2
+    hist.clear()
+    _accumulate(hist, [_frame(3.6), _frame(0.9)])
+    assert hist.scale == 1.0
+    assert hist.frames == 2
+
+
+def test_add_accumulates_in_place():
+    hist = PersistenceHistogram(width=100, height=100, decay=0.5)
+    grid = hist.grid
+    hist.add(_frame(4.0))
+    hist.add(_frame(4.0))
+    assert hist.grid is grid
+    assert hist.grid.sum() == 1000 * 0.5 + 1000
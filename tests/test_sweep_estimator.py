@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from controllers.osa_controller import OSAController
+from utils.sweep_estimator import SweepTimeEstimator, nnls
+
+CONFIGS = [(spn, res, vbw, mpt, smt)
+           for spn in (2, 50, 1200) for res in (0.03, 0.1)
+           for vbw in (100, 10_000) for mpt in (501, 5001) for smt in (0, 5)]
+
+
+def test_nnls_matches_nonnegative_solution():
+    rng = np.random.default_rng(1)
+    A = rng.uniform(0, 1, (40, 5))
+    x_true = np.array([0.2, 0.0, 1.5, 0.3, 0.0])
+    x = nnls(A, A @ x_true)
+    assert np.all(x >= 0)
+    np.testing.assert_allclose(x, x_true, atol=1e-8)
+
+
+def test_calibration_follows_faster_instrument():
+    est = SweepTimeEstimator(path=None)
+    for cfg in CONFIGS:
+        default = est.features(*cfg) @ np.array(est.DEFAULT_COEFFS)
+        est.add_measurement(*cfg, seconds=0.3 * default)
+    for cfg in CONFIGS:
+        default = est.features(*cfg) @ np.array(est.DEFAULT_COEFFS)
+        assert est.estimate(*cfg) == pytest.approx(max(0.3 * default, 0.05), rel=1e-6)
+        assert est.upper_bound(*cfg) >= default
+
+
+def test_sweep_timeout_stays_conservative():
+    ctrl = OSAController()
+    ctrl.estimator = SweepTimeEstimator(path=None)
+    for cfg in CONFIGS:
+        ctrl.estimator.add_measurement(*cfg, seconds=0.01)
+    params = dict(spn=1200, res=0.03, vbw_hz=10, mpt=50001, smt=0)
+    default = ctrl.estimator.features(**params) @ np.array(SweepTimeEstimator.DEFAULT_COEFFS)
+    assert ctrl.estimate_sweep(params) < default
+    assert ctrl.apply_sweep_timeout(params) >= 3 * default * 1000
+    assert ctrl.apply_sweep_timeout(dict(spn=1, res=1, vbw_hz=1e6, mpt=51)) == 60_000
@@ -0,0 +1,69 @@
+import pytest
+
+from controllers.wavegen_controller import WavegenController
+from utils.executor import SerializedResource
+
+
+class _FakeGen:
+    """Minimaler 33500B-Ersatz: beantwortet Compound-Abfragen, zählt Round-Trips."""
+
+    ANSWERS = {"FUNC": "PULS", "VOLT": "+2.0E+00", "VOLT:OFFS": "+0.0E+00",
+               "PULS:WIDT": "+1.0E-07", "LOAD": "+5.0E+01", "FREQ": "+1.0E+06",
+               "PHAS": "+0.0E+00"}
+
+    def __init__(self):
+        self.queries, self.writes = [], []
+
+    def query(self, cmd):
+        self.queries.append(cmd)
+        answers = []
+        for part in cmd.split(";"):
+            head = part.strip(":?").split(":", 1)[1] if ":" in part.strip(":?") else ""
+            answers.append(self.ANSWERS.get(head, "0"))
+        return ";".join(answers) + "\n"
+
+    def write(self, cmd):
+        self.writes.append(cmd)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def wg():
+    ctrl = WavegenController()
+    ctrl.gen = SerializedResource(_FakeGen(), ctrl.executor)
+    yield ctrl
+    ctrl.dispatcher.cancel()
+
+
+def test_get_many_reads_missing_params_in_one_query(wg):
+    st = wg.get_many(1, "func", "freq", "volt", "offs", "width", "output")
+    assert len(wg.gen.resource.queries) == 1
+    assert st["freq"] == 1e6 and st["func"] == "PULS"
+    wg.get_many(1, "func", "freq")
+    assert len(wg.gen.resource.queries) == 1
+
+
+def test_refresh_includes_load(wg):
+    assert wg.get(1, "load") == 50.0
+    assert "OUTP1:LOAD?" in wg.gen.resource.queries[0]
+
+
+def test_apply_sends_only_changes(wg):
+    wg.get_many(1, "func", "freq", "volt")
+    assert wg.apply(1, func="PULSe", freq=1e6, volt=2.0) == ""
+    assert wg.set_frequency(1, 2e6) == "SOUR1:FREQ 2000000.0"
+    assert wg.gen.resource.writes == ["SOUR1:FREQ 2000000.0"]
+
+
+@pytest.mark.parametrize("a, b, same", [
+    ("PULS", "PULSe", True),
+    ('"PULS"', "PULS", True),
+    ("", "PULS", False),
+    ("SIN", "SQUare", False),
+    ("P", "PULS", False),
+    (50, "+5.0E+01", True),
+])
+def test_same_compares_full_values(a, b, same):
+    assert WavegenController._same(a, b) is same
@@ -1,4 +1,5 @@
 import numpy as np
+import time
 
 def normalize_data(data):
     """Normiert ein 1D-Array auf den Bereich 0...1."""
@@ -25,3 +26,141 @@ def smooth(data, window_size=5):
     if len(data) < window_size:
         return data
     return np.convolve(data, np.ones(window_size)/window_size, mode='valid')
+
+def wait_until_stable(read, tol, n_stable=3, timeout=2.0, abort=None):
+    """
+    Ruft read() wiederholt auf, bis die letzten n_stable Werte innerhalb tol
+    liegen (max - min). Gibt True bei Stabilität, False bei Timeout/Abbruch.
+    """
+    t_end = time.time() + timeout
+    values = []
+    while time.time() < t_end:
+        if abort is not None and abort.is_set():
+            return False
+        try:
+            v = read()
+        except Exception:
+            v = None
+        if v is None or not np.isfinite(v):
+            values.clear()
+            time.sleep(0.01)
+            continue
+        values.append(v)
+        recent = values[-n_stable:]
+        if len(recent) == n_stable and max(recent) - min(recent) <= tol:
+            return True
+    return False
+
+def smt_to_int(smt):
+    """Smooth-Einstellung ("OFF", "3", ...) als Zahl, OFF = 0."""
+    try:
+        return int(float(smt))
+    except (TypeError, ValueError):
+        return 0
+
+def find_peaks(y, **kwargs):
+    """scipy.signal.find_peaks, scipy wird erst beim ersten Aufruf importiert (Startzeit)."""
+    from scipy.signal import find_peaks as _find_peaks
+    return _find_peaks(y, **kwargs)
+
+class FrameStats:
+    """
+    Kennwerte eines Frames (min, max, absmax, mean, rms, nan_count), einmal pro Frame
+    berechnet und geteilt. gain: Volt pro Werteinheit (nach dem Normieren ≠ 1).
+    """
+    __slots__ = ("n", "min", "max", "absmax", "mean", "rms", "nan_count", "gain")
+
+    def __init__(self, v):
+        v = np.asarray(v, dtype=float)
+        self.n = v.size
+        self.nan_count = 0
+        self.gain = 1.0
+        if v.size == 0:
+            self.min = self.max = self.absmax = self.mean = self.rms = 0.0
+            return
+        # 1. Durchlauf: Extremwerte (NaN schlägt auf min durch → dient als NaN-Test)
+        lo = np.min(v)
+        if np.isnan(lo):
+            v = v[~np.isnan(v)]
+            self.nan_count = self.n - v.size
+            if v.size == 0:
+                self.min = self.max = self.absmax = self.mean = self.rms = 0.0
+                return
+            lo = np.min(v)
+        self.min, self.max = float(lo), float(np.max(v))
+        self.absmax = max(-self.min, self.max)
+        # 2. Durchlauf: Summe und Quadratsumme
+        self.mean = float(np.sum(v)) / v.size
+        self.rms = float(np.sqrt(np.dot(v, v) / v.size))
+
+    @property
+    def vpp(self):
+        return self.max - self.min
+
+    def scaled(self, factor):
+        """Kennwerte für v * factor ohne neuen Durchlauf (z.B. nach dem Normieren)."""
+        s = object.__new__(FrameStats)
+        s.n, s.nan_count = self.n, self.nan_count
+        s.gain = self.gain / factor
+        lo, hi = self.min * factor, self.max * factor
+        s.min, s.max = min(lo, hi), max(lo, hi)
+        s.absmax = abs(self.absmax * factor)
+        s.mean = self.mean * factor
+        s.rms = abs(self.rms * factor)
+        return s
+
+    def volts(self, value):
+        """Kennwert (z.B. vpp, rms) zurück in Volt, auch nach scaled()."""
+        return value * self.gain
+
+
+class PersistenceHistogram:
+    """
+    Nachleucht-Anzeige (Digital Phosphor): jeder Frame wird in ein festes
+    Zeit×Spannung-Gitter einsortiert (np.add.at, in place), ältere Frames klingen mit
+    decay pro Frame exponentiell ab. Rechen- und Zeichenaufwand hängen nur
+    von der Gittergröße ab, nicht von der Anzahl Frames.
+    Die Skala (z.B. (V/div, Einheit)) wird mit freeze() beim ersten Frame
+    festgehalten und erst mit clear() wieder frei, damit ein einzelner
+    Glitch-Frame das Gitter nicht in einer anderen V/div-Skala einträgt.
+    """
+
+    def __init__(self, width=500, height=256, vmin=-5.0, vmax=5.0, decay=0.98):
+        self.width, self.height = width, height
+        self.vmin, self.vmax = vmin, vmax
+        self.decay = decay
+        self.grid = np.zeros((height, width))
+        self.frames = 0
+        self.scale = None           # eingefrorene Skala, None = noch offen
+        self._cols = None           # Spalte je Sample-Index, gecacht je Frame-Länge
+
+    def clear(self):
+        self.grid.fill(0.0)
+        self.frames = 0
+        self.scale = None
+
+    def freeze(self, scale):
+        """Skala beim ersten Aufruf nach clear() übernehmen; gibt die gültige zurück."""
+        if self.scale is None:
+            self.scale = scale
+        return self.scale
+
+    def add(self, v):
+        """Frame v (Werte im Bereich vmin..vmax, z.B. in div) einsortieren."""
+        n = len(v)
+        if self._cols is None or len(self._cols) != n:
+            self._cols = np.arange(n) * self.width // max(n, 1)
+        rows = (np.asarray(v) - self.vmin) * (self.height / (self.vmax - self.vmin))
+        valid = (rows >= 0) & (rows < self.height)       # NaN und Übersteuerung fallen raus
+        idx = rows[valid].astype(np.intp) * self.width + self._cols[valid]
+        self.grid *= self.decay
+        # in place über die flache View, ohne Gitter-großes Temporär-Array pro Frame
+        np.add.at(self.grid.reshape(-1), idx, 1.0)
+        self.frames += 1
+
+    def intensity(self):
+        """Gitter logarithmisch auf 0…1 komprimiert (seltene Glitches bleiben sichtbar)."""
+        peak = self.grid.max()
+        if peak <= 0:
+            return np.zeros_like(self.grid)
+        return np.log1p(self.grid) / np.log1p(peak)
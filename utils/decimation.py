@@ -0,0 +1,253 @@
+"""
+Min/Max-Dezimierung für die Plots: pro Pixel-Spalte nur Minimum und Maximum
+zeichnen. Spitzen bleiben sichtbar, der Zeichenaufwand hängt nur noch von
+der Breite der Achse ab, nicht von der Punktzahl (OSA bis 50001 Punkte).
+Die Min/Max-Pyramide nutzt nur der PlotViewer für lange Dateien; die
+Live-Ansichten bleiben weit darunter und dezimieren direkt.
+"""
+import os
+from collections import OrderedDict
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+# Marker-Zeichen in matplotlib-Formatstrings ("o", "r.", "x--", ...)
+_FMT_MARKERS = set("o.,v^<>1234sp*hH+xXDd|_")
+_NO_STYLE = (None, "None", "none", "", " ")
+
+
+def minmax_decimate(x, y, buckets, xlim=None):
+    """
+    Reduziert (x, y) auf Min/Max je Bucket, höchstens 2*buckets Punkte.
+    x muss aufsteigend sortiert sein. Mit xlim wird nur der sichtbare
+    Bereich (plus je ein Nachbarpunkt) dezimiert, damit beim Zoomen das
+    Detail erhalten bleibt. Rückgabe (x, y) als Views/Index-Kopien.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    i0, i1 = 0, n
+    if xlim is not None:
+        lo, hi = sorted(xlim)
+        i0 = max(int(np.searchsorted(x, lo, "left")) - 1, 0)
+        i1 = min(int(np.searchsorted(x, hi, "right")) + 1, n)
+    xs, ys = x[i0:i1], y[i0:i1]
+    m = i1 - i0
+    buckets = max(int(buckets), 1)
+    if m <= 2 * buckets:
+        return xs, ys
+
+    # ein Bucket bleibt für Rest und Randpunkte reserviert → ≤ 2*buckets
+    size = -(-m // max(buckets - 1, 1))
+    k = m // size
+    body = ys[:k * size].reshape(k, size)
+    imin = body.argmin(axis=1)
+    imax = body.argmax(axis=1)
+    base = np.arange(k) * size
+    idx = np.empty(2 * k, dtype=np.intp)
+    # Reihenfolge innerhalb des Buckets beibehalten (Linie läuft nicht zurück)
+    idx[0::2] = base + np.minimum(imin, imax)
+    idx[1::2] = base + np.maximum(imin, imax)
+    parts = [[0], idx]
+    if k * size < m:
+        tail = ys[k * size:]
+        parts.append(k * size + np.sort([tail.argmin(), tail.argmax()]))
+    parts.append([m - 1])
+    idx = np.unique(np.concatenate(parts))
+    return xs[idx], ys[idx]
+
+
+def is_sorted(x):
+    """True, wenn x aufsteigend sortiert ist (Voraussetzung für die Dezimierung)."""
+    x = np.asarray(x)
+    return x.ndim == 1 and (len(x) < 2 or bool(np.all(x[1:] >= x[:-1])))
+
+
+class MinMaxPyramid:
+    """
+    Vorberechnete Min/Max-Pyramide für lange 1D-Reihen (Millionen Punkte,
+    z.B. im PlotViewer geladene Logdateien):
+    Stufe k fasst factor**k Rohwerte zusammen. query() holt für den sichtbaren
+    Bereich genau die Stufe, die gerade noch ≥ 1 Eintrag pro Pixel liefert,
+    statt bei jedem Zoom/Pan alle Rohdaten neu zu dezimieren.
+    Mit memmap_dir (Ordner oder True für das Temp-Verzeichnis) liegen die
+    Stufen als np.memmap auf der Platte. x muss aufsteigend sortiert sein.
+    """
+
+    def __init__(self, x, y, factor=4, min_size=1000, memmap_dir=None):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.factor = int(factor)
+        if memmap_dir:
+            # eigenes Unterverzeichnis je Pyramide, damit sich nichts überschreibt
+            memmap_dir = tempfile.mkdtemp(prefix="pyramid_",
+                                          dir=None if memmap_dir is True else memmap_dir)
+            weakref.finalize(self, shutil.rmtree, memmap_dir, True)
+        self.memmap_dir = memmap_dir
+        self.levels = []            # [(mins, maxs)], Stufe 1..L (Stufe 0 = Rohdaten)
+        mins = maxs = self.y
+        while len(mins) > min_size:
+            # fmin/fmax: NaN-Lücken verschlucken nicht den ganzen Bucket
+            mins, maxs = self._reduce(mins, np.fmin), self._reduce(maxs, np.fmax)
+            mins, maxs = self._store(mins, "min"), self._store(maxs, "max")
+            self.levels.append((mins, maxs))
+
+    def _reduce(self, a, ufunc):
+        n = len(a) // self.factor * self.factor
+        out = ufunc.reduce(a[:n].reshape(-1, self.factor), axis=1)
+        if n < len(a):
+            out = np.append(out, ufunc.reduce(a[n:]))
+        return out
+
+    def _store(self, a, kind):
+        if not self.memmap_dir:
+            return a
+        path = os.path.join(self.memmap_dir, f"level{len(self.levels) + 1}_{kind}.dat")
+        mm = np.memmap(path, dtype=a.dtype, mode="w+", shape=a.shape)
+        mm[:] = a
+        mm.flush()
+        return mm
+
+    def __len__(self):
+        return len(self.y)
+
+    def query(self, buckets, xlim=None):
+        """(x, y) für den Bereich xlim mit höchstens 2*buckets Punkten (Min/Max je Bucket)."""
+        n = len(self.y)
+        i0, i1 = 0, n
+        if xlim is not None:
+            lo, hi = sorted(xlim)
+            i0 = max(int(np.searchsorted(self.x, lo, "left")) - 1, 0)
+            i1 = min(int(np.searchsorted(self.x, hi, "right")) + 1, n)
+        buckets = max(int(buckets), 1)
+        # gröbste Stufe, die im Bereich noch mindestens buckets Einträge hat
+        level, scale = 0, 1
+        while (level < len(self.levels)
+               and -(-(i1 - i0) // (scale * self.factor)) >= buckets):
+            level, scale = level + 1, scale * self.factor
+        if level == 0:
+            return minmax_decimate(self.x[i0:i1], self.y[i0:i1], buckets)
+        mins, maxs = self.levels[level - 1]
+        j0, j1 = i0 // scale, min(-(-i1 // scale), len(mins))
+        mins, maxs = np.asarray(mins[j0:j1]), np.asarray(maxs[j0:j1])
+        # auf höchstens buckets Einträge zusammenfassen (Rest zählt mit)
+        size = -(-len(mins) // buckets)
+        k = len(mins) // size
+        mn = np.fmin.reduce(mins[:k * size].reshape(k, size), axis=1)
+        mx = np.fmax.reduce(maxs[:k * size].reshape(k, size), axis=1)
+        if k * size < len(mins):
+            mn = np.append(mn, np.fmin.reduce(mins[k * size:]))
+            mx = np.append(mx, np.fmax.reduce(maxs[k * size:]))
+        # x am Bucket-Anfang, Min und Max als senkrechtes Segment
+        starts = np.minimum((j0 + np.arange(len(mn)) * size) * scale, n - 1)
+        xs = np.repeat(self.x[starts], 2)
+        ys = np.empty(2 * len(mn), dtype=mn.dtype)
+        ys[0::2], ys[1::2] = mn, mx
+        return xs, ys
+
+
+class MinMaxDecimator:
+    """
+    Zeichnet Linien dezimiert in ein Axes und rechnet sie bei jeder
+    xlim-Änderung (Zoom/Pan/Home) aus den vollen Daten neu.
+    Ersetzt ax.plot(x, y, ...) durch decimator.plot(x, y, ...). Mit pyramid_min
+    (Standard None = aus) wird ab so vielen Punkten eine MinMaxPyramid angelegt;
+    eine fertige Pyramide geht auch direkt (plot(pyramid, ...)).
+    Reihen mit Markern (oder ohne Linie) gehen unverändert an ax.plot.
+    ax.clear() legt die Callback-Registry neu an; das wird beim nächsten
+    plot() erkannt und die Verbindung neu aufgebaut.
+    """
+
+    def __init__(self, ax, default_px=1500, pyramid_min=None, memmap_dir=None,
+                 cache_size=8):
+        self.ax = ax
+        self.default_px = default_px
+        self.pyramid_min = pyramid_min
+        self.memmap_dir = memmap_dir
+        self.cache_size = cache_size
+        self._pyramids = OrderedDict()  # Schlüssel der Daten → (Stichprobe, MinMaxPyramid)
+        self._callbacks = None
+        self._lines = []            # (Line2D, Quelle: (x, y) oder MinMaxPyramid)
+
+    def buckets(self):
+        """Anzahl Buckets = Breite der Achse in Pixeln."""
+        try:
+            px = int(self.ax.get_window_extent().width)
+        except Exception:
+            px = 0
+        return px if px > 10 else self.default_px
+
+    @staticmethod
+    def is_line(args, kwargs):
+        """
+        True, wenn nur eine Linie gezeichnet wird. Marker/Scatter-Reihen
+        werden nicht dezimiert, sonst verschwinden einzelne Punkte.
+        """
+        if kwargs.get("marker") not in _NO_STYLE:
+            return False
+        if "linestyle" in kwargs or "ls" in kwargs:
+            if kwargs.get("linestyle", kwargs.get("ls")) in ("None", "none", "", " "):
+                return False
+        return not any(isinstance(a, str) and _FMT_MARKERS & set(a) for a in args)
+
+    def plot(self, x, y=None, *args, **kwargs):
+        self._attach()
+        if not self.is_line(args, kwargs):
+            if isinstance(x, MinMaxPyramid):
+                x, y = x.x, x.y
+            return self.ax.plot(x, y, *args, **kwargs)
+        if isinstance(x, MinMaxPyramid):
+            source = x
+        else:
+            x = np.asarray(x)
+            y = np.asarray(y)
+            if len(x) != len(y) or not is_sorted(x):
+                return self.ax.plot(x, y, *args, **kwargs)
+            if self.pyramid_min is not None and len(x) >= self.pyramid_min:
+                source = self.pyramid(x, y)
+            else:
+                source = (x, y)
+        line, = self.ax.plot(*self._decimate(source, None), *args, **kwargs)
+        self._lines.append((line, source))
+        return [line]
+
+    def pyramid(self, x, y):
+        """
+        MinMaxPyramid für (x, y) aus dem Cache, neu gebaut nur bei anderen
+        Daten. Wiedererkannt wird an Speicheradresse/Form/Strides von x und y
+        plus einer Stichprobe von ~1000 y-Werten, so greift der Cache auch bei
+        neuen Views (data[:, i]) und nach ax.clear(); wer dasselbe Array in
+        place ändert, bekommt über die Stichprobe eine neue Pyramide.
+        """
+        key = tuple((a.__array_interface__["data"][0], a.shape, a.strides, a.dtype.str)
+                    for a in (x, y))
+        sample = y[::max(len(y) // 1000, 1)].copy()
+        hit = self._pyramids.get(key)
+        if hit is not None and np.array_equal(hit[0], sample, equal_nan=True):
+            self._pyramids.move_to_end(key)
+            return hit[1]
+        pyr = MinMaxPyramid(x, y, memmap_dir=self.memmap_dir)
+        self._pyramids[key] = (sample, pyr)
+        self._pyramids.move_to_end(key)
+        while len(self._pyramids) > self.cache_size:
+            self._pyramids.popitem(last=False)
+        return pyr
+
+    def _decimate(self, source, xlim):
+        if isinstance(source, MinMaxPyramid):
+            return source.query(self.buckets(), xlim)
+        return minmax_decimate(*source, self.buckets(), xlim)
+
+    def _attach(self):
+        if self._callbacks is not self.ax.callbacks:
+            self._callbacks = self.ax.callbacks
+            self._lines = []
+            self._callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    def _on_xlim_changed(self, ax):
+        xlim = ax.get_xlim()
+        self._lines = [(line, src) for line, src in self._lines if line.axes is ax]
+        for line, source in self._lines:
+            line.set_data(*self._decimate(source, xlim))
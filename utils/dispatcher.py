@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class CoalescingDispatcher:
+    """
+    Sammelt schnelle UI-Änderungen pro Gerät: je Schlüssel (z.B. ("freq", 1))
+    wird nur der zuletzt eingereichte Befehl behalten und höchstens alle
+    min_interval Sekunden an das Gerät geschickt. Die GUI aktualisiert ihre
+    Anzeige sofort, die VISA-Verbindung sieht nur den Endwert.
+
+    submit(key, fn, on_error=None): fn() ohne Argumente, läuft im Worker-Thread
+    after_pending(fn, on_error):     fn läuft nach allen offenen Befehlen (nicht blockierend)
+    flush(timeout):                 wartet, bis alle offenen Befehle gesendet sind
+    """
+
+    def __init__(self, min_interval=0.05, name="dispatcher"):
+        self.min_interval = min_interval
+        self._pending = {}                 # key → (fn, on_error), Einfügereihenfolge = Sendereihenfolge
+        self._cond = threading.Condition()
+        self._busy = False
+        self._last = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, key, fn, on_error=None):
+        with self._cond:
+            # älteren Wert verwerfen, neuen ans Ende stellen
+            self._pending.pop(key, None)
+            self._pending[key] = (fn, on_error)
+            self._cond.notify_all()
+
+    def after_pending(self, fn, on_error=None):
+        """
+        fn im Worker ausführen, sobald alle bis jetzt eingereichten Befehle
+        gesendet sind; wird nie zusammengefasst. Nicht blockierende Alternative
+        zu flush() für den GUI-Thread.
+        """
+        self.submit(object(), fn, on_error)
+
+    def cancel(self, key=None):
+        with self._cond:
+            if key is None:
+                self._pending.clear()
+            else:
+                self._pending.pop(key, None)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Blockiert, bis nichts mehr aussteht. Rückgabe False bei Timeout.
+        Nur aus Worker-Threads aufrufen; im GUI-Thread after_pending() verwenden.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                # Rate-Limit: bis zum nächsten erlaubten Zeitpunkt weitere Werte sammeln
+                wait = self._last + self.min_interval - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                batch = list(self._pending.values())
+                self._pending.clear()
+                self._busy = True
+            try:
+                for fn, on_error in batch:
+                    try:
+                        fn()
+                    except Exception as e:
+                        if on_error:
+                            on_error(e)
+                        else:
+                            print(f"Dispatcher error: {e}")
+            finally:
+                with self._cond:
+                    self._last = time.monotonic()
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,168 @@
+import functools
+import itertools
+import queue
+import threading
+import traceback
+from concurrent.futures import Future
+
+# Prioritäten: kleiner = früher
+INTERACTIVE = 0      # GUI-Thread (Buttons, Parameter lesen/setzen)
+NORMAL      = 1
+BACKGROUND  = 2      # Polling-, Scan- und Sweep-Threads
+
+
+class InstrumentExecutor:
+    """
+    Serialisiert alle VISA-Zugriffe auf ein Gerät über genau einen Worker-Thread.
+    Aufträge landen in einer Prioritäts-Queue: Anfragen aus dem GUI-Thread
+    laufen vor Hintergrund-Polling. Innerhalb einer Priorität gilt FIFO.
+    Aufrufe aus dem Worker selbst (verschachtelte Transaktionen) werden direkt
+    ausgeführt, damit nichts auf sich selbst wartet.
+    """
+
+    def __init__(self, name="instrument"):
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-io", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def default_priority():
+        return INTERACTIVE if threading.current_thread() is threading.main_thread() else BACKGROUND
+
+    def in_worker(self):
+        return threading.current_thread() is self._thread
+
+    def submit_with(self, priority, fn, *args, **kwargs):
+        """Auftrag mit expliziter Priorität einreihen, Rückgabe Future."""
+        fut = Future()
+        if self.in_worker():
+            self._execute(fut, fn, args, kwargs)
+        else:
+            self._queue.put((priority, next(self._seq), fut, fn, args, kwargs))
+        return fut
+
+    def submit(self, fn, *args, **kwargs):
+        """Auftrag einreihen (Priorität nach aufrufendem Thread), Rückgabe Future."""
+        return self.submit_with(self.default_priority(), fn, *args, **kwargs)
+
+    def call(self, fn, *args, **kwargs):
+        """Auftrag einreihen und auf das Ergebnis warten."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    @staticmethod
+    def _execute(fut, fn, args, kwargs):
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            fut.set_exception(e)
+
+    def _run(self):
+        while True:
+            _, _, fut, fn, args, kwargs = self._queue.get()
+            self._execute(fut, fn, args, kwargs)
+
+
+class SerializedResource:
+    """
+    Proxy um eine pyvisa-Resource (oder SimulatedOSA): I/O-Methoden laufen
+    über den InstrumentExecutor, alle anderen Attribute (timeout, …) werden
+    durchgereicht. Damit sind auch direkte osa.query()-Aufrufe aus GUI-Threads
+    serialisiert.
+    """
+    IO_METHODS = ("write", "query", "read", "read_raw", "write_raw",
+                  "query_binary_values", "query_ascii_values",
+                  "read_stb", "wait_for_srq", "clear", "close")
+
+    def __init__(self, resource, executor):
+        object.__setattr__(self, "resource", resource)
+        object.__setattr__(self, "executor", executor)
+
+    def __getattr__(self, name):
+        attr = getattr(self.resource, name)
+        if name in self.IO_METHODS:
+            return functools.partial(self.executor.call, attr)
+        return attr
+
+    def __setattr__(self, name, value):
+        setattr(self.resource, name, value)
+
+
+def serialized(method):
+    """Controller-Methode als eine Transaktion im self.executor ausführen."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.executor.call(method, self, *args, **kwargs)
+    return wrapper
+
+
+class TkResultPump:
+    """
+    Übergibt Ergebnisse von Futures an den Tk-Thread: die Done-Callbacks
+    (im Worker) legen nur in eine queue.Queue, der Tk-Thread leert sie per
+    after-Polling, solange noch Aufträge offen sind. Aus dem Worker wird
+    nie eine Tk-Methode aufgerufen.
+    """
+    poll_ms = 20
+
+    def __init__(self, root):
+        self.root = root
+        self._queue = queue.Queue()
+        self._pending = 0           # nur im Tk-Thread verändert
+        self._polling = False
+
+    @classmethod
+    def for_widget(cls, widget):
+        root = widget._root()
+        pump = getattr(root, "_tk_result_pump", None)
+        if pump is None:
+            pump = cls(root)
+            root._tk_result_pump = pump
+        return pump
+
+    def watch(self, fut, on_done=None, on_error=None):
+        """fut beobachten (aus dem Tk-Thread aufrufen)."""
+        self._pending += 1
+        fut.add_done_callback(lambda f: self._queue.put((f, on_done, on_error)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        while True:
+            try:
+                fut, on_done, on_error = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if fut.cancelled():
+                continue
+            try:
+                exc = fut.exception()
+                if exc is not None:
+                    if on_error:
+                        on_error(exc)
+                elif on_done:
+                    on_done(fut.result())
+            except Exception:
+                # ein fehlerhafter Callback darf das Polling nicht anhalten
+                traceback.print_exc()
+        if self._pending > 0:
+            self.root.after(self.poll_ms, self._drain)
+        else:
+            self._polling = False
+
+
+def submit_to_tk(widget, executor, fn, *args, on_done=None, on_error=None, **kwargs):
+    """
+    fn im Executor einreihen, ohne zu warten; Ergebnis bzw. Exception wird im
+    Tk-Thread an on_done(result) / on_error(exc) übergeben (TkResultPump).
+    Für GUI-Aktionen, die sonst hinter einem laufenden Sweep blockieren würden.
+    Nur aus dem Tk-Thread aufrufen.
+    """
+    fut = executor.submit(fn, *args, **kwargs)
+    TkResultPump.for_widget(widget).watch(fut, on_done, on_error)
+    return fut
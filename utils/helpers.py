@@ -14,7 +14,10 @@ from pathlib import Path
 def get_best_unit(y: np.ndarray) -> str:
     if y is None or len(y) == 0:
         return "V"
-    m = np.nanmax(np.abs(y))
+    return unit_for_absmax(np.nanmax(np.abs(y)))
+
+def unit_for_absmax(m: float) -> str:
+    """Anzeige-Einheit zu einem bereits bekannten max(|v|) (z.B. aus FrameStats)."""
     if m < 1e-3:
         return "uV"
     elif m < 1:
@@ -66,6 +69,42 @@ def integration_string_to_hz(integ_str):
     }
     return mapping.get(integ_str, 1000)
 
+def list_index_for_sweep(t_start, t_end, t0, dwell, n):
+    """
+    Ordnet einen Sweep (t_start..t_end, time.time()-Zeitstempel) dem
+    Listen-Index des Wavegens zu, der ab t0 alle dwell Sekunden weiterschaltet.
+    Gibt None zurück, wenn der Sweep eine Stufengrenze überlappt oder
+    außerhalb der Liste liegt.
+    """
+    if t_start is None or dwell <= 0:
+        return None
+    i0 = int(np.floor((t_start - t0) / dwell))
+    i1 = int(np.floor((t_end - t0) / dwell))
+    if i0 != i1 or not 0 <= i0 < n:
+        return None
+    return i0
+
+def tracking_window(wl, dbm, center, span, min_level, full_center, full_span,
+                    edge_frac=0.15):
+    """
+    Bestimmt das nächste Sweep-Fenster (CNT, SPN) für den Tracking-Modus.
+    - Peak unter min_level → Peak verloren, zurück auf das volle Fenster
+    - Peak vom Fenstermittelpunkt um mehr als edge_frac*span verschoben
+      → auf den Peak zentrieren
+    Gibt None zurück, wenn das aktuelle Fenster passt.
+    """
+    if wl is None or len(wl) == 0:
+        return None
+    idx = int(np.nanargmax(dbm))
+    peak, wl0 = dbm[idx], wl[idx]
+    if not np.isfinite(peak) or peak < min_level:
+        if abs(center - full_center) < 1e-3 and abs(span - full_span) < 1e-3:
+            return None
+        return full_center, full_span
+    if abs(wl0 - center) > edge_frac * span or span > full_span:
+        return round(float(wl0), 3), span
+    return None
+
 class CreateToolTip:
     def __init__(self, widget, text):
         self.widget = widget
@@ -209,6 +248,8 @@ def meta_daten(
         "scan_start":    "Hz",
         "scan_stop":     "Hz",
         "scan_step":     "Hz",
+        "window_center": "nm",
+        "window_span":   "nm",
     }
 
     # 4) Beliebige Zusatzfelder
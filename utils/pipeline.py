@@ -0,0 +1,73 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class TwoStagePipeline:
+    """
+    Zweistufige Pipeline: eine I/O-Stufe (Gerätezugriffe) und eine
+    Verarbeitungsstufe (Parsen, Analyse, GUI-Übergabe) laufen in getrennten
+    Threads und sind über eine begrenzte Queue gekoppelt. Während die
+    Verarbeitung eines Schritts läuft, kann die I/O-Stufe bereits den
+    nächsten Schritt einstellen und messen.
+
+    produce(emit, abort): ruft emit(item) für jedes Messergebnis auf
+    process(item):        verarbeitet ein Messergebnis
+    on_done():            wird nach dem letzten verarbeiteten Element aufgerufen
+    """
+
+    def __init__(self, produce, process, abort, maxsize=4, on_done=None, on_error=None):
+        self.produce = produce
+        self.process = process
+        self.abort = abort
+        self.on_done = on_done
+        self.on_error = on_error
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._io_stage, daemon=True),
+            threading.Thread(target=self._process_stage, daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def join(self, timeout=None):
+        for t in self._threads:
+            t.join(timeout)
+
+    def _emit(self, item):
+        # blockiert bei voller Queue (Backpressure), bleibt aber abbrechbar
+        while not self.abort.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _io_stage(self):
+        try:
+            self.produce(self._emit, self.abort)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
+        finally:
+            self.queue.put(_DONE)
+
+    def _process_stage(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _DONE:
+                    break
+                try:
+                    self.process(item)
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(e)
+        finally:
+            if self.on_done:
+                self.on_done()
@@ -5,6 +5,7 @@ import json, os
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import random
+from utils.decimation import MinMaxDecimator
 
 # Verfügbare Linienstile und Marker
 LINE_STYLES   = ["-", "--", "-.", ":", "None"]
@@ -74,6 +75,8 @@ class PlotViewer(ttk.Frame):
 
     def _create_plot(self):
         self.fig, self.ax = plt.subplots()
+        # geladene Dateien können Millionen Punkte haben → ab 200k mit Pyramide
+        self.decimator = MinMaxDecimator(self.ax, pyramid_min=200_000)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
@@ -288,7 +291,7 @@ class PlotViewer(ttk.Frame):
                 y    = data[:, yi]
                 ls   = None if cfg["style"].get()=="None" else cfg["style"].get()
                 mk   = None if cfg["marker"].get()=="None" else cfg["marker"].get()
-                self.ax.plot(x, y,
+                self.decimator.plot(x, y,
                              label=cfg["label"].get(),
                              color=cfg["color"].get(),
                              linestyle=ls,
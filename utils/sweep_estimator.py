@@ -0,0 +1,162 @@
+import atexit
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from utils.data_processing import smt_to_int
+
+log = logging.getLogger(__name__)
+
+# Persistente Kalibrierdaten (gemessene Sweep-Dauern)
+DEFAULT_PATH = Path(__file__).parent.parent / "sweep_timing.json"
+
+
+def nnls(A, b, max_iter=None):
+    """
+    Nicht-negative kleinste Quadrate (Lawson-Hanson): min |A x - b|, x >= 0.
+    Auch bei rangdefizitem A (wenige verschiedene Konfigurationen) stabil.
+    """
+    m, n = A.shape
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    max_iter = max_iter or 3 * n
+    tol = 10 * np.finfo(float).eps * np.linalg.norm(A, 1) * max(m, n)
+    for _ in range(max_iter):
+        w = A.T @ (b - A @ x)
+        if passive.all() or w[~passive].max() <= tol:
+            break
+        passive[np.argmax(np.where(passive, -np.inf, w))] = True
+        while True:
+            z = np.zeros(n)
+            z[passive], *_ = np.linalg.lstsq(A[:, passive], b, rcond=None)
+            if (z[passive] > 0).all():
+                x = z
+                break
+            neg = passive & (z <= 0)
+            alpha = np.min(x[neg] / (x[neg] - z[neg]))
+            x = x + alpha * (z - x)
+            passive &= x > tol
+    return x
+
+
+class SweepTimeEstimator:
+    """
+    Schätzt die Dauer eines OSA-Sweeps aus SPN, RES, VBW, MPT und SMT.
+
+    Modell: t = c0 + c1 * MPT/VBW + c2 * SPN/RES/1000 + c3 * MPT/1000 + c4 * MPT*SMT/1e4
+    (Detektor-Einschwingzeit pro Punkt, Monochromator-Weg, Datenaufbereitung,
+    Glättung). Die Koeffizienten werden per NNLS aus gemessenen Sweeps
+    kalibriert, damit Fortschritt/ETA auch auf schnelleren Geräten stimmen;
+    die Reserve für Timeouts steckt in OSAController.apply_sweep_timeout.
+    Gespeichert wird verzögert (save_delay) und beim Programmende.
+    """
+    DEFAULT_COEFFS = [0.5, 1.0, 0.05, 0.05, 0.0]
+    MAX_SAMPLES = 200
+
+    def __init__(self, path=DEFAULT_PATH, save_delay=30.0):
+        self.path = Path(path) if path else None
+        self.samples = []          # [spn, res, vbw_hz, mpt, smt, seconds]
+        self.coeffs = np.array(self.DEFAULT_COEFFS, dtype=float)
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._save_timer = None
+        self.load()
+        if self.path:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def features(spn, res, vbw_hz, mpt, smt=0):
+        spn, res, vbw_hz, mpt = float(spn), float(res), float(vbw_hz), float(mpt)
+        smt = smt_to_int(smt)
+        return np.array([
+            1.0,
+            mpt / max(vbw_hz, 1e-3),
+            spn / max(res, 1e-3) / 1000,
+            mpt / 1000,
+            mpt * smt / 1e4,
+        ])
+
+    def estimate(self, spn, res, vbw_hz, mpt, smt=0):
+        """Geschätzte Sweep-Dauer in Sekunden (kalibriertes Modell, mindestens 50 ms)."""
+        x = self.features(spn, res, vbw_hz, mpt, smt)
+        return float(max(x @ self.coeffs, 0.05))
+
+    def upper_bound(self, spn, res, vbw_hz, mpt, smt=0):
+        """Konservative Dauer für Timeouts: Maximum aus Kalibrierung und Default-Modell."""
+        x = self.features(spn, res, vbw_hz, mpt, smt)
+        return float(max(x @ self.coeffs, x @ np.array(self.DEFAULT_COEFFS), 0.05))
+
+    def add_measurement(self, spn, res, vbw_hz, mpt, smt, seconds):
+        """Gemessene Sweep-Dauer aufnehmen, neu kalibrieren, Speichern vormerken."""
+        if not np.isfinite(seconds) or seconds <= 0:
+            return
+        with self._lock:
+            self.samples.append([float(spn), float(res), float(vbw_hz), float(mpt),
+                                 smt_to_int(smt), float(seconds)])
+            self.samples = self.samples[-self.MAX_SAMPLES:]
+            self.calibrate()
+            self._dirty = True
+            if self.path and self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def calibrate(self):
+        """NNLS-Fit der Koeffizienten, Fallback auf Default-Werte."""
+        n_coeffs = len(self.DEFAULT_COEFFS)
+        if len(self.samples) < 2:
+            self.coeffs = np.array(self.DEFAULT_COEFFS, dtype=float)
+            return
+        X = np.array([self.features(*s[:5]) for s in self.samples])
+        y = np.array([s[5] for s in self.samples])
+        if len(self.samples) <= n_coeffs:
+            # zu wenige Punkte für einen vollen Fit: Default-Modell nur skalieren
+            default = X @ np.array(self.DEFAULT_COEFFS)
+            scale = float(np.median(y / np.maximum(default, 1e-3)))
+            self.coeffs = np.array(self.DEFAULT_COEFFS) * scale
+            return
+        self.coeffs = nnls(X, y)
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.samples = json.load(f).get("samples", [])
+            self.calibrate()
+        except Exception as e:
+            log.warning("Sweep timing load failed (%s): %s", self.path, e)
+            self.samples = []
+
+    def flush(self):
+        """Vorgemerkte Änderungen jetzt speichern (Timer bzw. Programmende)."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"samples": self.samples,
+                           "coeffs": self.coeffs.tolist()}, f, indent=2)
+        except Exception as e:
+            log.warning("Sweep timing save failed (%s): %s", self.path, e)
+
+
+def format_duration(seconds):
+    """Dauer als h:mm:ss bzw. m:ss."""
+    seconds = int(round(max(seconds, 0)))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"